@@ -1,33 +1,363 @@
 import os
 import json
+import math
 import time
-from datetime import datetime, timedelta
+import atexit
+import threading
+from datetime import datetime
+from file_utils import atomic_write_json
+
+class LatencyHistogram:
+    """Histograma logarítmico de tiempos de respuesta para calcular percentiles en memoria constante
+
+    Cada tiempo cae en la cubeta ceil(log(t / min_value) / log(growth)), así que el error
+    relativo de un percentil es menor a growth - 1 (10%) y el número de cubetas está acotado
+    (unas 125 entre 1 ms y 2 minutos) sin importar cuántas llamadas se registren.
+    """
+
+    def __init__(self, min_value=0.001, max_value=120.0, growth=1.1):
+        self.min_value = min_value
+        self.growth = growth
+        self.log_growth = math.log(growth)
+        self.max_index = self.index_for(max_value)
+        self.counts = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def index_for(self, value):
+        if value <= self.min_value:
+            return 0
+        return int(math.ceil(math.log(value / self.min_value) / self.log_growth - 1e-9))
+
+    def add(self, value, count=1):
+        index = min(self.index_for(value), self.max_index)
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.count += count
+        self.total += value * count
+        if value > self.max:
+            self.max = value
+
+    def merge_counts(self, counts):
+        """Suma conteos guardados ({cubeta: llamadas}), sin tocar la suma ni el máximo"""
+        for index, count in counts.items():
+            index = min(int(index), self.max_index)
+            self.counts[index] = self.counts.get(index, 0) + count
+            self.count += count
+
+    def percentile(self, q):
+        """Devuelve el tiempo bajo el cual cae la fracción q de las llamadas (0 si no hay datos)"""
+        if not self.count:
+            return 0
+        rank = max(1, int(math.ceil(q * self.count)))
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                # Límite superior de la cubeta, sin pasar del máximo observado
+                return min(self.min_value * self.growth ** index, self.max)
+        return self.max
+
+    def cumulative_counts(self, bounds):
+        """Número de tiempos menores o iguales a cada límite (para exportar como histograma)"""
+        result = []
+        for bound in bounds:
+            limit = self.index_for(bound)
+            result.append(sum(count for index, count in self.counts.items() if index <= limit))
+        return result
+
+    def copy(self):
+        histogram = LatencyHistogram(self.min_value, growth=self.growth)
+        histogram.max_index = self.max_index
+        histogram.load(self.to_dict())
+        return histogram
+
+    def mean(self):
+        return self.total / self.count if self.count else 0
+
+    def summary(self):
+        """Percentiles p50/p95/p99 y máximo"""
+        return {
+            'p50': self.percentile(0.5),
+            'p95': self.percentile(0.95),
+            'p99': self.percentile(0.99),
+            'max': self.max
+        }
+
+    def to_dict(self):
+        return {
+            'counts': {str(index): count for index, count in sorted(self.counts.items())},
+            'count': self.count,
+            'total': self.total,
+            'max': self.max
+        }
+
+    def load(self, data):
+        """Carga un histograma guardado con to_dict, sumándolo al actual"""
+        self.merge_counts(data.get('counts', {}))
+        self.total += data.get('total', 0)
+        self.max = max(self.max, data.get('max', 0))
+
+class TimeBucketRing:
+    """Historial en cubetas de tiempo fijas indexadas por época, con inserción O(1)
+
+    La cubeta de un instante es int(timestamp // bucket_seconds) y ocupa la posición
+    época % size del anillo; cuando llega una época nueva la posición se reinicia, así
+    que el historial avanza solo sin desplazar listas.
+    """
+
+    def __init__(self, size, bucket_seconds=3600):
+        self.size = size
+        self.bucket_seconds = bucket_seconds
+        self.epochs = [-1] * size
+        self.calls = [0] * size
+        self.errors = [0] * size
+        self.latency_sum = [0.0] * size
+        self.latency_max = [0.0] * size
+        self.latency = [None] * size
+
+    def epoch_for(self, timestamp):
+        return int(timestamp // self.bucket_seconds)
+
+    def slot_for(self, epoch):
+        """Devuelve la posición de la época en el anillo, reiniciándola si tenía otra época"""
+        slot = epoch % self.size
+        if self.epochs[slot] != epoch:
+            self.epochs[slot] = epoch
+            self.calls[slot] = 0
+            self.errors[slot] = 0
+            self.latency_sum[slot] = 0.0
+            self.latency_max[slot] = 0.0
+            self.latency[slot] = LatencyHistogram()
+        return slot
+
+    def add(self, success, response_time, timestamp=None):
+        """Registra una llamada en la cubeta de su instante"""
+        slot = self.slot_for(self.epoch_for(timestamp if timestamp is not None else time.time()))
+        self.calls[slot] += 1
+        if not success:
+            self.errors[slot] += 1
+        self.latency_sum[slot] += response_time
+        if response_time > self.latency_max[slot]:
+            self.latency_max[slot] = response_time
+        self.latency[slot].add(response_time)
+
+    def merge(self, epoch, calls, errors, latency_sum, latency_max, latency_counts=None):
+        """Suma los valores de una cubeta guardada (se ignora si ya salió de la ventana)"""
+        slot = epoch % self.size
+        if self.epochs[slot] > epoch:
+            return
+        slot = self.slot_for(epoch)
+        self.calls[slot] += calls
+        self.errors[slot] += errors
+        self.latency_sum[slot] += latency_sum
+        self.latency_max[slot] = max(self.latency_max[slot], latency_max)
+        histogram = self.latency[slot]
+        if latency_counts:
+            histogram.merge_counts(latency_counts)
+        elif calls:
+            # Cubeta sin histograma (formato anterior): se aproxima con el promedio
+            histogram.add(latency_sum / calls, calls)
+        histogram.max = max(histogram.max, latency_max)
+
+    def window(self, now=None):
+        """Devuelve (época, posición o None) de las últimas size cubetas, de la más antigua a la actual"""
+        current = self.epoch_for(now if now is not None else time.time())
+        result = []
+        for epoch in range(current - self.size + 1, current + 1):
+            slot = epoch % self.size
+            result.append((epoch, slot if self.epochs[slot] == epoch else None))
+        return result
+
+    def to_list(self):
+        """Cubetas con datos como listas [época, llamadas, errores, suma de latencias, latencia máxima, histograma]"""
+        return [
+            [self.epochs[slot], self.calls[slot], self.errors[slot], self.latency_sum[slot], self.latency_max[slot],
+             self.latency[slot].to_dict()['counts']]
+            for slot in sorted(range(self.size), key=lambda i: self.epochs[i])
+            if self.epochs[slot] >= 0 and self.calls[slot] > 0
+        ]
+
+class DimensionStats:
+    """Llamadas, errores, latencia y eventos de caché de un valor de una dimensión (p. ej. un feed)"""
+
+    def __init__(self):
+        self.calls = 0
+        self.errors = 0
+        self.cache = {'hit': 0, 'stale': 0, 'miss': 0}
+        self.latency = LatencyHistogram()
+
+    def add_call(self, success, response_time):
+        self.calls += 1
+        if not success:
+            self.errors += 1
+        self.latency.add(response_time)
+
+    def add_cache_event(self, event):
+        event = event if event in self.cache else 'miss'
+        self.cache[event] += 1
+
+    def to_dict(self):
+        return {'calls': self.calls, 'errors': self.errors, 'cache': dict(self.cache), 'latency': self.latency.to_dict()}
+
+    def load(self, data):
+        """Suma los valores guardados con to_dict"""
+        self.calls += data.get('calls', 0)
+        self.errors += data.get('errors', 0)
+        for event, count in data.get('cache', {}).items():
+            self.cache[event] = self.cache.get(event, 0) + count
+        self.latency.load(data.get('latency', {}))
+
+    def summary(self):
+        cache_total = sum(self.cache.values())
+        latency = self.latency.summary()
+        return {
+            'calls': self.calls,
+            'errors': self.errors,
+            'error_rate': (self.errors / self.calls) * 100 if self.calls else 0,
+            'response_time': self.latency.mean(),
+            'response_time_p50': latency['p50'],
+            'response_time_p95': latency['p95'],
+            'response_time_p99': latency['p99'],
+            'response_time_max': latency['max'],
+            'cache_hit_rate': ((self.cache['hit'] + self.cache['stale']) / cache_total) * 100 if cache_total else None
+        }
+
+class DimensionTable:
+    """Estadísticas por dimensión ('route', 'feed', 'status') y valor
+
+    El número de valores por dimensión está acotado: los que no caben se suman en 'other'.
+    """
+
+    def __init__(self, max_values=50):
+        self.max_values = max_values
+        self.values = {}
+
+    def entry(self, dimension, value):
+        values = self.values.setdefault(dimension, {})
+        value = str(value)
+        # Se reserva un lugar para 'other'
+        if value not in values and len(values) >= self.max_values - 1:
+            value = 'other'
+        if value not in values:
+            values[value] = DimensionStats()
+        return values[value]
+
+    def add_call(self, dimension, value, success, response_time):
+        self.entry(dimension, value).add_call(success, response_time)
+
+    def add_cache_event(self, dimension, value, event):
+        self.entry(dimension, value).add_cache_event(event)
+
+    def to_dict(self):
+        return {
+            dimension: {value: stats.to_dict() for value, stats in values.items()}
+            for dimension, values in self.values.items()
+        }
+
+    def load(self, data):
+        """Suma las estadísticas guardadas con to_dict"""
+        for dimension, values in data.items():
+            for value, stats in values.items():
+                self.entry(dimension, value).load(stats)
+
+    def summaries(self, dimension):
+        return [
+            dict(stats.summary(), dimension=dimension, name=value)
+            for value, stats in self.values.get(dimension, {}).items()
+        ]
+
+class StatsDelta:
+    """Cambios registrados por este proceso desde la última sincronización con el almacén compartido"""
+
+    def __init__(self, history_intervals, bucket_seconds, start_time=None):
+        self.counters = {}
+        self.latency = LatencyHistogram()
+        self.history = TimeBucketRing(history_intervals, bucket_seconds)
+        self.dimensions = DimensionTable()
+        self.start_time = start_time
+
+    def add_call(self, success, response_time):
+        self.increment('api_calls_count')
+        if not success:
+            self.increment('api_errors_count')
+        self.latency.add(response_time)
+        self.history.add(success, response_time)
+
+    def increment(self, name):
+        self.counters[name] = self.counters.get(name, 0) + 1
+
+    def merge(self, other):
+        """Suma otro conjunto de cambios (p. ej. uno que no se pudo guardar)"""
+        for name, value in other.counters.items():
+            self.counters[name] = self.counters.get(name, 0) + value
+        self.latency.load(other.latency.to_dict())
+        for bucket in other.history.to_list():
+            self.history.merge(*bucket)
+        self.dimensions.load(other.dimensions.to_dict())
+        if other.start_time and (not self.start_time or other.start_time < self.start_time):
+            self.start_time = other.start_time
+
+    def to_data(self):
+        """Cambios en el formato de api_stats.json"""
+        data = dict(self.counters)
+        if self.start_time:
+            data['api_start_time'] = self.start_time
+        data['api_latency'] = self.latency.to_dict()
+        data['api_buckets'] = self.history.to_list()
+        data['dimensions'] = self.dimensions.to_dict()
+        return data
 
 class ApiStatsManager:
-    def __init__(self, history_intervals=48):
+    def __init__(self, history_intervals=48, flush_interval=None, flush_every=None, stats_file=None,
+                 bucket_seconds=3600, store=None):
         self.HISTORY_INTERVALS = history_intervals
-        self.stats_file = os.path.join(os.path.dirname(__file__), 'data', 'api_stats.json')
+        self.bucket_seconds = bucket_seconds
+        self.stats_file = stats_file or os.path.join(os.path.dirname(__file__), 'data', 'api_stats.json')
         self.ensure_data_dir()
         
+        # Almacén opcional compartido entre procesos (SqliteStatsStore); sin él se usa el archivo JSON
+        self.store = store
+        self.pending = None
+        # Estadísticas del archivo JSON anterior que faltan por importar al almacén
+        self.legacy_data = None
+        
+        # Escritura diferida: si flush_interval está definido, las estadísticas se guardan en un
+        # hilo de fondo cada flush_interval segundos o tras flush_every llamadas, no en cada llamada
+        self.flush_interval = flush_interval
+        self.flush_every = flush_every
+        self.pending_events = 0
+        self.dirty = False
+        self.lock = threading.RLock()
+        self.flush_requested = threading.Event()
+        self.flusher = None
+        self.flusher_pid = None
+        
         # Valores predeterminados
+        self.reset_stats()
+        
+        # Cargar datos existentes si están disponibles
+        self.load_stats()
+    
+    def reset_stats(self):
+        """Reinicia los contadores y el historial en memoria"""
         self.api_calls_count = 0
         self.api_errors_count = 0
-        self.api_response_times = []
+        # Histograma de todos los tiempos de respuesta (memoria constante)
+        self.api_latency = LatencyHistogram()
         self.api_start_time = time.time()
         
-        # Historial de llamadas para tendencias (últimas horas)
-        self.api_history = {
-            'calls': [0] * self.HISTORY_INTERVALS,
-            'success_rate': [100] * self.HISTORY_INTERVALS,
-            'response_time': [0] * self.HISTORY_INTERVALS,
-            'errors': [0] * self.HISTORY_INTERVALS
-        }
+        # Contadores de la caché de respuestas
+        self.cache_hits = 0
+        self.cache_stale_hits = 0
+        self.cache_misses = 0
+        self.coalesced_calls = 0
         
-        # Horas para el historial
-        self.api_hours = self.initialize_hours()
+        # Historial de llamadas para tendencias (últimas horas, una cubeta por hora)
+        self.api_history = TimeBucketRing(self.HISTORY_INTERVALS, self.bucket_seconds)
         
-        # Cargar datos existentes si están disponibles
-        self.load_stats()
+        # Desglose por ruta de Flask, feed de LiveScore y estado de la respuesta
+        self.dimensions = DimensionTable()
     
     def ensure_data_dir(self):
         """Asegura que el directorio de datos exista"""
@@ -35,131 +365,257 @@ class ApiStatsManager:
         if not os.path.exists(data_dir):
             os.makedirs(data_dir)
     
-    def initialize_hours(self):
-        """Inicializa las horas para los últimos intervalos"""
-        now = datetime.now()
-        return [(now - timedelta(hours=i)).strftime('%H:%M') for i in range(self.HISTORY_INTERVALS-1, -1, -1)]
-    
-    def update_hours(self):
-        """Actualiza las horas basadas en la hora actual"""
-        now = datetime.now()
-        current_hour = now.strftime('%H:%M')
-        
-        # Si la hora actual ya está en la lista, no es necesario actualizar
-        if current_hour in self.api_hours:
-            return
-        
-        # Actualizar las horas y desplazar los datos históricos
-        self.api_hours = self.initialize_hours()
-        
-        # No desplazamos los datos históricos aquí para mantener la continuidad
-        # Solo actualizamos las etiquetas de tiempo
-    
     def load_stats(self):
-        """Carga las estadísticas desde el archivo JSON"""
+        """Carga las estadísticas desde el archivo JSON (o desde el almacén compartido)"""
+        if self.store is not None:
+            # Se crea antes de usar el almacén: si falla al arrancar (p. ej. database is locked con
+            # varios workers), los cambios se acumulan y se guardan en la siguiente sincronización
+            self.pending = StatsDelta(self.HISTORY_INTERVALS, self.bucket_seconds, start_time=time.time())
         try:
             if os.path.exists(self.stats_file):
                 with open(self.stats_file, 'r') as f:
-                    data = json.load(f)
-                
-                # Cargar datos básicos
-                self.api_calls_count = data.get('api_calls_count', 0)
-                self.api_errors_count = data.get('api_errors_count', 0)
-                self.api_response_times = data.get('api_response_times', [])
-                
-                # Si el tiempo de inicio guardado es más reciente que el actual, usarlo
-                saved_start_time = data.get('api_start_time', 0)
-                if saved_start_time > 0:
-                    self.api_start_time = saved_start_time
-                
-                # Cargar historial
-                if 'api_history' in data:
-                    self.api_history = data['api_history']
-                
-                # Actualizar horas
-                self.update_hours()
-                
-                print(f"Estadísticas de API cargadas: {self.api_calls_count} llamadas, {self.api_errors_count} errores")
+                    self.load_data(json.load(f))
+            
+            if self.store is not None:
+                self.legacy_data = self.serialize_stats()
+                self.import_legacy()
+                self.reset_stats()
+                self.load_data(self.store.load(self.first_epoch()))
+            
+            print(f"Estadísticas de API cargadas: {self.api_calls_count} llamadas, {self.api_errors_count} errores")
         except Exception as e:
             print(f"Error al cargar estadísticas de API: {str(e)}")
     
+    def import_legacy(self):
+        """Importa el archivo JSON anterior al almacén una sola vez, cuando el almacén está vacío"""
+        if self.legacy_data is not None:
+            self.store.apply(self.legacy_data, only_if_empty=True)
+            self.legacy_data = None
+    
+    def load_data(self, data):
+        """Suma a las estadísticas en memoria las guardadas en data (formato de api_stats.json)"""
+        # Cargar datos básicos
+        self.api_calls_count += data.get('api_calls_count', 0)
+        self.api_errors_count += data.get('api_errors_count', 0)
+        if 'api_latency' in data:
+            self.api_latency.load(data['api_latency'])
+        else:
+            # Formato anterior: solo se guardaban los últimos tiempos de respuesta
+            for response_time in data.get('api_response_times', []):
+                self.api_latency.add(response_time)
+        self.cache_hits += data.get('cache_hits', 0)
+        self.cache_stale_hits += data.get('cache_stale_hits', 0)
+        self.cache_misses += data.get('cache_misses', 0)
+        self.coalesced_calls += data.get('coalesced_calls', 0)
+        
+        # Si hay un tiempo de inicio guardado anterior al actual, usarlo
+        saved_start_time = data.get('api_start_time', 0)
+        if saved_start_time > 0:
+            self.api_start_time = min(self.api_start_time, saved_start_time)
+        
+        # Cargar historial
+        if 'api_buckets' in data:
+            for bucket in data['api_buckets']:
+                self.api_history.merge(*bucket)
+        elif 'api_history' in data:
+            self.load_legacy_history(data['api_history'], data.get('last_updated'))
+        
+        self.dimensions.load(data.get('dimensions', {}))
+    
+    def first_epoch(self):
+        """Época de la cubeta más antigua dentro del historial"""
+        return self.api_history.epoch_for(time.time()) - self.HISTORY_INTERVALS + 1
+    
+    def load_legacy_history(self, history, last_updated):
+        """Convierte el historial del formato anterior (listas por hora) a cubetas"""
+        if not last_updated:
+            return
+        last_epoch = self.api_history.epoch_for(datetime.fromisoformat(last_updated).timestamp())
+        calls = history.get('calls', [])
+        for i, count in enumerate(calls):
+            if not count:
+                continue
+            epoch = last_epoch - (len(calls) - 1 - i)
+            errors = history.get('errors', [0] * len(calls))[i]
+            # El formato anterior solo guardaba el último tiempo de respuesta de cada hora
+            response_time = history.get('response_time', [0] * len(calls))[i]
+            self.api_history.merge(epoch, count, errors, response_time * count, response_time)
+    
     def save_stats(self):
         """Guarda las estadísticas en el archivo JSON"""
+        if self.store is not None:
+            self.sync_store()
+            return
         try:
-            data = {
-                'api_calls_count': self.api_calls_count,
-                'api_errors_count': self.api_errors_count,
-                'api_response_times': self.api_response_times[-100:],  # Guardar solo los últimos 100 tiempos para evitar archivos enormes
-                'api_start_time': self.api_start_time,
-                'api_history': self.api_history,
-                'last_updated': datetime.now().isoformat()
-            }
+            with self.lock:
+                data = self.serialize_stats()
+                self.pending_events = 0
+                self.dirty = False
             
-            with open(self.stats_file, 'w') as f:
-                json.dump(data, f, indent=2)
+            # Escritura atómica: un archivo temporal que luego se renombra
+            atomic_write_json(self.stats_file, data, indent=2)
         except Exception as e:
             print(f"Error al guardar estadísticas de API: {str(e)}")
     
-    def track_api_call(self, success, response_time):
-        """Registra una llamada a la API y actualiza las estadísticas"""
-        self.api_calls_count += 1
-        self.api_response_times.append(response_time)
-        if not success:
-            self.api_errors_count += 1
-        
-        # Actualizar horas si es necesario
-        self.update_hours()
+    def sync_store(self):
+        """Suma los cambios de este proceso al almacén compartido y recarga el total de todos los procesos"""
+        with self.lock:
+            pending = self.pending or StatsDelta(self.HISTORY_INTERVALS, self.bucket_seconds)
+            self.pending = StatsDelta(self.HISTORY_INTERVALS, self.bucket_seconds)
+            self.pending_events = 0
+            self.dirty = False
         
-        # Obtener la hora actual para actualizar el índice correcto
-        current_hour = datetime.now().strftime('%H:%M')
-        
-        # Buscar la hora actual en el array de horas o usar la más cercana
-        if current_hour in self.api_hours:
-            hour_index = self.api_hours.index(current_hour)
-        else:
-            # Si la hora exacta no está, encontrar la hora más cercana
-            hour_index = self.HISTORY_INTERVALS - 1
-            
-            # Convertir current_hour a minutos desde medianoche para comparación
-            current_hour_parts = current_hour.split(':')
-            current_minutes = int(current_hour_parts[0]) * 60 + int(current_hour_parts[1])
-            
-            # Encontrar la hora más cercana
-            min_diff = float('inf')
-            for i, hour in enumerate(self.api_hours):
-                hour_parts = hour.split(':')
-                hour_minutes = int(hour_parts[0]) * 60 + int(hour_parts[1])
-                diff = abs(hour_minutes - current_minutes)
-                if diff < min_diff:
-                    min_diff = diff
-                    hour_index = i
-        
-        # Actualizar historial para la hora actual
-        self.api_history['calls'][hour_index] += 1
+        first_epoch = self.first_epoch()
+        try:
+            # La importación del JSON anterior se reintenta si falló al arrancar
+            self.import_legacy()
+            self.store.apply(pending.to_data(), prune_before=first_epoch)
+        except Exception as e:
+            # Conservar los cambios para el siguiente intento
+            with self.lock:
+                pending.merge(self.pending)
+                self.pending = pending
+                self.dirty = True
+            print(f"Error al guardar estadísticas de API: {str(e)}")
+            return
         
-        if not success:
-            self.api_history['errors'][hour_index] += 1
+        try:
+            data = self.store.load(first_epoch)
+        except Exception as e:
+            print(f"Error al leer estadísticas de API: {str(e)}")
+            return
         
-        # Actualizar tasa de éxito
-        total_calls = self.api_history['calls'][hour_index]
-        total_errors = self.api_history['errors'][hour_index]
-        success_rate = 100
-        if total_calls > 0:
-            success_rate = round(((total_calls - total_errors) / total_calls) * 100)
-        self.api_history['success_rate'][hour_index] = success_rate
+        with self.lock:
+            self.reset_stats()
+            self.load_data(data)
+            # Cambios registrados mientras se sincronizaba
+            self.load_data(self.pending.to_data())
+    
+    def serialize_stats(self):
+        """Arma el diccionario que se guarda en el archivo JSON"""
+        return {
+            'api_calls_count': self.api_calls_count,
+            'api_errors_count': self.api_errors_count,
+            'api_latency': self.api_latency.to_dict(),
+            'api_start_time': self.api_start_time,
+            'cache_hits': self.cache_hits,
+            'cache_stale_hits': self.cache_stale_hits,
+            'cache_misses': self.cache_misses,
+            'coalesced_calls': self.coalesced_calls,
+            'api_buckets': self.api_history.to_list(),
+            'dimensions': self.dimensions.to_dict(),
+            'last_updated': datetime.now().isoformat()
+        }
+    
+    def mark_dirty(self, count_event=True):
+        """Marca cambios pendientes y los guarda ahora o deja que los guarde el hilo de fondo"""
+        if self.flush_interval is None:
+            self.save_stats()
+            return
         
-        # Actualizar tiempo de respuesta promedio
-        self.api_history['response_time'][hour_index] = response_time
+        self.ensure_flusher()
+        with self.lock:
+            self.dirty = True
+            if count_event:
+                self.pending_events += 1
+            flush_now = self.flush_every is not None and self.pending_events >= self.flush_every
+        if flush_now:
+            self.flush_requested.set()
+    
+    def ensure_flusher(self):
+        """Inicia el hilo de escritura diferida en este proceso si no está en ejecución"""
+        pid = os.getpid()
+        if self.flusher is not None and self.flusher_pid == pid and self.flusher.is_alive():
+            return
+        with self.lock:
+            if self.flusher is not None and self.flusher_pid == pid and self.flusher.is_alive():
+                return
+            self.flusher = threading.Thread(target=self.run_flusher, name='api-stats-flusher', daemon=True)
+            self.flusher_pid = pid
+            self.flusher.start()
+            atexit.register(self.flush)
+    
+    def run_flusher(self):
+        while True:
+            self.flush_requested.wait(self.flush_interval)
+            self.flush_requested.clear()
+            self.flush()
+    
+    def flush(self):
+        """Guarda las estadísticas si hay cambios pendientes"""
+        if self.dirty:
+            self.save_stats()
+    
+    def track_api_call(self, success, response_time, feed=None, status=None):
+        """Registra una llamada a la API y actualiza las estadísticas
+
+        feed y status (clase de estado, p. ej. '2xx' o 'error') son opcionales y alimentan el desglose.
+        """
+        dimensions = [(name, value) for name, value in (('feed', feed), ('status', status)) if value is not None]
+        with self.lock:
+            self.api_calls_count += 1
+            self.api_latency.add(response_time)
+            if not success:
+                self.api_errors_count += 1
+            
+            # Actualizar el historial en la cubeta de la hora actual
+            self.api_history.add(success, response_time)
+            for name, value in dimensions:
+                self.dimensions.add_call(name, value, success, response_time)
+            if self.pending is not None:
+                self.pending.add_call(success, response_time)
+                for name, value in dimensions:
+                    self.pending.dimensions.add_call(name, value, success, response_time)
         
-        # Guardar estadísticas después de cada actualización
-        self.save_stats()
+        # Guardar estadísticas (de inmediato o en el hilo de escritura diferida)
+        self.mark_dirty()
+    
+    def track_request(self, route, status_code, response_time):
+        """Registra una petición atendida por una ruta de Flask (no cuenta como llamada a la API)"""
+        success = status_code < 500
+        with self.lock:
+            self.dimensions.add_call('route', route, success, response_time)
+            if self.pending is not None:
+                self.pending.dimensions.add_call('route', route, success, response_time)
+        self.mark_counter_dirty()
+    
+    def track_cache_event(self, event, feed=None):
+        """Registra un acierto ('hit'), acierto obsoleto ('stale') o fallo ('miss') de la caché"""
+        with self.lock:
+            if event == 'hit':
+                self.cache_hits += 1
+            elif event == 'stale':
+                self.cache_stale_hits += 1
+            else:
+                self.cache_misses += 1
+            if feed is not None:
+                self.dimensions.add_cache_event('feed', feed, event)
+            if self.pending is not None:
+                self.pending.increment({'hit': 'cache_hits', 'stale': 'cache_stale_hits'}.get(event, 'cache_misses'))
+                if feed is not None:
+                    self.pending.dimensions.add_cache_event('feed', feed, event)
+        self.mark_counter_dirty()
+    
+    def track_coalesced_call(self):
+        """Registra una llamada a la API que se agrupó con otra idéntica en curso"""
+        with self.lock:
+            self.coalesced_calls += 1
+            if self.pending is not None:
+                self.pending.increment('coalesced_calls')
+        self.mark_counter_dirty()
+    
+    def mark_counter_dirty(self):
+        """Marca cambios en contadores secundarios sin forzar una escritura"""
+        # Sin escritura diferida estos contadores se guardan con la siguiente llamada registrada
+        if self.flush_interval is not None:
+            self.mark_dirty(count_event=False)
     
     def get_api_stats(self):
         """Obtiene las estadísticas básicas de la API"""
-        # Calcular tiempo de respuesta promedio
-        avg_response_time = 0
-        if self.api_response_times:
-            avg_response_time = sum(self.api_response_times) / len(self.api_response_times)
+        with self.lock:
+            # Tiempo de respuesta promedio y percentiles
+            avg_response_time = self.api_latency.mean()
+            latency = self.api_latency.summary()
         
         # Calcular tasa de éxito global
         success_rate = 100
@@ -170,22 +626,88 @@ class ApiStatsManager:
             'calls': self.api_calls_count,
             'success_rate': success_rate,
             'response_time': avg_response_time,
+            'response_time_p50': latency['p50'],
+            'response_time_p95': latency['p95'],
+            'response_time_p99': latency['p99'],
+            'response_time_max': latency['max'],
             'errors': self.api_errors_count,
             'uptime': int(time.time() - self.api_start_time)
         }
     
-    def get_api_trend(self):
+    def get_api_trend(self, now=None):
         """Obtiene los datos de tendencias de la API"""
-        return self.api_history
+        ring = self.api_history
+        trend = {'calls': [], 'success_rate': [], 'response_time': [], 'errors': [],
+                 'response_time_p50': [], 'response_time_p95': [], 'response_time_p99': [], 'response_time_max': []}
+        with self.lock:
+            for _, slot in ring.window(now):
+                calls = ring.calls[slot] if slot is not None else 0
+                errors = ring.errors[slot] if slot is not None else 0
+                trend['calls'].append(calls)
+                trend['errors'].append(errors)
+                trend['success_rate'].append(round(((calls - errors) / calls) * 100) if calls else 100)
+                trend['response_time'].append(ring.latency_sum[slot] / calls if calls else 0)
+                latency = ring.latency[slot].summary() if calls else {'p50': 0, 'p95': 0, 'p99': 0}
+                trend['response_time_p50'].append(latency['p50'])
+                trend['response_time_p95'].append(latency['p95'])
+                trend['response_time_p99'].append(latency['p99'])
+                trend['response_time_max'].append(ring.latency_max[slot] if calls else 0)
+        return trend
     
-    def get_hours(self):
+    def get_hours(self, now=None):
         """Obtiene las horas para el historial"""
-        return self.api_hours
+        bucket_seconds = self.api_history.bucket_seconds
+        return [datetime.fromtimestamp(epoch * bucket_seconds).strftime('%H:%M') for epoch, _ in self.api_history.window(now)]
+    
+    def get_cache_stats(self):
+        """Obtiene las estadísticas de la caché de respuestas"""
+        total = self.cache_hits + self.cache_stale_hits + self.cache_misses
+        hit_rate = 0
+        if total > 0:
+            hit_rate = ((self.cache_hits + self.cache_stale_hits) / total) * 100
+        
+        return {
+            'hits': self.cache_hits,
+            'stale_hits': self.cache_stale_hits,
+            'misses': self.cache_misses,
+            'coalesced': self.coalesced_calls,
+            'hit_rate': hit_rate
+        }
+    
+    def get_breakdown(self, limit=5):
+        """Desglose por ruta, feed y estado, con los valores más lentos y con más errores"""
+        with self.lock:
+            breakdown = {dimension: self.dimensions.summaries(dimension) for dimension in ('route', 'feed', 'status')}
+        for summaries in breakdown.values():
+            summaries.sort(key=lambda item: item['calls'], reverse=True)
+        
+        # Los estados no son una fuente de lentitud: los peores se buscan entre rutas y feeds
+        candidates = [item for item in breakdown['route'] + breakdown['feed'] if item['calls'] > 0]
+        breakdown['slowest'] = sorted(candidates, key=lambda item: item['response_time_p95'], reverse=True)[:limit]
+        breakdown['most_errors'] = sorted(
+            [item for item in candidates if item['errors'] > 0],
+            key=lambda item: (item['error_rate'], item['errors']), reverse=True
+        )[:limit]
+        return breakdown
+    
+    def get_latency_histogram(self):
+        """Copia del histograma de tiempos de respuesta de todas las llamadas"""
+        with self.lock:
+            return self.api_latency.copy()
+    
+    def sync(self):
+        """Con almacén compartido, actualiza las estadísticas con las de todos los procesos"""
+        if self.store is not None:
+            self.sync_store()
     
     def get_dashboard_data(self):
         """Obtiene los datos para el dashboard"""
+        # Con almacén compartido el dashboard muestra el total de todos los procesos
+        self.sync()
         return {
             'api_stats': self.get_api_stats(),
             'api_trend': self.get_api_trend(),
-            'hours': self.get_hours()
+            'hours': self.get_hours(),
+            'cache_stats': self.get_cache_stats(),
+            'breakdown': self.get_breakdown()
         }
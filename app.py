@@ -1,12 +1,34 @@
 import os
-import requests
 import time
-from flask import Flask, render_template, jsonify, request, redirect, url_for, session
-from datetime import datetime, timedelta
+from flask import Flask, render_template, jsonify, request, redirect, url_for, session, g, Response
+from datetime import datetime, timedelta, timezone
+from urllib.parse import urlsplit, parse_qs
 from dotenv import load_dotenv
 from api_stats_manager import ApiStatsManager
+from stats_store import SqliteStatsStore
+from response_cache import ResponseCache
+from feed_snapshot import FeedSnapshot, redact_credentials
+from match_store import MatchStore
+from history_sync import HistorySync, STATE_NAME as HISTORY_SYNC_STATE
+from standings_engine import StandingsEngine
+from fixture_index import FixtureIndex, IndexCache
+from live_stream import LiveBroadcaster, error_stream
+from feed_versions import FeedVersions
+from payloads import lean_standings, lean_matches, lean_fixtures, lean_row, parse_fields, project, MATCH_FIELDS
+from json_provider import FastJSONProvider
+from upstream_client import UpstreamClient
+from single_flight import SingleFlight
+from feed_refresher import FeedRefresher
+from polling_policy import MatchWindowPolicy
+from compression import compress_response, send_static
+from metrics_exporter import render_openmetrics, OPENMETRICS_CONTENT_TYPE
 from functools import wraps
 import sys
+import atexit
+import hmac
+import base64
+import json
+import requests
 
 # Cargar variables de entorno desde el archivo .env
 load_dotenv()
@@ -27,6 +49,8 @@ if missing_vars:
     sys.exit(1)
 
 app = Flask(__name__)
+# JSON de las respuestas con orjson si está instalado (opcional) y sin ordenar claves
+app.json = FastJSONProvider(app)
 app.config['SECRET_KEY'] = os.getenv('SECRET_KEY')
 
 # Configuración de sesión
@@ -45,13 +69,296 @@ STANDINGS_URL = f'https://livescore-api.com/api-client/leagues/table.json?compet
 FIXTURES_URL = f'https://livescore-api.com/api-client/fixtures/matches.json?competition_id=45&key={LIVESCORE_API_KEY}&secret={LIVESCORE_API_SECRET}'
 HISTORY_URL = f'https://livescore-api.com/api-client/scores/history.json?competition_id=45&page=93&key={LIVESCORE_API_KEY}&secret={LIVESCORE_API_SECRET}'
 TOPSCORERS_URL = f'https://livescore-api.com/api-client/competitions/topscorers.json?competition_id=45&key={LIVESCORE_API_KEY}&secret={LIVESCORE_API_SECRET}'
+RESULTS_URL = f'https://livescore-api.com/api-client/scores/history.json?competition_id=45&page=1&key={LIVESCORE_API_KEY}&secret={LIVESCORE_API_SECRET}'
+HISTORY_PAGE_URL = f'https://livescore-api.com/api-client/scores/history.json?competition_id=45&page={{page}}&key={LIVESCORE_API_KEY}&secret={LIVESCORE_API_SECRET}'
+
+# Nombre de cada feed de LiveScore, para el desglose de las estadísticas
+FEED_NAMES = {
+    STANDINGS_URL: 'standings',
+    FIXTURES_URL: 'fixtures',
+    HISTORY_URL: 'history',
+    RESULTS_URL: 'results',
+    TOPSCORERS_URL: 'topscorers'
+}
+
+def feed_for_url(url):
+    """Devuelve el nombre del feed al que pertenece una URL de LiveScore"""
+    if url in FEED_NAMES:
+        return FEED_NAMES[url]
+    return 'history' if 'scores/history' in url else 'other'
+
+# Tiempo de vida en caché (segundos) de cada feed de LiveScore
+CACHE_TTLS = {
+    'standings': 600,    # La tabla solo cambia al terminar los partidos
+    'fixtures': 1800,    # El calendario casi no cambia durante la semana
+    'history': 3600,     # Las páginas del historial son resultados ya cerrados
+    'results': 120,      # Los resultados recientes cambian durante la jornada
+    'topscorers': 900
+}
+
+# Página del historial que se muestra por defecto en /api/history
+HISTORY_PAGE = 93
+
+# Partidos por página de /api/history (por defecto y máximo)
+HISTORY_PAGE_SIZE = 20
+HISTORY_MAX_PAGE_SIZE = 100
+
+# Antigüedad máxima (segundos) de una página del historial guardada localmente para servirla sin consultar LiveScore
+HISTORY_STORE_MAX_AGE = int(os.getenv('HISTORY_STORE_MAX_AGE', '86400'))
+
+# Sincronización incremental del historial: cada cuántos segundos y máximo de páginas por ejecución.
+# Necesita que el archivo de partidos se conserve entre arranques; en Vercel (disco efímero) cada
+# arranque en frío repetiría la primera sincronización, así que ahí está desactivada por defecto
+HISTORY_SYNC = os.getenv('HISTORY_SYNC', '0' if os.getenv('VERCEL') else '1') == '1'
+HISTORY_SYNC_SECONDS = int(os.getenv('HISTORY_SYNC_SECONDS', '21600'))
+HISTORY_SYNC_MAX_PAGES = int(os.getenv('HISTORY_SYNC_MAX_PAGES', '25'))
+
+# Intervalo (segundos) de refresco en segundo plano de los feeds que no dependen de los partidos
+REFRESH_INTERVALS = {
+    'fixtures': 900,
+    'history': 1800,
+    'topscorers': 600
+}
+
+# Tamaño mínimo (bytes) para comprimir una respuesta dinámica
+COMPRESS_MIN_SIZE = int(os.getenv('COMPRESS_MIN_SIZE', '500'))
+
+# Token opcional para /metrics (Authorization: Bearer <token>); sin él la ruta es pública
+METRICS_TOKEN = os.getenv('METRICS_TOKEN')
+
+# Refrescar los feeds en segundo plano para no consultar LiveScore durante las peticiones
+BACKGROUND_REFRESH = os.getenv('BACKGROUND_REFRESH', '1') == '1'
+
+# Intervalos (segundos) de resultados y tabla durante los partidos y fuera de ellos
+LIVE_POLL_SECONDS = int(os.getenv('LIVE_POLL_SECONDS', '45'))
+IDLE_POLL_SECONDS = int(os.getenv('IDLE_POLL_SECONDS', '10800'))
+
+# Cliente HTTP compartido (un pool de conexiones persistentes por worker)
+upstream = UpstreamClient(
+    pool_size=int(os.getenv('UPSTREAM_POOL_SIZE', '10')),
+    max_retries=int(os.getenv('UPSTREAM_MAX_RETRIES', '2')),
+    backoff_factor=float(os.getenv('UPSTREAM_BACKOFF_FACTOR', '0.3')),
+    timeout=10
+)
+
+# Plazo máximo (segundos) para un grupo de consultas en paralelo a LiveScore
+UPSTREAM_DEADLINE = float(os.getenv('UPSTREAM_DEADLINE', '12'))
+
+# Último número de páginas conocido del historial, para pedir la última página en paralelo
+last_history_total_pages = None
+
+# Con varios workers (gunicorn, systemd) las estadísticas se comparten en SQLite: API_STATS_BACKEND=sqlite
+API_STATS_BACKEND = os.getenv('API_STATS_BACKEND', 'json').lower()
+stats_store = None
+if API_STATS_BACKEND == 'sqlite':
+    stats_store = SqliteStatsStore(
+        os.getenv('API_STATS_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'api_stats.db'))
+    )
 
 # Inicializar el administrador de estadísticas de API
-api_stats = ApiStatsManager(history_intervals=48)
+# (las estadísticas se guardan en segundo plano cada API_STATS_FLUSH_SECONDS o tras API_STATS_FLUSH_EVERY llamadas)
+api_stats = ApiStatsManager(
+    history_intervals=48,
+    flush_interval=float(os.getenv('API_STATS_FLUSH_SECONDS', '10')),
+    flush_every=int(os.getenv('API_STATS_FLUSH_EVERY', '50')),
+    store=stats_store
+)
+
+# Último dato bueno de cada feed en disco, para responder de inmediato tras un reinicio.
+# Solo sirve con disco persistente (systemd, un servidor propio): en Vercel cada arranque en frío
+# empieza con /tmp vacío y data/ es de solo lectura, así que ahí no hay snapshot que leer
+feed_snapshot = FeedSnapshot(
+    os.getenv('FEED_SNAPSHOT_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'feed_snapshot.json'))
+)
+atexit.register(feed_snapshot.flush)
+
+# Archivo local de partidos del historial (solo se conserva con disco persistente, p. ej. systemd)
+try:
+    match_store = MatchStore(
+        os.getenv('MATCH_STORE_PATH', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'data', 'matches.db'))
+    )
+except Exception as e:
+    print(f"Error al abrir el archivo de partidos, el historial se consultará en LiveScore: {str(e)}")
+    match_store = None
+
+# Caché de respuestas de LiveScore (solo se guardan respuestas exitosas)
+response_cache = ResponseCache(
+    stale_ttl=3600,
+    cacheable=lambda data: isinstance(data, dict) and bool(data.get('success')),
+    on_event=lambda event, url: api_stats.track_cache_event(event, feed=feed_for_url(url)),
+    snapshot=feed_snapshot
+)
+
+# Agrupa las consultas simultáneas a la misma URL de LiveScore en una sola llamada
+upstream_flight = SingleFlight(on_collapse=api_stats.track_coalesced_call)
 
 # Función para registrar estadísticas de API
-def track_api_call(success, response_time):
-    api_stats.track_api_call(success, response_time)
+def track_api_call(success, response_time, feed=None, status=None):
+    api_stats.track_api_call(success, response_time, feed=feed, status=status)
+
+# Clase de estado de una respuesta ('2xx', '5xx') o del error de una llamada fallida
+def status_class(response=None, error=None):
+    if isinstance(error, requests.Timeout):
+        return 'timeout'
+    # Un HTTPError trae su respuesta; un error al leer el cuerpo (p. ej. un 502 sin JSON) usa la recibida
+    if getattr(error, 'response', None) is not None:
+        response = error.response
+    status_code = getattr(response, 'status_code', None)
+    if isinstance(status_code, int):
+        return f'{status_code // 100}xx'
+    return 'error' if error is not None else 'unknown'
+
+# Función para consultar la API de LiveScore (las consultas simultáneas a una URL se agrupan)
+def fetch_upstream(url):
+    return upstream_flight.do(url, lambda: request_upstream(url))
+
+# Función que hace la llamada real a LiveScore y la registra en las estadísticas
+# (las páginas del historial se guardan en el archivo local, salvo con ingest=False)
+def request_upstream(url, ingest=True):
+    feed = feed_for_url(url)
+    response = None
+    started = time.perf_counter()
+    try:
+        response = upstream.get(url)
+        data = response.json()
+    except Exception as e:
+        # Un fallo sin respuesta también tardó (p. ej. un tiempo agotado): se registra lo que esperó
+        track_api_call(False, time.perf_counter() - started, feed=feed, status=status_class(response, e))
+        raise
+    # Un 4xx/5xx con cuerpo JSON también es una llamada fallida
+    status = status_class(response)
+    track_api_call(status not in ('4xx', '5xx'), response.elapsed.total_seconds(), feed=feed, status=status)
+    if ingest and feed in ('history', 'results'):
+        ingest_history_page(url, data)
+    return data
+
+# Número de página de una URL del historial de LiveScore
+def history_page_number(url):
+    return int(parse_qs(urlsplit(url).query).get('page', ['1'])[0])
+
+# Guardar en el archivo local los partidos de una página del historial recién descargada
+def ingest_history_page(url, data):
+    if match_store is None or not (isinstance(data, dict) and data.get('success')):
+        return
+    page = history_page_number(url)
+    try:
+        match_store.ingest_page(page, data)
+    except Exception as e:
+        # Se registra solo el número de página: la URL lleva key= y secret=
+        print(f"Error al guardar la página {page} del historial: {redact_credentials(e)}")
+
+# Resultados y tabla se consultan seguido solo cuando hay partidos en juego o por comenzar
+match_window_policy = MatchWindowPolicy(
+    get_fixtures=lambda: response_cache.peek(FIXTURES_URL, track=False),
+    get_results=lambda: response_cache.peek(RESULTS_URL, track=False),
+    live_interval=LIVE_POLL_SECONDS,
+    idle_interval=IDLE_POLL_SECONDS
+)
+
+# Refresco en segundo plano de los feeds principales
+feed_refresher = FeedRefresher(response_cache, fetch_upstream)
+feed_refresher.add_feed('standings', STANDINGS_URL, match_window_policy.interval)
+feed_refresher.add_feed('fixtures', FIXTURES_URL, REFRESH_INTERVALS['fixtures'])
+feed_refresher.add_feed('history', HISTORY_URL, REFRESH_INTERVALS['history'])
+feed_refresher.add_feed('results', RESULTS_URL, match_window_policy.interval)
+feed_refresher.add_feed('topscorers', TOPSCORERS_URL, REFRESH_INTERVALS['topscorers'])
+
+# Marcadores en vivo para /api/live/stream: se alimenta de los refrescos del feed de resultados,
+# así que los navegadores conectados no generan consultas adicionales a LiveScore
+live_broadcaster = LiveBroadcaster(max_clients=int(os.getenv('LIVE_STREAM_MAX_CLIENTS', '100')))
+feed_refresher.add_listener(lambda name, data: live_broadcaster.update(data) if name == 'results' else None)
+
+# Consulta el feed de resultados (en caché) para las conexiones en vivo cuando no corre el refresco
+def poll_live_results():
+    data = fetch_feed('results', RESULTS_URL)
+    if isinstance(data, dict) and data.get('success'):
+        live_broadcaster.update(data)
+
+LIVE_STREAM_HEADERS = {
+    'Cache-Control': 'no-store',
+    # nginx no debe acumular los eventos antes de enviarlos
+    'X-Accel-Buffering': 'no'
+}
+
+# Página del historial para la sincronización (ella misma la guarda en el archivo local)
+def fetch_history_page(page):
+    url = HISTORY_PAGE_URL.format(page=page)
+    return upstream_flight.do(url, lambda: request_upstream(url, ingest=False))
+
+# Sincronización incremental del historial completo con el archivo local
+history_sync = None
+if match_store is not None and HISTORY_SYNC:
+    history_sync = HistorySync(match_store, fetch_history_page, max_pages=HISTORY_SYNC_MAX_PAGES)
+    feed_refresher.add_job('history_sync', history_sync.run, HISTORY_SYNC_SECONDS)
+
+# Tabla de posiciones calculada con los resultados del archivo local (tablas históricas y respaldo del feed)
+standings_engine = StandingsEngine(match_store) if match_store is not None else None
+
+# Función para obtener un feed de LiveScore a través de la caché
+def fetch_feed(feed, url):
+    # Los feeds refrescados en segundo plano se sirven desde memoria aunque estén vencidos
+    if feed_refresher.manages(url):
+        data = response_cache.peek(url)
+        if data is not None:
+            return data
+    return response_cache.get(url, lambda: fetch_upstream(url), CACHE_TTLS[feed])
+
+# Iniciar el refresco en segundo plano con la primera petición de cada worker
+@app.before_request
+def start_background_refresh():
+    if BACKGROUND_REFRESH and not feed_refresher.is_running():
+        feed_refresher.start()
+
+# Medir el tiempo de cada ruta (este after_request se registra primero, así que corre al final)
+@app.before_request
+def start_request_timer():
+    g.request_started = time.perf_counter()
+
+@app.after_request
+def track_route_timing(response):
+    started = g.get('request_started')
+    if started is not None and request.endpoint != 'static':
+        api_stats.track_request(request.endpoint or 'not_found', response.status_code, time.perf_counter() - started)
+    return response
+
+# Comprimir las respuestas con gzip/brotli según Accept-Encoding. Flask ejecuta los after_request
+# en orden inverso al de registro, así que esto corre después de agregar el ETag
+@app.after_request
+def compress_dynamic_response(response):
+    return compress_response(response, request, min_size=COMPRESS_MIN_SIZE)
+
+# Servir los archivos estáticos precomprimidos (.br/.gz) generados por precompress_static.py
+def static_precompressed(filename):
+    return send_static(app.static_folder, filename, request, max_age=app.get_send_file_max_age(filename))
+
+app.view_functions['static'] = static_precompressed
+
+# Feeds de los que depende cada ruta cuya respuesta se arma solo con datos de LiveScore
+# (el dashboard y bootstrap incluyen estadísticas en vivo, el historial puede salir del archivo
+# local y la jornada actual del calendario depende de la fecha de hoy, así que solo usan ETag)
+ENDPOINT_FEEDS = {
+    'get_standings': [STANDINGS_URL],
+    'get_results': [RESULTS_URL],
+    'get_metrics': [TOPSCORERS_URL, STANDINGS_URL]
+}
+
+# Agregar ETag y Last-Modified a las respuestas de la API y responder 304 si no cambiaron
+@app.after_request
+def add_conditional_headers(response):
+    if (request.method != 'GET' or not request.path.startswith('/api/')
+            or response.status_code != 200 or response.is_streamed):
+        return response
+    
+    response.add_etag()
+    # Las respuestas calculadas con el archivo local (g.local_data) no tienen la fecha del feed
+    fetched_times = [] if g.get('local_data') else [
+        response_cache.fetched_at(url) for url in ENDPOINT_FEEDS.get(request.endpoint, [])
+    ]
+    if fetched_times and all(fetched_times):
+        response.last_modified = datetime.fromtimestamp(max(fetched_times), tz=timezone.utc)
+    # El navegador puede guardar la respuesta pero debe revalidarla en cada uso
+    response.headers['Cache-Control'] = 'private, no-cache'
+    return response.make_conditional(request)
 
 # Función para verificar reCAPTCHA
 def verify_recaptcha(recaptcha_response):
@@ -59,7 +366,7 @@ def verify_recaptcha(recaptcha_response):
         'secret': RECAPTCHA_SECRET_KEY,
         'response': recaptcha_response
     }
-    response = requests.post('https://www.google.com/recaptcha/api/siteverify', data=payload, timeout=10)
+    response = upstream.post('https://www.google.com/recaptcha/api/siteverify', data=payload)
     result = response.json()
     return result.get('success', False)
 
@@ -97,160 +404,422 @@ def verify():
 def index():
     return render_template('index.html')
 
+# Funciones que arman la respuesta de cada sección (usadas por su ruta y por /api/bootstrap)
+# Respuestas de LiveScore reducidas al esquema que usa el navegador, una vez por cada refresco del feed
+standings_payload = IndexCache(lean_standings)
+fixtures_payload = IndexCache(lean_fixtures)
+results_payload = IndexCache(lean_matches)
+
+def build_standings(season=None, as_of_round=None, as_of_date=None):
+    # La tabla a una jornada o fecha (o de otro torneo) se calcula con los resultados guardados
+    if season is not None or as_of_round is not None or as_of_date is not None:
+        return computed_standings(season, as_of_round, as_of_date)
+    
+    # Si el feed de la tabla falla (error de LiveScore, tiempo agotado o error de conexión),
+    # se responde con la tabla calculada
+    try:
+        data = standings_payload.get(fetch_feed('standings', STANDINGS_URL))
+    except Exception:
+        computed = computed_standings()
+        if computed.get('success'):
+            return computed
+        raise
+    
+    if not data.get('success'):
+        computed = computed_standings()
+        if computed.get('success'):
+            return computed
+    
+    return data
+
+# Versiones recientes de la tabla y de los resultados para las respuestas ?since=<versión>
+standings_versions = FeedVersions(lambda data: data['data'].get('table'), 'name')
+results_versions = FeedVersions(lambda data: data['data'].get('match'), 'id')
+
+def with_version(data, versions, since=None):
+    """Agrega la versión a la respuesta de un feed o, con since, responde solo las filas que cambiaron
+
+    Si la versión since ya no se conoce (o es de otro worker con otros datos) se responde completa.
+    """
+    if not (isinstance(data, dict) and data.get('success') and isinstance(data.get('data'), dict)):
+        return data
+    version = versions.observe(data)
+    if since is not None:
+        delta = versions.delta(since)
+        if delta is not None:
+            return {'success': True, 'delta': True, 'data': delta}
+    return {**data, 'version': version}
+
+def computed_standings(season=None, as_of_round=None, as_of_date=None):
+    if standings_engine is None:
+        return {'success': False, 'error': 'El historial local no está disponible'}
+    standings = standings_engine.standings(season=season, as_of_round=as_of_round, as_of_date=as_of_date)
+    if standings is None:
+        return {'success': False, 'error': 'No hay resultados guardados para calcular la tabla'}
+    return {'success': True, 'data': {**standings, 'source': 'local'}}
+
+# Índice por jornada de los partidos programados, construido una vez por cada refresco del feed
+fixture_index = IndexCache(lambda data: FixtureIndex(data['data']['fixtures']))
+
+def build_fixtures(match_round=None):
+    data = fixtures_payload.get(fetch_feed('fixtures', FIXTURES_URL))
+    
+    # Verifica que la respuesta tenga el campo "fixtures"
+    if data.get("success") and "data" in data and "fixtures" in data["data"]:
+        index = fixture_index.get(data)
+        current_round = index.current_round()
+        if match_round is None:
+            match_round = current_round
+        # Se copia la respuesta para no modificar la versión guardada en caché
+        data = {**data, "data": {
+            **data["data"],
+            "fixtures": index.get(match_round) if match_round is not None else [],
+            "round": match_round,
+            "current_round": current_round,
+            "rounds": index.round_names()
+        }}
+    
+    return data
+
+def build_history(page=HISTORY_PAGE):
+    # Las páginas ya guardadas en el archivo local no se vuelven a pedir a LiveScore
+    if match_store is not None:
+        data = match_store.get_page(page, max_age=HISTORY_STORE_MAX_AGE)
+        if data is not None:
+            return lean_matches(data)
+    return lean_matches(fetch_feed('history', HISTORY_PAGE_URL.format(page=page)))
+
+# Cursor opaco de paginación del historial a partir de la clave (fecha, hora, id) del último partido
+def encode_history_cursor(key):
+    return base64.urlsafe_b64encode(json.dumps(list(key)).encode('utf-8')).decode('ascii').rstrip('=')
+
+def decode_history_cursor(cursor):
+    try:
+        key = json.loads(base64.urlsafe_b64decode(cursor + '=' * (-len(cursor) % 4)))
+    except Exception:
+        raise ValueError('Cursor no válido')
+    if not (isinstance(key, list) and len(key) == 3 and all(isinstance(value, str) for value in key)):
+        raise ValueError('Cursor no válido')
+    return tuple(key)
+
+# Indica si el archivo local ya tiene partidos para responder /api/history
+def history_store_ready():
+    return match_store is not None and match_store.total() > 0
+
+def query_history(team=None, date_from=None, date_to=None, match_round=None, page=1, page_size=HISTORY_PAGE_SIZE, cursor=None):
+    """Busca en el archivo local de partidos, del más reciente al más antiguo
+
+    Con cursor (next_cursor de la respuesta anterior) la página sigue desde el último partido
+    entregado sin recorrer los anteriores; con page se salta a una página cualquiera.
+    """
+    # Sin archivo local solo se puede mostrar la página del historial de LiveScore
+    if not history_store_ready():
+        return build_history()
+    
+    filters = {'team': team, 'date_from': date_from, 'date_to': date_to, 'match_round': match_round}
+    
+    after = decode_history_cursor(cursor) if cursor else None
+    offset = 0 if after is not None else (page - 1) * page_size
+    matches, last_key = match_store.query_page(limit=page_size, offset=offset, after=after, **filters)
+    total = match_store.count(**filters)
+    return {'success': True, 'data': {
+        'match': [lean_row(match, MATCH_FIELDS) for match in matches],
+        'page': None if after is not None else page,
+        'page_size': page_size,
+        'total': total,
+        'total_pages': (total + page_size - 1) // page_size,
+        'next_cursor': encode_history_cursor(last_key) if last_key is not None else None
+    }}
+
+def build_results():
+    # Usamos la misma URL que history pero con página diferente para obtener resultados más recientes
+    return results_payload.get(fetch_feed('results', RESULTS_URL))
+
+def build_metrics():
+    # Obtener en paralelo los máximos goleadores y la tabla de posiciones (para los goles por equipo)
+    feeds = upstream.run_parallel({
+        'topscorers': lambda: fetch_feed('topscorers', TOPSCORERS_URL),
+        'standings': lambda: fetch_feed('standings', STANDINGS_URL)
+    }, deadline=UPSTREAM_DEADLINE)
+    topscorers_data = feeds['topscorers']
+    standings_data = feeds['standings']
+    
+    # Procesar datos de goles por equipo desde la tabla de posiciones
+    goals_by_team = []
+    if standings_data.get('success') and standings_data.get('data') and standings_data.get('data').get('table'):
+        for team in standings_data['data']['table']:
+            goals_by_team.append({
+                'team': team['name'],
+                'scored': team['goals_scored'],
+                'conceded': team['goals_conceded']
+            })
+        
+        # Ordenar equipos por goles anotados (de más a menos)
+        goals_by_team = sorted(goals_by_team, key=lambda x: int(x['scored']), reverse=True)
+    
+    # Crear objeto de respuesta con datos reales
+    metrics = {
+        'top_scorers': topscorers_data.get('data', {}).get('topscorers', []),
+        'goals_by_team': goals_by_team
+    }
+    
+    return {'success': True, 'data': metrics}
+
+# Número exacto de partidos del archivo local, o None mientras la sincronización no tenga todo el historial
+def stored_match_counts():
+    if match_store is None:
+        return None
+    try:
+        if not match_store.get_state(HISTORY_SYNC_STATE, {}).get('backfill_done'):
+            return None
+        return match_store.get_counts()
+    except Exception as e:
+        print(f"Error al leer los contadores de partidos: {str(e)}")
+        return None
+
+# Estimación del total de partidos con la primera y la última página del historial
+# (solo se usa si no hay archivo local completo)
+def estimate_total_matches():
+    global last_history_total_pages
+    
+    total_matches = 0
+    
+    # Obtener datos de resultados para contar partidos jugados. Si ya conocemos el número
+    # de páginas, la última página se pide en paralelo con la primera
+    guessed_pages = last_history_total_pages
+    tasks = {'first': lambda: fetch_feed('results', RESULTS_URL)}
+    if guessed_pages and guessed_pages > 1:
+        tasks['last'] = lambda: fetch_feed('history', HISTORY_PAGE_URL.format(page=guessed_pages))
+    pages = upstream.run_parallel(tasks, deadline=UPSTREAM_DEADLINE)
+    results_data = pages['first']
+    
+    # Contar partidos de la primera página
+    if results_data.get('success') and results_data.get('data') and results_data.get('data').get('match'):
+        total_matches += len(results_data['data']['match'])
+        
+        # Obtener el número total de páginas
+        total_pages = results_data.get('data', {}).get('total_pages', 1)
+        last_history_total_pages = total_pages
+        
+        # Si hay más páginas, consultar la última para estimar el total
+        if total_pages > 1:
+            # Usar la última página pedida en paralelo, o pedirla si el número de páginas cambió
+            if guessed_pages == total_pages:
+                last_page_data = pages['last']
+            else:
+                last_page_data = fetch_feed('history', HISTORY_PAGE_URL.format(page=total_pages))
+            
+            if last_page_data.get('success') and last_page_data.get('data') and last_page_data.get('data').get('match'):
+                # Calcular el total estimado de partidos
+                matches_per_page = len(results_data['data']['match'])  # Partidos en la primera página
+                last_page_matches = len(last_page_data['data']['match'])  # Partidos en la última página
+                
+                # Estimar el total: (páginas completas * partidos por página) + partidos de la última página
+                total_matches = ((total_pages - 1) * matches_per_page) + last_page_matches
+    
+    return total_matches
+
+def build_dashboard():
+    # Con el historial completo en el archivo local los totales son exactos y no se consulta LiveScore
+    counts = stored_match_counts()
+    if counts is not None:
+        total_matches = counts['total']
+    else:
+        total_matches = estimate_total_matches()
+    
+    # Obtener datos del dashboard desde el administrador de estadísticas
+    dashboard_data = api_stats.get_dashboard_data()
+    
+    # Agregar el total de partidos y el estado del refresco de cada feed
+    dashboard_data['total_matches'] = total_matches
+    dashboard_data['total_matches_exact'] = counts is not None
+    dashboard_data['matches_by_season'] = counts['seasons'] if counts is not None else {}
+    dashboard_data['matches_by_team'] = counts['teams'] if counts is not None else {}
+    dashboard_data['feeds'] = feed_refresher.get_status()
+    
+    return {'success': True, 'data': dashboard_data}
+
+# Secciones que se envían juntas en /api/bootstrap
+BOOTSTRAP_SECTIONS = {
+    'standings': lambda: with_version(build_standings(), standings_versions),
+    'fixtures': build_fixtures,
+    'history': query_history,
+    'results': lambda: with_version(build_results(), results_versions),
+    'metrics': build_metrics,
+    'dashboard': build_dashboard
+}
+
 @app.route('/api/standings')
 @human_required
 def get_standings():
     try:
-        response = requests.get(STANDINGS_URL, timeout=10)  # Añadido timeout
-        data = response.json()
-        
-        # If we need additional filtering for stage_id
-        if data.get('success') and data.get('data') and data.get('data').get('table'):
-            # The API request already includes stage_id=3105, but we can add additional filtering here if needed
-            pass
-            
-        track_api_call(True, response.elapsed.total_seconds())
-        return jsonify(data)
+        as_of_round = request.args.get('as_of_round')
+        as_of_date = request.args.get('as_of_date') or None
+        if as_of_round is not None:
+            if not as_of_round.isdigit() or int(as_of_round) < 1:
+                return jsonify({'error': 'as_of_round debe ser un número de jornada mayor a 0'}), 400
+            as_of_round = int(as_of_round)
+        if as_of_date is not None:
+            try:
+                datetime.strptime(as_of_date, '%Y-%m-%d')
+            except ValueError:
+                return jsonify({'error': 'La fecha as_of_date debe tener el formato AAAA-MM-DD'}), 400
+        if as_of_round is not None and as_of_date is not None:
+            return jsonify({'error': 'Usa as_of_round o as_of_date, no ambos'}), 400
+        season = request.args.get('season') or None
+        # ?fields=name,points deja solo esos campos en cada fila
+        fields = parse_fields(request.args.get('fields'))
+        if season is not None or as_of_round is not None or as_of_date is not None:
+            g.local_data = True
+            return jsonify(project(build_standings(season, as_of_round, as_of_date), 'table', fields))
+        # Tabla actual: con ?since=<versión> solo se envían los equipos que cambiaron
+        data = build_standings()
+        # Si el feed falló se respondió con la tabla calculada
+        g.local_data = (data.get('data') or {}).get('source') == 'local'
+        data = with_version(data, standings_versions, request.args.get('since') or None)
+        return jsonify(project(data, 'table', fields))
     except Exception as e:
-        track_api_call(False, 0)
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': redact_credentials(e)}), 500
 
-#Actualizar cada lunes
+# La jornada actual se calcula con las fechas de los partidos; ?round= para otra jornada
 @app.route('/api/fixtures')
 @human_required
 def get_fixtures():
     try:
-        response = requests.get(FIXTURES_URL, timeout=10)  # Añadido timeout
-        data = response.json()
-        
-        # Verifica que la respuesta tenga el campo "fixtures"
-        if data.get("success") and "data" in data and "fixtures" in data["data"]:
-            fixtures = data["data"]["fixtures"]
-            # Filtra solo los partidos cuyo round sea "13"
-            filtered_fixtures = [fixture for fixture in fixtures if fixture.get("round") == "14"]
-            data["data"]["fixtures"] = filtered_fixtures
-        
-        track_api_call(True, response.elapsed.total_seconds())
-        return jsonify(data)
+        data = build_fixtures(request.args.get('round') or None)
+        return jsonify(project(data, 'fixtures', parse_fields(request.args.get('fields'))))
     except Exception as e:
-        track_api_call(False, 0)
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': redact_credentials(e)}), 500
 
 
 @app.route('/api/history')
 @human_required
 def get_history():
     try:
-        response = requests.get(HISTORY_URL, timeout=10)  # Añadido timeout
-        data = response.json()
-        track_api_call(True, response.elapsed.total_seconds())
-        return jsonify(data)
+        page = request.args.get('page', 1, type=int)
+        page_size = request.args.get('page_size', HISTORY_PAGE_SIZE, type=int)
+        if page < 1:
+            return jsonify({'error': 'El número de página debe ser mayor a 0'}), 400
+        if not 1 <= page_size <= HISTORY_MAX_PAGE_SIZE:
+            return jsonify({'error': f'page_size debe estar entre 1 y {HISTORY_MAX_PAGE_SIZE}'}), 400
+        dates = {}
+        for name in ('from', 'to'):
+            value = request.args.get(name) or None
+            if value is not None:
+                try:
+                    datetime.strptime(value, '%Y-%m-%d')
+                except ValueError:
+                    return jsonify({'error': f'La fecha {name} debe tener el formato AAAA-MM-DD'}), 400
+            dates[name] = value
+        filters = {
+            'team': request.args.get('team') or None,
+            'date_from': dates['from'],
+            'date_to': dates['to'],
+            'match_round': request.args.get('round') or None
+        }
+        cursor = request.args.get('cursor') or None
+        # Los filtros y la paginación solo se pueden responder desde el archivo local
+        if not history_store_ready() and (any(filters.values()) or cursor or page != 1):
+            return jsonify({'success': False, 'error': 'El historial local aún no está disponible'}), 503
+        try:
+            data = query_history(page=page, page_size=page_size, cursor=cursor, **filters)
+            return jsonify(project(data, 'match', parse_fields(request.args.get('fields'))))
+        except ValueError as e:
+            return jsonify({'error': redact_credentials(e)}), 400
     except Exception as e:
-        track_api_call(False, 0)
-        return jsonify({'error': str(e)}), 500
+        return jsonify({'error': redact_credentials(e)}), 500
 
 @app.route('/api/results')
 @human_required
 def get_results():
     try:
-        # Usamos la misma URL que history pero con página diferente para obtener resultados más recientes
-        results_url = f'https://livescore-api.com/api-client/scores/history.json?competition_id=45&page=1&key={LIVESCORE_API_KEY}&secret={LIVESCORE_API_SECRET}'
-        response = requests.get(results_url, timeout=10)  # Añadido timeout
-        data = response.json()
-        track_api_call(True, response.elapsed.total_seconds())
-        return jsonify(data)
+        # Con ?since=<versión> solo se envían los partidos nuevos o que cambiaron
+        data = with_version(build_results(), results_versions, request.args.get('since') or None)
+        return jsonify(project(data, 'match', parse_fields(request.args.get('fields'))))
     except Exception as e:
-        track_api_call(False, 0)
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify({'success': False, 'error': redact_credentials(e)}), 500
 
 @app.route('/api/metrics')
 @human_required
 def get_metrics():
     try:
-        # Obtener datos reales de máximos goleadores
-        topscorers_response = requests.get(TOPSCORERS_URL, timeout=10)  # Añadido timeout
-        topscorers_data = topscorers_response.json()
-        
-        # Obtener datos de la tabla de posiciones para extraer información de goles
-        standings_response = requests.get(STANDINGS_URL, timeout=10)  # Añadido timeout
-        standings_data = standings_response.json()
-        
-        # Procesar datos de goles por equipo desde la tabla de posiciones
-        goals_by_team = []
-        if standings_data.get('success') and standings_data.get('data') and standings_data.get('data').get('table'):
-            for team in standings_data['data']['table']:
-                goals_by_team.append({
-                    'team': team['name'],
-                    'scored': team['goals_scored'],
-                    'conceded': team['goals_conceded']
-                })
-            
-            # Ordenar equipos por goles anotados (de más a menos)
-            goals_by_team = sorted(goals_by_team, key=lambda x: int(x['scored']), reverse=True)
-        
-        # Crear objeto de respuesta con datos reales
-        metrics = {
-            'top_scorers': topscorers_data.get('data', {}).get('topscorers', []),
-            'goals_by_team': goals_by_team
-        }
-        
-        track_api_call(True, topscorers_response.elapsed.total_seconds())
-        track_api_call(True, standings_response.elapsed.total_seconds())
-        return jsonify({'success': True, 'data': metrics})
+        return jsonify(build_metrics())
     except Exception as e:
-        track_api_call(False, 0)
-        track_api_call(False, 0)
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify({'success': False, 'error': redact_credentials(e)}), 500
 
 @app.route('/api/dashboard')
 @human_required
 def get_dashboard():
     try:
-        # Obtener datos reales de partidos jugados
-        total_matches = 0
-        
-        # Obtener datos de resultados para contar partidos jugados
-        results_url = f'https://livescore-api.com/api-client/scores/history.json?competition_id=45&key={LIVESCORE_API_KEY}&secret={LIVESCORE_API_SECRET}'
-        results_response = requests.get(results_url, timeout=10)  # Añadido timeout
-        results_data = results_response.json()
-        
-        # Contar partidos de la primera página
-        if results_data.get('success') and results_data.get('data') and results_data.get('data').get('match'):
-            total_matches += len(results_data['data']['match'])
-            
-            # Obtener el número total de páginas
-            total_pages = results_data.get('data', {}).get('total_pages', 1)
-            
-            # Si hay más páginas, consultar la última para estimar el total
-            if total_pages > 1:
-                # Obtener datos de la última página
-                last_page_url = f'https://livescore-api.com/api-client/scores/history.json?competition_id=45&page={total_pages}&key={LIVESCORE_API_KEY}&secret={LIVESCORE_API_SECRET}'
-                last_page_response = requests.get(last_page_url, timeout=10)  # Añadido timeout
-                last_page_data = last_page_response.json()
-                
-                if last_page_data.get('success') and last_page_data.get('data') and last_page_data.get('data').get('match'):
-                    # Calcular el total estimado de partidos
-                    matches_per_page = len(results_data['data']['match'])  # Partidos en la primera página
-                    last_page_matches = len(last_page_data['data']['match'])  # Partidos en la última página
-                    
-                    # Estimar el total: (páginas completas * partidos por página) + partidos de la última página
-                    total_matches = ((total_pages - 1) * matches_per_page) + last_page_matches
-        
-        # Obtener datos del dashboard desde el administrador de estadísticas
-        dashboard_data = api_stats.get_dashboard_data()
-        
-        # Agregar el total de partidos
-        dashboard_data['total_matches'] = total_matches
+        return jsonify(build_dashboard())
+    except Exception as e:
+        return jsonify({'success': False, 'error': redact_credentials(e)}), 500
+
+@app.route('/api/bootstrap')
+@human_required
+def get_bootstrap():
+    try:
+        # Precargar en paralelo todos los feeds distintos que usan las secciones; así cada
+        # sección se arma después desde la caché sin volver a esperar a LiveScore
+        feeds = {
+            'standings': STANDINGS_URL,
+            'fixtures': FIXTURES_URL,
+            'results': RESULTS_URL,
+            'topscorers': TOPSCORERS_URL
+        }
+        tasks = {feed: (lambda feed=feed, url=url: fetch_feed(feed, url)) for feed, url in feeds.items()}
+        # El historial puede salir del archivo local sin consultar LiveScore
+        tasks['history'] = query_history
+        # La última página solo hace falta para estimar el total de partidos del dashboard
+        if last_history_total_pages and last_history_total_pages > 1 and stored_match_counts() is None:
+            last_page_url = HISTORY_PAGE_URL.format(page=last_history_total_pages)
+            tasks['last_page'] = lambda: fetch_feed('history', last_page_url)
+        try:
+            upstream.run_parallel(tasks, deadline=UPSTREAM_DEADLINE)
+        except Exception as e:
+            # Las secciones afectadas reportan su propio error abajo
+            print(f"Error al precargar los feeds de bootstrap: {redact_credentials(e)}")
         
-        # Registrar las llamadas a la API
-        track_api_call(True, results_response.elapsed.total_seconds())
-        if 'last_page_response' in locals():
-            track_api_call(True, last_page_response.elapsed.total_seconds())
+        # Cada sección lleva la misma respuesta que su ruta individual, incluyendo sus errores
+        sections = {}
+        for name, build in BOOTSTRAP_SECTIONS.items():
+            try:
+                sections[name] = build()
+            except Exception as e:
+                sections[name] = {'success': False, 'error': redact_credentials(e)}
         
-        return jsonify({'success': True, 'data': dashboard_data})
+        return jsonify({'success': True, 'data': sections})
     except Exception as e:
-        track_api_call(False, 0)
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return jsonify({'success': False, 'error': redact_credentials(e)}), 500
+
+# Marcadores en vivo (Server-Sent Events): el estado completo al conectarse y después solo los cambios
+@app.route('/api/live/stream')
+@human_required
+def live_stream():
+    if not live_broadcaster.has_data():
+        # Sin refresco en segundo plano (o antes del primero) se usa la última respuesta en caché
+        try:
+            poll_live_results()
+        except Exception as e:
+            print(f"Error al obtener los resultados en vivo: {redact_credentials(e)}")
+            # Con un 200 el navegador vuelve a conectarse solo (con un error EventSource se detiene)
+            return Response(error_stream('No se pudieron consultar los resultados'),
+                            mimetype='text/event-stream', headers=LIVE_STREAM_HEADERS)
+    subscription = live_broadcaster.subscribe()
+    if subscription is None:
+        return jsonify({'error': 'Demasiadas conexiones en vivo, intente más tarde'}), 503
+    # Sin el hilo de refresco cada conexión consulta el feed en caché en cada keep-alive
+    poll = None if feed_refresher.is_running() else poll_live_results
+    return Response(live_broadcaster.stream(subscription, poll), mimetype='text/event-stream',
+                    headers=LIVE_STREAM_HEADERS)
+
+# Métricas en formato OpenMetrics para Prometheus (no consulta LiveScore)
+@app.route('/metrics')
+def metrics():
+    if METRICS_TOKEN and not hmac.compare_digest(request.headers.get('Authorization', ''), f'Bearer {METRICS_TOKEN}'):
+        return 'Unauthorized', 401, {'WWW-Authenticate': 'Bearer'}
+    body = render_openmetrics(api_stats, feeds=feed_refresher.get_status())
+    return body, 200, {'Content-Type': OPENMETRICS_CONTENT_TYPE, 'Cache-Control': 'no-store'}
 
 if __name__ == '__main__':
     port = int(os.environ.get('PORT', 5000))
@@ -0,0 +1,90 @@
+import gzip
+import mimetypes
+import os
+from flask import send_from_directory
+from werkzeug.security import safe_join
+
+# Brotli es opcional: si no está instalado solo se usa gzip
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+# Tipos de contenido que vale la pena comprimir (las imágenes PNG ya están comprimidas)
+COMPRESSIBLE_MIMETYPES = {
+    'application/json',
+    'application/javascript',
+    'text/javascript',
+    'text/css',
+    'text/html',
+    'text/plain',
+    'image/svg+xml'
+}
+
+# Extensión de los archivos precomprimidos según la codificación
+PRECOMPRESSED_EXTENSIONS = {'br': '.br', 'gzip': '.gz'}
+
+def available_encodings():
+    """Codificaciones soportadas, en orden de preferencia"""
+    return ['br', 'gzip'] if brotli is not None else ['gzip']
+
+def choose_encoding(request, encodings=None):
+    """Elige la mejor codificación aceptada por el cliente, o None"""
+    encodings = encodings or available_encodings()
+    accepted = [encoding for encoding in encodings if request.accept_encodings[encoding] > 0]
+    if not accepted:
+        return None
+    # Entre las aceptadas se respeta la calidad pedida por el cliente y luego nuestra preferencia
+    return max(accepted, key=lambda encoding: (request.accept_encodings[encoding], -encodings.index(encoding)))
+
+def compress(data, encoding, level=6):
+    """Comprime los datos con la codificación indicada"""
+    if encoding == 'br':
+        return brotli.compress(data, quality=min(level, 11))
+    return gzip.compress(data, compresslevel=level, mtime=0)
+
+def compress_response(response, request, min_size=500, level=6):
+    """Comprime una respuesta dinámica si el cliente lo acepta y vale la pena"""
+    if (response.status_code != 200 or response.direct_passthrough or response.is_streamed
+            or 'Content-Encoding' in response.headers
+            or response.mimetype not in COMPRESSIBLE_MIMETYPES):
+        return response
+
+    response.vary.add('Accept-Encoding')
+    data = response.get_data()
+    if len(data) < min_size:
+        return response
+
+    encoding = choose_encoding(request)
+    if encoding is None:
+        return response
+
+    response.set_data(compress(data, encoding, level))
+    response.headers['Content-Encoding'] = encoding
+    # La versión comprimida es equivalente a la original: el ETag pasa a ser débil
+    etag, weak = response.get_etag()
+    if etag and not weak:
+        response.set_etag(etag, weak=True)
+    return response
+
+def send_static(directory, filename, request, max_age=None):
+    """Envía un archivo estático, usando su versión precomprimida (.br/.gz) si existe y está al día"""
+    path = safe_join(directory, filename)
+    mimetype = mimetypes.guess_type(filename)[0]
+
+    if path and os.path.isfile(path) and mimetype in COMPRESSIBLE_MIMETYPES:
+        encodings = [encoding for encoding in ['br', 'gzip']
+                     if os.path.isfile(path + PRECOMPRESSED_EXTENSIONS[encoding])
+                     and os.path.getmtime(path + PRECOMPRESSED_EXTENSIONS[encoding]) >= os.path.getmtime(path)]
+        encoding = choose_encoding(request, encodings) if encodings else None
+        if encoding:
+            response = send_from_directory(directory, filename + PRECOMPRESSED_EXTENSIONS[encoding],
+                                           mimetype=mimetype, max_age=max_age)
+            response.headers['Content-Encoding'] = encoding
+            response.vary.add('Accept-Encoding')
+            return response
+
+    response = send_from_directory(directory, filename, max_age=max_age)
+    if mimetype in COMPRESSIBLE_MIMETYPES:
+        response.vary.add('Accept-Encoding')
+    return response
@@ -0,0 +1,153 @@
+import threading
+import time
+from datetime import datetime
+import schedule
+from feed_snapshot import redact_credentials
+
+class FeedRefresher:
+    """Refresca periódicamente los feeds de LiveScore en segundo plano y los guarda en la caché"""
+
+    def __init__(self, cache, loader, poll_seconds=1):
+        self.cache = cache
+        # Función que recibe una URL y devuelve los datos del feed
+        self.loader = loader
+        self.poll_seconds = poll_seconds
+
+        self.scheduler = schedule.Scheduler()
+        self.feeds = {}
+        # Funciones que reciben (nombre del feed, datos) después de cada refresco exitoso
+        self.listeners = []
+        self.lock = threading.Lock()
+        self.stop_event = threading.Event()
+        self.thread = None
+
+    def add_feed(self, name, url, interval):
+        """Registra un feed para refrescarlo cada interval segundos
+
+        interval puede ser un número fijo o una función que devuelve los segundos hasta
+        el siguiente refresco, que se vuelve a evaluar después de cada refresco.
+        """
+        self.feeds[name] = {
+            'url': url,
+            'task': None,
+            'interval': interval,
+            'current_interval': None,
+            'job': None,
+            'last_refresh': None,
+            'last_error': None,
+            'failures': 0,
+            'consecutive_failures': 0
+        }
+        self.schedule_feed(name)
+
+    def add_job(self, name, task, interval):
+        """Registra una tarea periódica que no pasa por la caché (p. ej. la sincronización del historial)"""
+        self.add_feed(name, None, interval)
+        self.feeds[name]['task'] = task
+
+    def add_listener(self, listener):
+        """Registra una función que recibe (nombre del feed, datos) después de cada refresco exitoso"""
+        self.listeners.append(listener)
+
+    def schedule_feed(self, name):
+        """Programa el siguiente refresco del feed, reemplazando el anterior"""
+        feed = self.feeds[name]
+        interval = feed['interval']
+        seconds = interval() if callable(interval) else interval
+
+        if feed['job'] is not None:
+            self.scheduler.cancel_job(feed['job'])
+        feed['current_interval'] = seconds
+        feed['job'] = self.scheduler.every(seconds).seconds.do(self.run_job, name)
+
+    def run_job(self, name):
+        self.refresh(name)
+        # Los feeds con intervalo variable se reprograman después de cada refresco
+        if callable(self.feeds[name]['interval']):
+            self.schedule_feed(name)
+
+    def manages(self, url):
+        """Indica si la URL pertenece a un feed refrescado en segundo plano"""
+        return self.is_running() and any(feed['url'] == url for feed in self.feeds.values())
+
+    def refresh(self, name):
+        """Descarga un feed y lo guarda en la caché, registrando el resultado"""
+        feed = self.feeds[name]
+        try:
+            if feed['task'] is not None:
+                feed['task']()
+                self.mark_success(feed)
+                return True
+            data = self.loader(feed['url'])
+            if self.cache.cacheable is not None and not self.cache.cacheable(data):
+                raise ValueError(data.get('error', 'Respuesta no válida') if isinstance(data, dict) else 'Respuesta no válida')
+            self.cache.set(feed['url'], data)
+            self.mark_success(feed)
+            self.notify(name, data)
+            return True
+        except Exception as e:
+            # El error de requests incluye la URL con key= y secret=, y se muestra en el dashboard
+            message = redact_credentials(e)
+            with self.lock:
+                feed['last_error'] = message
+                feed['failures'] += 1
+                feed['consecutive_failures'] += 1
+            print(f"Error al refrescar el feed {name}: {message}")
+            return False
+
+    def notify(self, name, data):
+        for listener in self.listeners:
+            try:
+                listener(name, data)
+            except Exception as e:
+                print(f"Error al avisar del refresco del feed {name}: {str(e)}")
+
+    def mark_success(self, feed):
+        with self.lock:
+            feed['last_refresh'] = time.time()
+            feed['last_error'] = None
+            feed['consecutive_failures'] = 0
+
+    def refresh_all(self):
+        """Refresca todos los feeds registrados"""
+        for name in list(self.feeds):
+            self.refresh(name)
+
+    def run(self):
+        self.refresh_all()
+        # Recalcular los intervalos variables con los datos recién cargados
+        for name, feed in self.feeds.items():
+            if callable(feed['interval']):
+                self.schedule_feed(name)
+        while not self.stop_event.is_set():
+            self.scheduler.run_pending()
+            self.stop_event.wait(self.poll_seconds)
+
+    def start(self):
+        """Inicia el hilo de refresco si no está en ejecución en este proceso"""
+        with self.lock:
+            if self.is_running():
+                return
+            self.stop_event.clear()
+            self.thread = threading.Thread(target=self.run, name='feed-refresher', daemon=True)
+            self.thread.start()
+
+    def stop(self):
+        self.stop_event.set()
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def get_status(self):
+        """Obtiene la hora del último refresco y los fallos de cada feed"""
+        with self.lock:
+            return {
+                name: {
+                    'interval': feed['current_interval'],
+                    'last_refresh': datetime.fromtimestamp(feed['last_refresh']).isoformat() if feed['last_refresh'] else None,
+                    'last_error': feed['last_error'],
+                    'failures': feed['failures'],
+                    'consecutive_failures': feed['consecutive_failures']
+                }
+                for name, feed in self.feeds.items()
+            }
@@ -0,0 +1,89 @@
+import os
+import re
+import json
+import threading
+import time
+from urllib.parse import urlsplit, urlunsplit, parse_qsl, urlencode
+from file_utils import atomic_write_json
+
+# Versión del formato del archivo; los archivos de otra versión se ignoran
+SNAPSHOT_VERSION = 1
+
+def snapshot_key(url):
+    """Quita las credenciales de la URL para no guardarlas en disco"""
+    parts = urlsplit(url)
+    query = [(name, value) for name, value in parse_qsl(parts.query) if name not in ('key', 'secret')]
+    return urlunsplit((parts.scheme, parts.netloc, parts.path, urlencode(query), ''))
+
+# Valor de key= o secret= dentro de cualquier texto (URLs en mensajes de error de requests)
+CREDENTIALS_PATTERN = re.compile(r'\b(key|secret)=[^&\s\'"]+')
+
+def redact_credentials(text):
+    """Oculta las credenciales de LiveScore en un texto para poder registrarlo o mostrarlo"""
+    return CREDENTIALS_PATTERN.sub(r'\1=***', str(text))
+
+class FeedSnapshot:
+    """Guarda en disco la última respuesta buena de cada feed para responder tras un arranque en frío"""
+
+    def __init__(self, path, min_interval=30, max_age=7 * 86400):
+        self.path = path
+        # Tiempo mínimo (segundos) entre escrituras; los cambios pendientes se escriben con flush()
+        self.min_interval = min_interval
+        # Antigüedad máxima (segundos) de un dato guardado para poder servirlo
+        self.max_age = max_age
+
+        self.feeds = None
+        self.dirty = False
+        self.last_write = 0
+        self.lock = threading.Lock()
+
+    def ensure_loaded(self):
+        """Carga el archivo la primera vez que se necesita"""
+        if self.feeds is not None:
+            return
+        with self.lock:
+            if self.feeds is not None:
+                return
+            feeds = {}
+            try:
+                if os.path.exists(self.path):
+                    with open(self.path, 'r') as f:
+                        data = json.load(f)
+                    if data.get('version') == SNAPSHOT_VERSION:
+                        feeds = data.get('feeds', {})
+                    else:
+                        print(f"Snapshot de feeds ignorado: versión {data.get('version')} no soportada")
+            except Exception as e:
+                print(f"Error al cargar el snapshot de feeds: {str(e)}")
+            self.feeds = feeds
+
+    def get(self, url):
+        """Devuelve {'data', 'fetched_at'} del feed guardado, o None si no existe o es muy viejo"""
+        self.ensure_loaded()
+        entry = self.feeds.get(snapshot_key(url))
+        if entry is None or time.time() - entry['fetched_at'] > self.max_age:
+            return None
+        return entry
+
+    def put(self, url, data, fetched_at):
+        """Actualiza un feed y lo escribe en disco si pasó el intervalo mínimo"""
+        self.ensure_loaded()
+        with self.lock:
+            self.feeds[snapshot_key(url)] = {'data': data, 'fetched_at': fetched_at}
+            self.dirty = True
+        if time.time() - self.last_write >= self.min_interval:
+            self.flush()
+
+    def flush(self):
+        """Escribe los cambios pendientes de forma atómica"""
+        with self.lock:
+            if not self.dirty:
+                return
+            payload = {'version': SNAPSHOT_VERSION, 'saved_at': time.time(), 'feeds': dict(self.feeds)}
+            self.dirty = False
+            self.last_write = time.time()
+            try:
+                atomic_write_json(self.path, payload)
+            except Exception as e:
+                self.dirty = True
+                print(f"Error al guardar el snapshot de feeds: {str(e)}")
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import threading
+from collections import OrderedDict
+
+def content_version(rows):
+    """Versión de un conjunto de filas: hash de su contenido (igual en todos los workers)"""
+    encoded = json.dumps(rows, sort_keys=True, separators=(',', ':'), ensure_ascii=False).encode('utf-8')
+    return hashlib.sha1(encoded).hexdigest()[:16]
+
+class FeedVersions:
+    """Últimas versiones de las filas de un feed, para responder solo lo que cambió
+
+    La versión se calcula una vez por cada respuesta nueva del feed (la caché devuelve el mismo
+    objeto hasta el siguiente refresco). Se guardan las últimas keep versiones; un cliente con
+    una versión más vieja recibe la respuesta completa.
+    """
+
+    def __init__(self, rows_of, key, keep=20):
+        # Función que recibe la respuesta del feed y devuelve la lista de filas
+        self.rows_of = rows_of
+        # Campo que identifica una fila (p. ej. 'id' de un partido o 'name' de un equipo)
+        self.key = key
+        self.keep = keep
+        self.versions = OrderedDict()
+        self.source = None
+        self.current = None
+        self.lock = threading.Lock()
+
+    def observe(self, data):
+        """Registra la respuesta del feed y devuelve su versión"""
+        with self.lock:
+            if data is self.source:
+                return self.current
+            rows = self.rows_of(data) or []
+            version = content_version(rows)
+            self.versions.pop(version, None)
+            self.versions[version] = {str(row.get(self.key)): row for row in rows}
+            while len(self.versions) > self.keep:
+                self.versions.popitem(last=False)
+            self.source = data
+            self.current = version
+            return version
+
+    def delta(self, since):
+        """Filas nuevas o modificadas y claves eliminadas desde la versión since, o None si ya no se conoce"""
+        with self.lock:
+            previous = self.versions.get(since)
+            if previous is None or self.current is None:
+                return None
+            latest = self.versions[self.current]
+            return {
+                'version': self.current,
+                'since': since,
+                'changed': [row for key, row in latest.items() if previous.get(key) != row],
+                'removed': [key for key in previous if key not in latest]
+            }
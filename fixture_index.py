@@ -0,0 +1,71 @@
+import threading
+from datetime import datetime, timedelta, timezone
+
+from polling_policy import parse_kickoff
+
+def round_key(value):
+    """Orden de las jornadas: numéricas primero (como número) y después las demás"""
+    value = str(value)
+    return (0, int(value), '') if value.isdigit() else (1, 0, value)
+
+class FixtureIndex:
+    """Partidos programados agrupados por jornada y ordenados por hora de inicio"""
+
+    def __init__(self, fixtures, match_minutes=150):
+        # Un partido sigue contando en su jornada mientras se juega
+        self.match_duration = timedelta(minutes=match_minutes)
+        self.rounds = {}
+        self.kickoffs = {}
+        far_future = datetime.max.replace(tzinfo=timezone.utc)
+        for fixture in fixtures:
+            match_round = str(fixture.get('round') or '')
+            self.rounds.setdefault(match_round, []).append(fixture)
+        for match_round, round_fixtures in self.rounds.items():
+            round_fixtures.sort(key=lambda fixture: parse_kickoff(fixture) or far_future)
+            self.kickoffs[match_round] = [parse_kickoff(fixture) for fixture in round_fixtures]
+
+    def round_names(self):
+        return sorted(self.rounds, key=round_key)
+
+    def get(self, match_round):
+        return self.rounds.get(str(match_round), [])
+
+    def current_round(self, now=None):
+        """Jornada en curso o la siguiente por jugarse, calculada con las fechas de los partidos
+
+        Se toma la jornada del partido pendiente más próximo, sin contar jornadas con pocos
+        partidos (partidos aplazados de jornadas anteriores que se juegan entre semana).
+        """
+        now = now or datetime.now(timezone.utc)
+        if not self.rounds:
+            return None
+        largest = max(len(fixtures) for fixtures in self.rounds.values())
+        candidates = []
+        for match_round, kickoffs in self.kickoffs.items():
+            pending = [kickoff for kickoff in kickoffs if kickoff and kickoff + self.match_duration >= now]
+            if pending and 2 * len(kickoffs) > largest:
+                candidates.append((min(pending), round_key(match_round), match_round))
+        if candidates:
+            return min(candidates)[2]
+        # Sin partidos pendientes: la última jornada programada
+        return self.round_names()[-1]
+
+class IndexCache:
+    """Guarda el índice construido para la última respuesta de un feed
+
+    La caché de respuestas devuelve el mismo objeto hasta el siguiente refresco, así que el
+    índice se construye una vez por refresco y no en cada petición.
+    """
+
+    def __init__(self, build):
+        self.build = build
+        self.source = None
+        self.index = None
+        self.lock = threading.Lock()
+
+    def get(self, data):
+        with self.lock:
+            if data is not self.source:
+                self.index = self.build(data)
+                self.source = data
+            return self.index
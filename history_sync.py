@@ -0,0 +1,102 @@
+import time
+
+# Nombre del estado guardado en el archivo de partidos
+STATE_NAME = 'history_sync'
+
+class HistorySync:
+    """Sincroniza el historial paginado de LiveScore con el archivo local, pidiendo solo páginas nuevas
+
+    LiveScore pagina el historial del más reciente (página 1) al más antiguo. Cada ejecución:
+
+    1. Pide desde la página 1 hasta encontrar una página cuyos partidos ya estaban todos
+       guardados (normalmente una o dos páginas).
+    2. Si el archivo aún no tiene toda la temporada, continúa descargando hacia atrás desde
+       la última página, con un máximo de páginas por ejecución.
+
+    El cursor se guarda después de cada página, así que si el proceso se cae la siguiente
+    ejecución continúa donde se quedó; los partidos se guardan por id, así que repetir una
+    página no duplica nada.
+    """
+
+    def __init__(self, store, load_page, max_pages=25):
+        self.store = store
+        # Función que recibe un número de página y devuelve la respuesta de LiveScore
+        self.load_page = load_page
+        # Máximo de páginas pedidas a LiveScore en cada ejecución
+        self.max_pages = max_pages
+
+    def get_state(self):
+        return self.store.get_state(STATE_NAME, {})
+
+    def save_state(self, state):
+        self.store.set_state(STATE_NAME, state)
+
+    def fetch(self, page):
+        """Descarga una página y la guarda; devuelve (ids, ids que no estaban guardados, número total de páginas)"""
+        data = self.load_page(page)
+        if not (isinstance(data, dict) and data.get('success')):
+            error = data.get('error', 'Respuesta no válida') if isinstance(data, dict) else 'Respuesta no válida'
+            raise ValueError(f'Página {page} del historial: {error}')
+        matches = (data.get('data') or {}).get('match') or []
+        total_pages = int((data.get('data') or {}).get('total_pages') or page)
+        ids = [str(match['id']) for match in matches if match.get('id') is not None]
+        stored = self.store.first_seen(ids)
+        self.store.ingest_page(page, data)
+        return ids, [match_id for match_id in ids if match_id not in stored], total_pages
+
+    def run(self):
+        """Ejecuta una sincronización y devuelve un resumen de lo descargado"""
+        state = self.get_state()
+        first_sync = state.get('last_sync_at') is None
+        pages = 0
+        new_matches = 0
+
+        # 1. Partidos nuevos, desde la página 1 o desde donde se quedó la ejecución anterior,
+        # hasta la primera página cuyos partidos ya estaban todos guardados
+        page = state.get('head_page', 1)
+        while True:
+            _, new_ids, total_pages = self.fetch(page)
+            pages += 1
+            new_matches += len(new_ids)
+            state['total_pages'] = total_pages
+            # En la primera sincronización el resto de las páginas se descarga en el paso 2
+            if first_sync or not new_ids or page >= total_pages:
+                state.pop('head_page', None)
+                break
+            # Si se acaba el presupuesto, la siguiente ejecución sigue desde la página siguiente
+            state['head_page'] = page + 1
+            self.save_state(state)
+            if pages >= self.max_pages:
+                break
+            page += 1
+
+        state['last_sync_at'] = time.time()
+        self.save_state(state)
+
+        # 2. Descarga hacia atrás de las páginas que faltan
+        if not state.get('backfill_done'):
+            cursor = state.get('backfill_page')
+            if cursor is None:
+                cursor = total_pages
+            elif not (new_matches and self.max_pages - pages >= 2):
+                cursor -= 1
+            # Si hubo partidos nuevos, los partidos recorren las páginas: se repite la última página
+            # descargada para no saltarse los que pasaron a ella
+            cursor = min(cursor, total_pages)
+            while cursor > 1 and pages < self.max_pages:
+                self.fetch(cursor)
+                pages += 1
+                state['backfill_page'] = cursor
+                self.save_state(state)
+                cursor -= 1
+            if cursor <= 1:
+                state['backfill_done'] = True
+                state.pop('backfill_page', None)
+            self.save_state(state)
+
+        return {
+            'pages': pages,
+            'new_matches': new_matches,
+            'backfill_done': bool(state.get('backfill_done')),
+            'backfill_page': state.get('backfill_page')
+        }
@@ -0,0 +1,33 @@
+from flask.json.provider import DefaultJSONProvider
+
+# orjson es opcional: si no está instalado se usa el módulo json de Python
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Serialización JSON de las respuestas de Flask con orjson (si está instalado) y sin ordenar claves"""
+
+    # El orden de los dicts ya es estable; ordenar las claves cuesta en cada respuesta
+    sort_keys = False
+    # Respuestas compactas también en modo debug
+    compact = True
+
+    def dumps(self, obj, **kwargs):
+        # Con indent (o sin orjson) se usa el serializador de Flask
+        if orjson is None or kwargs.get('indent') is not None:
+            return super().dumps(obj, **kwargs)
+        try:
+            # Las fechas pasan por el serializador de Flask para conservar su formato
+            return orjson.dumps(
+                obj, default=self.default, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+            ).decode('utf-8')
+        except TypeError:
+            # Tipos que orjson no acepta (p. ej. enteros de más de 64 bits)
+            return super().dumps(obj, **kwargs)
+
+    def loads(self, s, **kwargs):
+        if orjson is None or kwargs:
+            return super().loads(s, **kwargs)
+        return orjson.loads(s)
@@ -0,0 +1,122 @@
+import json
+import queue
+import threading
+
+# Campos de un partido que se envían a los navegadores
+LIVE_FIELDS = ('id', 'home_name', 'away_name', 'score', 'ft_score', 'status', 'time', 'date', 'location')
+
+def format_event(event, data, event_id=None):
+    """Mensaje en formato Server-Sent Events"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data, separators=(",", ":"))}')
+    return '\n'.join(lines) + '\n\n'
+
+def error_stream(message, retry=30000):
+    """Respuesta SSE cuando no hay estado que enviar: avisa del error y el navegador se reconecta en retry ms"""
+    yield f'retry: {retry}\n\n'
+    yield format_event('feed_error', {'error': message})
+
+class LiveBroadcaster:
+    """Reparte los cambios de marcador a todos los navegadores conectados
+
+    Recibe las respuestas del feed de resultados que ya descarga el refresco en segundo plano,
+    así que con cualquier número de navegadores conectados solo hay una consulta a LiveScore
+    por intervalo. Cada conexión tiene su propia cola; si un navegador no alcanza a leerla se
+    le cierra la conexión (EventSource se reconecta solo y recibe el estado completo).
+    """
+
+    def __init__(self, max_clients=100, queue_size=50, heartbeat=15):
+        self.max_clients = max_clients
+        self.queue_size = queue_size
+        # Segundos entre comentarios de keep-alive para que los proxies no cierren la conexión
+        self.heartbeat = heartbeat
+        self.matches = {}
+        self.version = 0
+        self.subscribers = set()
+        self.lock = threading.Lock()
+
+    def has_data(self):
+        return self.version > 0
+
+    def update(self, data):
+        """Compara una respuesta del feed de resultados con la anterior y avisa de los cambios"""
+        matches = ((data.get('data') or {}).get('match') or []) if isinstance(data, dict) else []
+        with self.lock:
+            changes = []
+            current = {}
+            for match in matches:
+                if match.get('id') is None:
+                    continue
+                entry = {field: match.get(field) for field in LIVE_FIELDS}
+                current[entry['id']] = entry
+                if self.matches.get(entry['id']) != entry:
+                    changes.append(entry)
+            # Solo se conservan los partidos de la última respuesta
+            self.matches = current
+            if not changes and self.version > 0:
+                return []
+            self.version += 1
+            message = {'version': self.version, 'changes': changes}
+            for subscriber in list(self.subscribers):
+                try:
+                    subscriber.put_nowait(message)
+                except queue.Full:
+                    # Navegador demasiado lento: se cierra su conexión
+                    self.subscribers.discard(subscriber)
+                    self.close(subscriber)
+            return changes
+
+    def close(self, subscriber):
+        try:
+            while True:
+                subscriber.get_nowait()
+        except queue.Empty:
+            pass
+        subscriber.put_nowait(None)
+
+    def subscribe(self):
+        """Registra una conexión y devuelve (cola, estado actual), o None si no hay lugar"""
+        with self.lock:
+            if len(self.subscribers) >= self.max_clients:
+                return None
+            subscriber = queue.Queue(maxsize=self.queue_size)
+            self.subscribers.add(subscriber)
+            return subscriber, {'version': self.version, 'matches': list(self.matches.values())}
+
+    def unsubscribe(self, subscriber):
+        with self.lock:
+            self.subscribers.discard(subscriber)
+
+    def client_count(self):
+        with self.lock:
+            return len(self.subscribers)
+
+    def stream(self, subscription, poll=None):
+        """Generador de la respuesta SSE de una conexión: el estado completo y después los cambios
+
+        Sin refresco en segundo plano se pasa poll, que consulta el feed (en caché) y llama a
+        update(); se ejecuta en cada intervalo de keep-alive y sus errores se envían como evento.
+        """
+        subscriber, snapshot = subscription
+        try:
+            yield 'retry: 5000\n\n'
+            yield format_event('snapshot', snapshot, snapshot['version'])
+            while True:
+                try:
+                    message = subscriber.get(timeout=self.heartbeat)
+                except queue.Empty:
+                    if poll is not None:
+                        try:
+                            poll()
+                        except Exception:
+                            yield format_event('feed_error', {'error': 'No se pudieron consultar los resultados'})
+                    yield ': ping\n\n'
+                    continue
+                if message is None:
+                    break
+                yield format_event('scores', message, message['version'])
+        finally:
+            self.unsubscribe(subscriber)
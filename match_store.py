@@ -0,0 +1,321 @@
+import os
+import json
+import sqlite3
+import threading
+import time
+from collections import Counter
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS matches (
+    id TEXT PRIMARY KEY,
+    date TEXT,
+    scheduled TEXT,
+    round TEXT,
+    home_name TEXT,
+    away_name TEXT,
+    status TEXT,
+    data TEXT NOT NULL,
+    updated_at REAL NOT NULL,
+    first_seen_at REAL
+);
+CREATE INDEX IF NOT EXISTS matches_date ON matches (date, scheduled);
+CREATE INDEX IF NOT EXISTS matches_home ON matches (home_name, date);
+CREATE INDEX IF NOT EXISTS matches_away ON matches (away_name, date);
+CREATE INDEX IF NOT EXISTS matches_round ON matches (round, date);
+CREATE INDEX IF NOT EXISTS matches_updated ON matches (updated_at);
+CREATE TABLE IF NOT EXISTS sync_state (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    page INTEGER PRIMARY KEY,
+    match_ids TEXT NOT NULL,
+    meta TEXT NOT NULL,
+    fetched_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS match_counts (
+    scope TEXT NOT NULL,
+    key TEXT NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (scope, key)
+);
+"""
+
+ADD_COUNT = """
+INSERT INTO match_counts (scope, key, count) VALUES (?, ?, ?)
+ON CONFLICT(scope, key) DO UPDATE SET count = count + excluded.count
+"""
+
+UPSERT_MATCH = """
+INSERT INTO matches (id, date, scheduled, round, home_name, away_name, status, data, updated_at, first_seen_at)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(id) DO UPDATE SET
+    date = excluded.date,
+    scheduled = excluded.scheduled,
+    round = excluded.round,
+    home_name = excluded.home_name,
+    away_name = excluded.away_name,
+    status = excluded.status,
+    data = excluded.data,
+    updated_at = excluded.updated_at
+"""
+
+def match_row(match, updated_at):
+    """Columnas indexadas de un partido de LiveScore, más el partido completo en JSON"""
+    return (
+        str(match['id']),
+        # Las columnas del orden nunca son NULL, para que el cursor de paginación las compare
+        match.get('date') or '',
+        match.get('scheduled') or match.get('time') or '',
+        str(match['round']) if match.get('round') is not None else None,
+        match.get('home_name'),
+        match.get('away_name'),
+        match.get('status'),
+        json.dumps(match, separators=(',', ':')),
+        updated_at,
+        updated_at
+    )
+
+def season_for(date):
+    """Torneo de la Liga MX de una fecha YYYY-MM-DD: Clausura (enero a junio) o Apertura (julio a diciembre)"""
+    if not date or len(date) < 7:
+        return None
+    return f"{date[:4]} {'Apertura' if date[5:7] >= '07' else 'Clausura'}"
+
+def count_keys(date, home_name, away_name):
+    """Contadores (alcance, clave) en los que cuenta un partido"""
+    keys = [('total', '')]
+    season = season_for(date)
+    if season:
+        keys.append(('season', season))
+    for team in {home_name, away_name} - {None, ''}:
+        keys.append(('team', team))
+    return keys
+
+class MatchStore:
+    """Archivo local (SQLite) de los partidos del historial de LiveScore, con índices por fecha, equipo y jornada"""
+
+    def __init__(self, path, timeout=5):
+        self.path = path
+        self.timeout = timeout
+        self.local = threading.local()
+        data_dir = os.path.dirname(path)
+        if data_dir and not os.path.exists(data_dir):
+            os.makedirs(data_dir)
+        conn = self.connection()
+        conn.execute('PRAGMA journal_mode=WAL')
+        conn.executescript(SCHEMA)
+        # Archivos creados antes de que existiera first_seen_at
+        columns = [row[1] for row in conn.execute('PRAGMA table_info(matches)')]
+        if 'first_seen_at' not in columns:
+            conn.execute('ALTER TABLE matches ADD COLUMN first_seen_at REAL')
+        # Archivos guardados antes de que las columnas del orden fueran obligatorias
+        conn.execute("UPDATE matches SET date = IFNULL(date, ''), scheduled = IFNULL(scheduled, '') "
+                     "WHERE date IS NULL OR scheduled IS NULL")
+        # Archivos creados antes de que existieran los contadores
+        if conn.execute('SELECT 1 FROM match_counts LIMIT 1').fetchone() is None:
+            self.rebuild_counts()
+
+    def connection(self):
+        """Conexión propia de cada hilo (y de cada proceso, por si hubo un fork)"""
+        conn = getattr(self.local, 'conn', None)
+        if conn is None or self.local.pid != os.getpid():
+            conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self.local.conn = conn
+            self.local.pid = os.getpid()
+        return conn
+
+    def upsert_matches(self, matches):
+        """Guarda o actualiza los partidos (por id); se puede repetir sin duplicar nada"""
+        return self.write(matches)
+
+    def ingest_page(self, page, data):
+        """Guarda los partidos de una página del historial y el orden en que venían en esa página"""
+        matches = (data.get('data') or {}).get('match') or []
+        meta = {key: value for key, value in (data.get('data') or {}).items() if key != 'match'}
+        return self.write(matches, page=page, meta=meta)
+
+    def write(self, matches, page=None, meta=None):
+        """Guarda los partidos (y la página, si se indica) en una sola transacción"""
+        now = time.time()
+        rows = [match_row(match, now) for match in matches if match.get('id') is not None]
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            # Los contadores suman los partidos nuevos y, si un partido guardado cambió de fecha o
+            # equipos, restan sus claves anteriores y suman las nuevas
+            previous = self.existing_keys(conn, [row[0] for row in rows])
+            counts = Counter()
+            for row in rows:
+                keys = count_keys(row[1], row[4], row[5])
+                if row[0] in previous:
+                    counts.subtract(previous[row[0]])
+                counts.update(keys)
+                previous[row[0]] = keys
+            conn.executemany(UPSERT_MATCH, rows)
+            conn.executemany(ADD_COUNT, [(scope, key, count) for (scope, key), count in counts.items() if count])
+            conn.execute('DELETE FROM match_counts WHERE count <= 0')
+            if page is not None:
+                conn.execute(
+                    'INSERT OR REPLACE INTO pages (page, match_ids, meta, fetched_at) VALUES (?, ?, ?, ?)',
+                    (page, json.dumps([row[0] for row in rows]), json.dumps(meta or {}), now)
+                )
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+        return len(rows)
+
+    def existing_keys(self, conn, match_ids):
+        """{id: claves de los contadores} de los partidos que ya están guardados"""
+        found = {}
+        for start in range(0, len(match_ids), 500):
+            chunk = match_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for match_id, date, home_name, away_name in conn.execute(
+                    f'SELECT id, date, home_name, away_name FROM matches WHERE id IN ({placeholders})', chunk):
+                found[match_id] = count_keys(date, home_name, away_name)
+        return found
+
+    def rebuild_counts(self):
+        """Recalcula los contadores de partidos a partir de todos los partidos guardados"""
+        conn = self.connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            counts = Counter()
+            for date, home_name, away_name in conn.execute('SELECT date, home_name, away_name FROM matches'):
+                counts.update(count_keys(date, home_name, away_name))
+            conn.execute('DELETE FROM match_counts')
+            conn.executemany(ADD_COUNT, [(scope, key, count) for (scope, key), count in counts.items()])
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+    def get_counts(self):
+        """Número exacto de partidos guardados: en total, por torneo y por equipo (sin recorrer los partidos)"""
+        counts = {'total': 0, 'seasons': {}, 'teams': {}}
+        for scope, key, count in self.connection().execute('SELECT scope, key, count FROM match_counts'):
+            if scope == 'total':
+                counts['total'] = count
+            elif scope == 'season':
+                counts['seasons'][key] = count
+            elif scope == 'team':
+                counts['teams'][key] = count
+        return counts
+
+    def total(self):
+        """Número de partidos guardados"""
+        row = self.connection().execute("SELECT count FROM match_counts WHERE scope = 'total'").fetchone()
+        return row[0] if row is not None else 0
+
+    def get_page(self, page, max_age=None):
+        """Arma la respuesta de una página del historial con los partidos guardados, o None
+
+        Devuelve None si la página no se ha guardado o si es más vieja que max_age segundos.
+        """
+        conn = self.connection()
+        row = conn.execute('SELECT match_ids, meta, fetched_at FROM pages WHERE page = ?', (page,)).fetchone()
+        if row is None or (max_age is not None and time.time() - row[2] > max_age):
+            return None
+        match_ids = json.loads(row[0])
+        found = self.get_matches(match_ids)
+        if len(found) != len(match_ids):
+            return None
+        return {'success': True, 'data': {**json.loads(row[1]), 'match': [found[match_id] for match_id in match_ids]}}
+
+    def get_matches(self, match_ids):
+        """Devuelve {id: partido} de los ids guardados"""
+        conn = self.connection()
+        found = {}
+        # SQLite limita el número de parámetros por consulta
+        for start in range(0, len(match_ids), 500):
+            chunk = match_ids[start:start + 500]
+            placeholders = ','.join('?' * len(chunk))
+            for match_id, data in conn.execute(f'SELECT id, data FROM matches WHERE id IN ({placeholders})', chunk):
+                found[match_id] = json.loads(data)
+        return found
+
+    def first_seen(self, match_ids):
+        """Devuelve {id: momento (timestamp) en que se guardó el partido por primera vez}"""
+        conn = self.connection()
+        found = {}
+        for start in range(0, len(match_ids), 500):
+            chunk = [str(match_id) for match_id in match_ids[start:start + 500]]
+            placeholders = ','.join('?' * len(chunk))
+            for match_id, first_seen_at in conn.execute(
+                    f'SELECT id, COALESCE(first_seen_at, updated_at) FROM matches WHERE id IN ({placeholders})', chunk):
+                found[match_id] = first_seen_at
+        return found
+
+    def changed_since(self, updated_at=None):
+        """Partidos guardados o actualizados después de updated_at (todos si es None)
+
+        Devuelve (partidos, updated_at más reciente entre ellos).
+        """
+        since = updated_at if updated_at is not None else -1
+        matches = []
+        latest = updated_at
+        for data, row_updated_at in self.connection().execute(
+                'SELECT data, updated_at FROM matches WHERE updated_at > ? ORDER BY updated_at', (since,)):
+            matches.append(json.loads(data))
+            latest = row_updated_at
+        return matches, latest
+
+    def get_state(self, name, default=None):
+        """Lee un valor guardado (p. ej. el cursor de la sincronización)"""
+        row = self.connection().execute('SELECT value FROM sync_state WHERE name = ?', (name,)).fetchone()
+        return json.loads(row[0]) if row is not None else default
+
+    def set_state(self, name, value):
+        self.connection().execute('INSERT OR REPLACE INTO sync_state (name, value) VALUES (?, ?)', (name, json.dumps(value)))
+
+    def query(self, team=None, date_from=None, date_to=None, match_round=None, limit=None, offset=0):
+        """Busca partidos por equipo, rango de fechas (YYYY-MM-DD) y jornada, del más reciente al más antiguo"""
+        where, params = self.filters(team, date_from, date_to, match_round)
+        sql = f'SELECT data FROM matches{where} ORDER BY date DESC, scheduled DESC, id DESC'
+        if limit is not None:
+            sql += ' LIMIT ? OFFSET ?'
+            params += [limit, offset]
+        return [json.loads(data) for (data,) in self.connection().execute(sql, params)]
+
+    def query_page(self, team=None, date_from=None, date_to=None, match_round=None, limit=20, offset=0, after=None):
+        """Una página de partidos con paginación por cursor (keyset)
+
+        after es la clave (fecha, hora, id) del último partido de la página anterior; con ella
+        SQLite continúa directo desde el índice en vez de saltarse offset filas. Devuelve
+        (partidos, clave del último partido o None si no hay más).
+        """
+        where, params = self.filters(team, date_from, date_to, match_round)
+        if after is not None:
+            where += (' AND ' if where else ' WHERE ') + '(date, scheduled, id) < (?, ?, ?)'
+            params += list(after)
+        sql = f'SELECT date, scheduled, id, data FROM matches{where} ORDER BY date DESC, scheduled DESC, id DESC LIMIT ? OFFSET ?'
+        # Se pide una fila de más para saber si hay otra página
+        rows = self.connection().execute(sql, params + [limit + 1, offset]).fetchall()
+        matches = [json.loads(row[3]) for row in rows[:limit]]
+        last_key = tuple(rows[limit - 1][:3]) if len(rows) > limit else None
+        return matches, last_key
+
+    def count(self, team=None, date_from=None, date_to=None, match_round=None):
+        """Número de partidos que cumplen los filtros"""
+        where, params = self.filters(team, date_from, date_to, match_round)
+        return self.connection().execute(f'SELECT COUNT(*) FROM matches{where}', params).fetchone()[0]
+
+    def filters(self, team, date_from, date_to, match_round):
+        conditions = []
+        params = []
+        if team:
+            conditions.append('(home_name = ? OR away_name = ?)')
+            params += [team, team]
+        if date_from:
+            conditions.append('date >= ?')
+            params.append(date_from)
+        if date_to:
+            conditions.append('date <= ?')
+            params.append(date_to)
+        if match_round is not None:
+            conditions.append('round = ?')
+            params.append(str(match_round))
+        return (' WHERE ' + ' AND '.join(conditions) if conditions else ''), params
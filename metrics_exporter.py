@@ -0,0 +1,110 @@
+from datetime import datetime
+
+OPENMETRICS_CONTENT_TYPE = 'application/openmetrics-text; version=1.0.0; charset=utf-8'
+
+# Límites (segundos) de las cubetas del histograma de latencia exportado
+LATENCY_BOUNDS = (0.05, 0.1, 0.25, 0.5, 0.75, 1, 1.5, 2, 3, 5, 10, 30)
+
+# Percentiles de las estadísticas y su valor en la etiqueta quantile (numérico, como en Prometheus)
+QUANTILES = (('p50', '0.5'), ('p95', '0.95'), ('p99', '0.99'))
+
+def format_value(value):
+    if isinstance(value, float):
+        return repr(value)
+    return str(value)
+
+def format_labels(labels):
+    if not labels:
+        return ''
+    escaped = (
+        (name, str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n'))
+        for name, value in labels.items()
+    )
+    return '{' + ','.join(f'{name}="{value}"' for name, value in escaped) + '}'
+
+class MetricsWriter:
+    """Arma un texto en formato OpenMetrics, una familia de métricas a la vez"""
+
+    def __init__(self, prefix='ligamx'):
+        self.prefix = prefix
+        self.lines = []
+
+    def family(self, name, metric_type, help_text):
+        name = f'{self.prefix}_{name}'
+        self.lines.append(f'# TYPE {name} {metric_type}')
+        self.lines.append(f'# HELP {name} {help_text}')
+        return name
+
+    def sample(self, name, value, labels=None):
+        self.lines.append(f'{name}{format_labels(labels)} {format_value(value)}')
+
+    def render(self):
+        return '\n'.join(self.lines + ['# EOF']) + '\n'
+
+def render_openmetrics(api_stats, feeds=None):
+    """Exporta las estadísticas de ApiStatsManager (y el estado de los feeds) en formato OpenMetrics
+
+    Solo lee contadores en memoria: no consulta LiveScore.
+    """
+    api_stats.sync()
+    stats = api_stats.get_api_stats()
+    cache = api_stats.get_cache_stats()
+    latency = api_stats.get_latency_histogram()
+    writer = MetricsWriter()
+
+    name = writer.family('upstream_calls', 'counter', 'Llamadas a la API de LiveScore')
+    writer.sample(f'{name}_total', stats['calls'])
+    name = writer.family('upstream_errors', 'counter', 'Llamadas a la API de LiveScore que fallaron')
+    writer.sample(f'{name}_total', stats['errors'])
+    name = writer.family('upstream_coalesced_calls', 'counter', 'Llamadas agrupadas con otra idéntica en curso')
+    writer.sample(f'{name}_total', cache['coalesced'])
+
+    name = writer.family('upstream_latency_seconds', 'histogram', 'Tiempo de respuesta de la API de LiveScore (aproximado)')
+    for bound, count in zip(LATENCY_BOUNDS, latency.cumulative_counts(LATENCY_BOUNDS)):
+        writer.sample(f'{name}_bucket', count, {'le': format_value(float(bound))})
+    writer.sample(f'{name}_bucket', latency.count, {'le': '+Inf'})
+    writer.sample(f'{name}_count', latency.count)
+    writer.sample(f'{name}_sum', float(latency.total))
+
+    name = writer.family('upstream_latency_quantile_seconds', 'gauge', 'Percentiles del tiempo de respuesta')
+    for percentile, quantile in QUANTILES:
+        writer.sample(name, float(stats[f'response_time_{percentile}']), {'quantile': quantile})
+    name = writer.family('upstream_latency_max_seconds', 'gauge', 'Tiempo de respuesta máximo observado')
+    writer.sample(name, float(stats['response_time_max']))
+
+    name = writer.family('cache_requests', 'counter', 'Consultas a la caché de respuestas por resultado')
+    writer.sample(f'{name}_total', cache['hits'], {'result': 'hit'})
+    writer.sample(f'{name}_total', cache['stale_hits'], {'result': 'stale'})
+    writer.sample(f'{name}_total', cache['misses'], {'result': 'miss'})
+
+    # Desglose por ruta de Flask, feed de LiveScore y clase de estado
+    breakdown = api_stats.get_breakdown()
+    dimensions = [(dimension, item) for dimension in ('route', 'feed', 'status') for item in breakdown[dimension]]
+    name = writer.family('dimension_calls', 'counter', 'Llamadas por ruta, feed o estado')
+    for dimension, item in dimensions:
+        writer.sample(f'{name}_total', item['calls'], {'dimension': dimension, 'name': item['name']})
+    name = writer.family('dimension_errors', 'counter', 'Errores por ruta, feed o estado')
+    for dimension, item in dimensions:
+        writer.sample(f'{name}_total', item['errors'], {'dimension': dimension, 'name': item['name']})
+    name = writer.family('dimension_latency_quantile_seconds', 'gauge', 'Percentiles del tiempo de respuesta por ruta, feed o estado')
+    for dimension, item in dimensions:
+        for percentile, quantile in QUANTILES:
+            writer.sample(name, float(item[f'response_time_{percentile}']),
+                          {'dimension': dimension, 'name': item['name'], 'quantile': quantile})
+
+    name = writer.family('uptime_seconds', 'gauge', 'Segundos desde que se empezaron a registrar estadísticas')
+    writer.sample(name, stats['uptime'])
+
+    if feeds:
+        name = writer.family('feed_refresh_failures', 'counter', 'Refrescos fallidos de cada feed')
+        for feed, status in feeds.items():
+            writer.sample(f'{name}_total', status['failures'], {'feed': feed})
+        name = writer.family('feed_consecutive_failures', 'gauge', 'Refrescos fallidos seguidos de cada feed')
+        for feed, status in feeds.items():
+            writer.sample(name, status['consecutive_failures'], {'feed': feed})
+        name = writer.family('feed_last_refresh_timestamp_seconds', 'gauge', 'Hora del último refresco exitoso de cada feed')
+        for feed, status in feeds.items():
+            if status['last_refresh']:
+                writer.sample(name, datetime.fromisoformat(status['last_refresh']).timestamp(), {'feed': feed})
+
+    return writer.render()
@@ -0,0 +1,59 @@
+# Campos de cada fila que se envían al navegador (esquema reducido de las respuestas de LiveScore)
+STANDINGS_FIELDS = ('rank', 'team_id', 'name', 'matches', 'won', 'drawn', 'lost',
+                    'goals_scored', 'goals_conceded', 'goal_diff', 'points')
+MATCH_FIELDS = ('id', 'date', 'time', 'scheduled', 'round', 'status', 'home_id', 'home_name',
+                'away_id', 'away_name', 'score', 'ht_score', 'ft_score', 'location')
+FIXTURE_FIELDS = ('id', 'date', 'time', 'round', 'home_id', 'home_name', 'away_id', 'away_name', 'location')
+
+# Datos de la respuesta (fuera de las filas) que se conservan; los enlaces next_page/prev_page
+# de LiveScore incluyen la llave de la API y no se envían
+META_FIELDS = ('total_pages',)
+
+# Campos de la tabla que LiveScore envía como texto y se convierten a número
+NUMERIC_STANDINGS_FIELDS = ('rank', 'matches', 'won', 'drawn', 'lost', 'goals_scored',
+                            'goals_conceded', 'goal_diff', 'points')
+
+def lean_row(row, fields, numeric=()):
+    """Fila con solo los campos del esquema reducido"""
+    lean = {}
+    for field in fields:
+        if field in row:
+            value = row[field]
+            if field in numeric and isinstance(value, str) and value.lstrip('-').isdigit():
+                value = int(value)
+            lean[field] = value
+    return lean
+
+def lean_payload(data, rows_key, fields, numeric=()):
+    """Respuesta de LiveScore reducida a sus filas (con los campos del esquema) y META_FIELDS"""
+    if not (isinstance(data, dict) and data.get('success') and isinstance(data.get('data'), dict)):
+        return data
+    source = data['data']
+    lean = {key: source[key] for key in META_FIELDS if key in source}
+    lean[rows_key] = [lean_row(row, fields, numeric) for row in source.get(rows_key) or []]
+    return {'success': True, 'data': lean}
+
+def lean_standings(data):
+    return lean_payload(data, 'table', STANDINGS_FIELDS, NUMERIC_STANDINGS_FIELDS)
+
+def lean_matches(data):
+    return lean_payload(data, 'match', MATCH_FIELDS)
+
+def lean_fixtures(data):
+    return lean_payload(data, 'fixtures', FIXTURE_FIELDS)
+
+def parse_fields(value):
+    """Lista de campos de ?fields=a,b,c, o None para enviar todos"""
+    fields = tuple(field.strip() for field in (value or '').split(',') if field.strip())
+    return fields or None
+
+def project(data, rows_key, fields):
+    """Deja solo los campos pedidos en las filas de una respuesta (también en una respuesta delta)"""
+    if not fields or not (isinstance(data, dict) and isinstance(data.get('data'), dict)):
+        return data
+    key = 'changed' if data.get('delta') else rows_key
+    rows = data['data'].get(key)
+    if rows is None:
+        return data
+    projected = [{field: row[field] for field in fields if field in row} for row in rows]
+    return {**data, 'data': {**data['data'], key: projected}}
@@ -0,0 +1,63 @@
+from datetime import datetime, timedelta, timezone
+
+# Estados de LiveScore que indican un partido en juego
+LIVE_STATUSES = {'IN PLAY', 'LIVE', 'HALF TIME BREAK', 'ADDED TIME', 'EXTRA TIME', 'PENALTY IN PROGRESS'}
+
+def parse_kickoff(match):
+    """Convierte la fecha y hora (UTC) de un partido de LiveScore a datetime, o None"""
+    date = match.get('date')
+    time = match.get('time') or match.get('scheduled') or '00:00'
+    if not date:
+        return None
+    for fmt in ('%Y-%m-%d %H:%M:%S', '%Y-%m-%d %H:%M'):
+        try:
+            return datetime.strptime(f'{date} {time}', fmt).replace(tzinfo=timezone.utc)
+        except ValueError:
+            continue
+    return None
+
+class MatchWindowPolicy:
+    """Calcula el intervalo de consulta según haya partidos en juego o por comenzar"""
+
+    def __init__(self, get_fixtures, get_results, live_interval=45, idle_interval=10800,
+                 pre_match_minutes=30, match_minutes=150):
+        # Funciones que devuelven la última respuesta conocida de fixtures y resultados (o None)
+        self.get_fixtures = get_fixtures
+        self.get_results = get_results
+        self.live_interval = live_interval
+        self.idle_interval = idle_interval
+        self.pre_match = timedelta(minutes=pre_match_minutes)
+        # Duración máxima de un partido, incluyendo medio tiempo y tiempo añadido
+        self.match_duration = timedelta(minutes=match_minutes)
+
+    def kickoffs(self):
+        """Obtiene las horas de inicio de los partidos programados"""
+        data = self.get_fixtures() or {}
+        fixtures = (data.get('data') or {}).get('fixtures') or []
+        return [kickoff for kickoff in (parse_kickoff(fixture) for fixture in fixtures) if kickoff]
+
+    def has_live_matches(self):
+        """Indica si los resultados recientes incluyen partidos en juego"""
+        data = self.get_results() or {}
+        matches = (data.get('data') or {}).get('match') or []
+        return any(str(match.get('status', '')).upper() in LIVE_STATUSES for match in matches)
+
+    def is_match_window(self, now=None):
+        """Indica si hay un partido en juego o a punto de comenzar"""
+        now = now or datetime.now(timezone.utc)
+        if self.has_live_matches():
+            return True
+        return any(kickoff - self.pre_match <= now <= kickoff + self.match_duration for kickoff in self.kickoffs())
+
+    def interval(self, now=None):
+        """Segundos hasta la siguiente consulta"""
+        now = now or datetime.now(timezone.utc)
+        if self.is_match_window(now):
+            return self.live_interval
+
+        # Fuera de partido se espera lo más posible, sin pasarse del inicio de la siguiente ventana
+        upcoming = [kickoff - self.pre_match for kickoff in self.kickoffs() if kickoff - self.pre_match > now]
+        if upcoming:
+            until_window = (min(upcoming) - now).total_seconds()
+            return int(max(self.live_interval, min(self.idle_interval, until_window)))
+        return self.idle_interval
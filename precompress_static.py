@@ -0,0 +1,45 @@
+import os
+import sys
+import mimetypes
+from compression import COMPRESSIBLE_MIMETYPES, PRECOMPRESSED_EXTENSIONS, available_encodings, compress
+
+# Los archivos más pequeños no ganan nada al comprimirse
+MIN_SIZE = 500
+
+def precompress(static_dir, min_size=MIN_SIZE):
+    """Genera las versiones .gz (y .br si Brotli está instalado) de los archivos estáticos"""
+    written = 0
+    for root, _, files in os.walk(static_dir):
+        for name in files:
+            path = os.path.join(root, name)
+            if mimetypes.guess_type(name)[0] not in COMPRESSIBLE_MIMETYPES:
+                continue
+            if os.path.getsize(path) < min_size:
+                continue
+
+            with open(path, 'rb') as f:
+                data = f.read()
+
+            for encoding in available_encodings():
+                target = path + PRECOMPRESSED_EXTENSIONS[encoding]
+                # No regenerar si la versión comprimida ya está al día
+                if os.path.exists(target) and os.path.getmtime(target) >= os.path.getmtime(path):
+                    continue
+                compressed = compress(data, encoding, level=9 if encoding == 'gzip' else 11)
+                # Solo se guarda si realmente reduce el tamaño
+                if len(compressed) >= len(data):
+                    continue
+                with open(target, 'wb') as f:
+                    f.write(compressed)
+                written += 1
+                print(f"{target}: {len(data)} -> {len(compressed)} bytes")
+    return written
+
+def main():
+    static_dir = sys.argv[1] if len(sys.argv) > 1 else os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+    written = precompress(static_dir)
+    print(f"Archivos precomprimidos generados: {written}")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,127 @@
+import threading
+import time
+from feed_snapshot import redact_credentials
+
+
+class ResponseCache:
+    """Caché en memoria con TTL por entrada y servicio de datos obsoletos mientras se revalidan"""
+
+    def __init__(self, stale_ttl=3600, max_entries=128, cacheable=None, on_event=None, snapshot=None):
+        # Tiempo adicional (segundos) durante el cual se sirve una entrada vencida mientras se refresca
+        self.stale_ttl = stale_ttl
+        self.max_entries = max_entries
+        # Función opcional que decide si una respuesta se puede guardar en caché
+        self.cacheable = cacheable
+        # Función opcional que recibe los eventos 'hit', 'stale' y 'miss' junto con la clave
+        self.on_event = on_event
+        # Almacén opcional en disco (FeedSnapshot) para recuperar datos tras un arranque en frío
+        self.snapshot = snapshot
+
+        self.entries = {}
+        self.refreshing = set()
+        self.lock = threading.Lock()
+
+    def get(self, key, loader, ttl):
+        """Devuelve los datos de la clave, llamando a loader si no están en caché"""
+        now = time.time()
+        entry, restored = self.lookup(key)
+
+        if entry is not None:
+            age = now - entry['fetched_at']
+            if restored:
+                # Dato recuperado del disco: se sirve de inmediato mientras se refresca
+                self.emit('stale', key)
+                self.refresh_async(key, loader)
+                return entry['data']
+            if age < ttl:
+                self.emit('hit', key)
+                return entry['data']
+            if age < ttl + self.stale_ttl:
+                # Servir el dato obsoleto y refrescarlo en segundo plano
+                self.emit('stale', key)
+                self.refresh_async(key, loader)
+                return entry['data']
+
+        self.emit('miss', key)
+        data = loader()
+        self.set(key, data)
+        return data
+
+    def lookup(self, key):
+        """Busca la entrada en memoria o, si no está, en el snapshot en disco
+
+        Devuelve (entrada, restaurada), donde restaurada indica que vino del disco.
+        """
+        with self.lock:
+            entry = self.entries.get(key)
+        if entry is not None or self.snapshot is None:
+            return entry, False
+
+        saved = self.snapshot.get(key)
+        if saved is None:
+            return None, False
+        with self.lock:
+            # Otro hilo pudo haber guardado un dato más nuevo mientras tanto
+            if key in self.entries:
+                return self.entries[key], False
+            entry = {'data': saved['data'], 'fetched_at': saved['fetched_at']}
+            self.entries[key] = entry
+        return entry, True
+
+    def peek(self, key, track=True):
+        """Devuelve los datos guardados para la clave sin importar su antigüedad, o None"""
+        entry, _ = self.lookup(key)
+        if entry is None:
+            return None
+        if track:
+            self.emit('hit', key)
+        return entry['data']
+
+    def fetched_at(self, key):
+        """Devuelve el momento (timestamp) en que se guardó la entrada, o None"""
+        entry, _ = self.lookup(key)
+        return entry['fetched_at'] if entry is not None else None
+
+    def set(self, key, data):
+        """Guarda los datos en caché si son válidos"""
+        if self.cacheable is not None and not self.cacheable(data):
+            return
+        fetched_at = time.time()
+        with self.lock:
+            self.entries[key] = {'data': data, 'fetched_at': fetched_at}
+            if len(self.entries) > self.max_entries:
+                oldest = min(self.entries, key=lambda k: self.entries[k]['fetched_at'])
+                del self.entries[oldest]
+        if self.snapshot is not None:
+            self.snapshot.put(key, data, fetched_at)
+
+    def refresh_async(self, key, loader):
+        """Refresca una entrada en un hilo de fondo, evitando refrescos duplicados"""
+        with self.lock:
+            if key in self.refreshing:
+                return
+            self.refreshing.add(key)
+
+        def worker():
+            try:
+                self.set(key, loader())
+            except Exception as e:
+                # La clave es la URL de LiveScore, con key= y secret=
+                print(f"Error al refrescar la caché de {redact_credentials(key)}: {redact_credentials(e)}")
+            finally:
+                with self.lock:
+                    self.refreshing.discard(key)
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def invalidate(self, key=None):
+        """Elimina una entrada de la caché, o todas si no se indica clave"""
+        with self.lock:
+            if key is None:
+                self.entries.clear()
+            else:
+                self.entries.pop(key, None)
+
+    def emit(self, event, key):
+        if self.on_event is not None:
+            self.on_event(event, key)
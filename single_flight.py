@@ -0,0 +1,50 @@
+import threading
+
+class _Call:
+    """Llamada en curso compartida por todos los que piden la misma clave"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+class SingleFlight:
+    """Agrupa llamadas concurrentes con la misma clave para que solo se ejecute una"""
+
+    def __init__(self, on_collapse=None):
+        # Función opcional que se llama cada vez que una llamada se agrupa con otra en curso
+        self.on_collapse = on_collapse
+        self.collapsed = 0
+
+        self.calls = {}
+        self.lock = threading.Lock()
+
+    def do(self, key, fn):
+        """Ejecuta fn para la clave, o espera el resultado si ya hay una llamada en curso"""
+        with self.lock:
+            call = self.calls.get(key)
+            leader = call is None
+            if leader:
+                call = _Call()
+                self.calls[key] = call
+            else:
+                self.collapsed += 1
+
+        if not leader:
+            if self.on_collapse is not None:
+                self.on_collapse()
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self.lock:
+                del self.calls[key]
+            call.done.set()
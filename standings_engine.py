@@ -0,0 +1,238 @@
+import threading
+from bisect import bisect_left, bisect_right
+
+from match_store import season_for
+
+# Columnas que suma el motor por equipo (away_goals solo se usa para desempatar)
+FIELDS = ('matches', 'won', 'drawn', 'lost', 'goals_scored', 'goals_conceded', 'points', 'away_goals')
+
+# Cada worker guarda los partidos con su propio reloj: se vuelven a leer los últimos segundos
+CLOCK_MARGIN = 60
+
+def parse_score(match):
+    """Goles (local, visitante) de un partido terminado, o None si no ha terminado"""
+    if match.get('status') != 'FINISHED' and not match.get('ft_score'):
+        return None
+    parts = (match.get('ft_score') or match.get('score') or '').replace(' ', '').split('-')
+    if len(parts) != 2 or not all(part.isdigit() for part in parts):
+        return None
+    return int(parts[0]), int(parts[1])
+
+def round_number(match):
+    """Jornada de fase regular del partido, o None (liguilla o sin jornada)"""
+    value = str(match.get('round') or '').strip()
+    return int(value) if value.isdigit() else None
+
+def result_vectors(home_goals, away_goals):
+    """Cambio que un resultado suma a la tabla del local y del visitante (en el orden de FIELDS)"""
+    won, drawn, lost = home_goals > away_goals, home_goals == away_goals, home_goals < away_goals
+    home = [1, int(won), int(drawn), int(lost), home_goals, away_goals, 3 * won + drawn, 0]
+    away = [1, int(lost), int(drawn), int(won), away_goals, home_goals, 3 * lost + drawn, away_goals]
+    return home, away
+
+def add_columns(left, right):
+    """Suma columna por columna (las columnas más cortas valen 0 en los equipos que les faltan)"""
+    result = []
+    for column_left, column_right in zip(left, right):
+        size = max(len(column_left), len(column_right))
+        column_left = column_left + [0] * (size - len(column_left))
+        column_right = column_right + [0] * (size - len(column_right))
+        result.append([a + b for a, b in zip(column_left, column_right)])
+    return result
+
+class PrefixIndex:
+    """Tabla acumulada por clave ordenada (jornada o fecha)
+
+    Cada clave guarda solo lo que suman sus partidos; la tabla hasta una clave es la suma de
+    las anteriores. Las sumas acumuladas se guardan y, cuando cambia un resultado, solo se
+    recalculan a partir de su clave en vez de recorrer toda la temporada.
+    """
+
+    def __init__(self):
+        self.keys = []
+        self.deltas = {}
+        self.snapshots = []
+        # Las sumas acumuladas desde esta posición ya no son válidas
+        self.dirty = 0
+
+    def add(self, key, team, vector, sign=1):
+        position = bisect_left(self.keys, key)
+        if key not in self.deltas:
+            self.keys.insert(position, key)
+            self.deltas[key] = [[] for _ in FIELDS]
+        for column, value in zip(self.deltas[key], vector):
+            if len(column) <= team:
+                column.extend([0] * (team + 1 - len(column)))
+            column[team] += sign * value
+        self.dirty = min(self.dirty, position)
+
+    def upto(self, key, size):
+        """Columnas acumuladas de todas las claves <= key, con size equipos"""
+        count = bisect_right(self.keys, key)
+        del self.snapshots[self.dirty:]
+        for index in range(len(self.snapshots), count):
+            delta = self.deltas[self.keys[index]]
+            self.snapshots.append(add_columns(self.snapshots[index - 1], delta) if index else [list(c) for c in delta])
+        self.dirty = len(self.snapshots)
+        columns = self.snapshots[count - 1] if count else [[] for _ in FIELDS]
+        return [column + [0] * (size - len(column)) for column in columns]
+
+class SeasonTable:
+    """Resultados de fase regular de un torneo y su tabla por jornada y por fecha"""
+
+    def __init__(self):
+        self.teams = []
+        self.team_index = {}
+        # id del partido -> (jornada, fecha, local, visitante, goles local, goles visitante)
+        self.results = {}
+        self.by_round = PrefixIndex()
+        self.by_date = PrefixIndex()
+
+    def team(self, name):
+        if name not in self.team_index:
+            self.team_index[name] = len(self.teams)
+            self.teams.append(name)
+        return self.team_index[name]
+
+    def set_result(self, match_id, result):
+        """Agrega, corrige o (con None) quita el resultado de un partido"""
+        previous = self.results.get(match_id)
+        if previous == result:
+            return
+        if previous is not None:
+            self.apply(previous, -1)
+            del self.results[match_id]
+        if result is not None:
+            self.apply(result, 1)
+            self.results[match_id] = result
+
+    def apply(self, result, sign):
+        match_round, date, home, away, home_goals, away_goals = result
+        home_vector, away_vector = result_vectors(home_goals, away_goals)
+        for index, key in ((self.by_round, match_round), (self.by_date, date)):
+            index.add(key, home, home_vector, sign)
+            index.add(key, away, away_vector, sign)
+
+    def last_date(self):
+        return self.by_date.keys[-1] if self.by_date.keys else ''
+
+    def table(self, as_of_round=None, as_of_date=None):
+        """Tabla de posiciones completa, hasta una jornada o hasta una fecha (inclusive)"""
+        size = len(self.teams)
+        if as_of_round is not None:
+            columns = self.by_round.upto(as_of_round, size)
+            played = lambda result: result[0] <= as_of_round
+        else:
+            as_of_date = as_of_date or self.last_date()
+            columns = self.by_date.upto(as_of_date, size)
+            played = lambda result: result[1] <= as_of_date
+        stats = dict(zip(FIELDS, columns))
+
+        # Puntos, diferencia de goles y goles a favor; los empates en los tres se resuelven abajo
+        order = sorted(range(size), key=lambda team: (
+            -stats['points'][team],
+            -(stats['goals_scored'][team] - stats['goals_conceded'][team]),
+            -stats['goals_scored'][team]
+        ))
+        ranked = []
+        start = 0
+        while start < size:
+            end = start + 1
+            key = self.main_key(stats, order[start])
+            while end < size and self.main_key(stats, order[end]) == key:
+                end += 1
+            ranked += self.break_tie(order[start:end], stats, played)
+            start = end
+
+        rows = []
+        for rank, team in enumerate(ranked, 1):
+            row = {'rank': rank, 'name': self.teams[team]}
+            for field in FIELDS[:-1]:
+                row[field] = stats[field][team]
+            row['goal_diff'] = row['goals_scored'] - row['goals_conceded']
+            rows.append(row)
+        return rows
+
+    def main_key(self, stats, team):
+        return (stats['points'][team], stats['goals_scored'][team] - stats['goals_conceded'][team], stats['goals_scored'][team])
+
+    def break_tie(self, teams, stats, played):
+        """Desempate: puntos entre los equipos empatados, goles de visitante y nombre"""
+        if len(teams) == 1:
+            return teams
+        tied = set(teams)
+        head_to_head = dict.fromkeys(teams, 0)
+        for result in self.results.values():
+            _, _, home, away, home_goals, away_goals = result
+            if home in tied and away in tied and played(result):
+                home_vector, away_vector = result_vectors(home_goals, away_goals)
+                head_to_head[home] += home_vector[6]
+                head_to_head[away] += away_vector[6]
+        return sorted(teams, key=lambda team: (-head_to_head[team], -stats['away_goals'][team], self.teams[team]))
+
+class StandingsEngine:
+    """Calcula la tabla de posiciones a partir de los resultados del archivo local de partidos
+
+    Lee solo los partidos guardados o actualizados desde la consulta anterior, así que cada
+    resultado nuevo se suma a su torneo sin recalcular la temporada.
+    """
+
+    def __init__(self, store):
+        self.store = store
+        self.seasons = {}
+        # id del partido -> torneo en el que está contado
+        self.season_of = {}
+        self.updated_at = None
+        self.lock = threading.Lock()
+
+    def refresh(self):
+        """Suma los partidos que cambiaron en el archivo desde la última lectura"""
+        since = self.updated_at - CLOCK_MARGIN if self.updated_at is not None else None
+        matches, latest = self.store.changed_since(since)
+        for match in matches:
+            self.add_match(match)
+        if latest is not None:
+            self.updated_at = max(latest, self.updated_at or latest)
+
+    def add_match(self, match):
+        match_id = str(match.get('id'))
+        score = parse_score(match)
+        match_round = round_number(match)
+        season = season_for(match.get('date'))
+        if score is None or match_round is None or not (match.get('home_name') and match.get('away_name')):
+            season = None
+
+        previous = self.season_of.get(match_id)
+        if previous is not None and previous != season:
+            self.seasons[previous].set_result(match_id, None)
+            del self.season_of[match_id]
+        if season is None:
+            return
+        table = self.seasons.setdefault(season, SeasonTable())
+        table.set_result(match_id, (
+            match_round, match['date'], table.team(match['home_name']), table.team(match['away_name']), score[0], score[1]
+        ))
+        self.season_of[match_id] = season
+
+    def current_season(self):
+        """Torneo del resultado más reciente"""
+        seasons = [(table.last_date(), season) for season, table in self.seasons.items() if table.results]
+        return max(seasons)[1] if seasons else None
+
+    def standings(self, season=None, as_of_round=None, as_of_date=None):
+        """Tabla de un torneo (por defecto el actual) hasta una jornada o fecha, o None si no hay resultados"""
+        if as_of_round is not None and as_of_date is not None:
+            raise ValueError('Usa as_of_round o as_of_date, no ambos')
+        with self.lock:
+            self.refresh()
+            season = season or self.current_season()
+            table = self.seasons.get(season)
+            if table is None or not table.results:
+                return None
+            return {
+                'season': season,
+                'as_of_round': as_of_round,
+                'as_of_date': as_of_date,
+                'last_round': table.by_round.keys[-1],
+                'table': table.table(as_of_round=as_of_round, as_of_date=as_of_date)
+            }
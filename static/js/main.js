@@ -8,6 +8,7 @@ function createDashboardCharts(dashboardData) {
         calls: dashboardData.api_trend.calls.slice(-12),
         success_rate: dashboardData.api_trend.success_rate.slice(-12),
         response_time: dashboardData.api_trend.response_time.slice(-12),
+        response_time_p95: (dashboardData.api_trend.response_time_p95 || []).slice(-12),
         errors: dashboardData.api_trend.errors.slice(-12)
     };
     
@@ -217,6 +218,16 @@ function createDashboardCharts(dashboardData) {
                     pointRadius: 3,
                     pointHoverRadius: 6,
                     fill: true
+                }, {
+                    label: 'p95 (ms)',
+                    data: apiTrend.response_time_p95.map(time => time * 1000),
+                    borderColor: 'rgba(255, 99, 132, 1)',
+                    borderWidth: 2,
+                    borderDash: [5, 5],
+                    tension: 0.4,
+                    pointRadius: 2,
+                    pointHoverRadius: 5,
+                    fill: false
                 }]
             },
             options: {
@@ -415,6 +426,14 @@ function getTeamLogo(teamName) {
 document.addEventListener('DOMContentLoaded', function() {
     // Cargar el contenido inicial
     loadInitialContent();
+    subscribeLiveScores();
+    
+    // Mientras la pestaña está visible, la tabla se actualiza pidiendo solo los cambios
+    setInterval(() => {
+        if (document.visibilityState === 'visible' && standingsState) {
+            loadStandings();
+        }
+    }, 120000);
     
     // Agregar event listeners para los clicks en las pestañas
     document.getElementById('standings-tab').addEventListener('click', function() {
@@ -429,6 +448,18 @@ document.addEventListener('DOMContentLoaded', function() {
         loadHistory();
     });
     
+    // Filtros del historial (equipo, fechas y jornada)
+    document.getElementById('history-filters').addEventListener('submit', function(event) {
+        event.preventDefault();
+        const form = new FormData(this);
+        loadHistory({
+            team: form.get('team').trim(),
+            from: form.get('from'),
+            to: form.get('to'),
+            round: form.get('round')
+        });
+    });
+    
     document.getElementById('metrics-tab').addEventListener('click', function() {
         loadMetrics();
     });
@@ -438,29 +469,72 @@ document.addEventListener('DOMContentLoaded', function() {
     });
 });
 
-// Function to load standings data
-function loadStandings() {
-    fetch('/api/standings')
+// Respuestas de la API guardadas con su ETag para revalidarlas
+const apiResponseCache = {};
+
+// Function to fetch JSON from the API, revalidating with If-None-Match
+function fetchJSON(url) {
+    const cached = apiResponseCache[url];
+    const headers = cached ? { 'If-None-Match': cached.etag } : {};
+    
+    // Con 'no-store' el navegador no revalida por su cuenta y devuelve el 304 a este código
+    return fetch(url, { headers, cache: 'no-store' })
         .then(response => {
+            if (response.status === 304 && cached) {
+                return cached.data;
+            }
             if (!response.ok) {
                 throw new Error(`HTTP error! Status: ${response.status}, Text: ${response.statusText}`);
             }
-            return response.json();
-        })
-        .then(data => {
-            if (data.success && data.data && data.data.table) {
-                displayStandings(data.data.table);
-            } else {
-                console.error('API error:', data);
-                showError('standings-body', `No se pudieron cargar los datos de la tabla. ${data.error || ''}`);
-            }
-        })
+            return response.json().then(data => {
+                const etag = response.headers.get('ETag');
+                if (etag) {
+                    apiResponseCache[url] = { etag, data };
+                }
+                return data;
+            });
+        });
+}
+
+// Function to load standings data
+function loadStandings() {
+    // Con una versión conocida solo se piden los equipos que cambiaron
+    const url = standingsState ? `/api/standings?since=${encodeURIComponent(standingsState.version)}` : '/api/standings';
+    fetchJSON(url)
+        .then(renderStandings)
         .catch(error => {
             console.error('Error fetching standings:', error.toString());
             showError('standings-body', 'Error al cargar los datos. Por favor, intente más tarde.');
         });
 }
 
+// Última versión de la tabla recibida y sus filas
+let standingsState = null;
+
+// Function to render the standings response
+function renderStandings(data) {
+    if (data.success && data.delta && standingsState) {
+        const rows = applyDelta(standingsState.rows, data.data, 'name');
+        rows.sort((a, b) => Number(a.rank) - Number(b.rank));
+        standingsState = { version: data.data.version, rows };
+        displayStandings(rows);
+    } else if (data.success && data.data && data.data.table) {
+        standingsState = data.version ? { version: data.version, rows: data.data.table } : null;
+        displayStandings(data.data.table);
+    } else {
+        console.error('API error:', data);
+        showError('standings-body', `No se pudieron cargar los datos de la tabla. ${data.error || ''}`);
+    }
+}
+
+// Aplica una respuesta ?since= (filas nuevas o modificadas y claves eliminadas) a las filas anteriores
+function applyDelta(rows, delta, key) {
+    const byKey = new Map(rows.map(row => [String(row[key]), row]));
+    delta.removed.forEach(removed => byKey.delete(String(removed)));
+    delta.changed.forEach(row => byKey.set(String(row[key]), row));
+    return Array.from(byKey.values());
+}
+
 // Function to display standings data
 function displayStandings(tableData) {
     const tableBody = document.getElementById('standings-body');
@@ -546,54 +620,112 @@ function displayStandings(tableData) {
 }
 
 // Function to load fixtures
-function loadFixtures() {
+function loadFixtures(round) {
     const container = document.getElementById('fixtures-container');
     container.innerHTML = '<div class="text-center"><div class="loading-spinner"></div><p>Cargando próximos partidos...</p></div>';
     
-    fetch('/api/fixtures')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success && data.data.fixtures) {
-                displayMatches(data.data.fixtures, 'fixtures-container', 'próximos');
-            } else {
-                container.innerHTML = '<div class="alert alert-info">No hay próximos partidos programados.</div>';
-            }
-        })
+    fetchJSON(round ? `/api/fixtures?round=${encodeURIComponent(round)}` : '/api/fixtures')
+        .then(renderFixtures)
         .catch(error => {
             console.error('Error fetching fixtures:', error);
             container.innerHTML = '<div class="alert alert-danger">Error al cargar los datos. Por favor, intente más tarde.</div>';
         });
 }
 
+// Function to render the fixtures response
+function renderFixtures(data) {
+    const container = document.getElementById('fixtures-container');
+    if (data.success && data.data && data.data.fixtures) {
+        updateFixturesRound(data.data);
+        displayMatches(data.data.fixtures, 'fixtures-container', 'próximos');
+    } else {
+        container.innerHTML = '<div class="alert alert-info">No hay próximos partidos programados.</div>';
+    }
+}
+
+// Muestra la jornada en el encabezado y llena el selector de jornadas
+function updateFixturesRound(data) {
+    document.getElementById('fixtures-round').textContent = data.round ? ` - Jornada ${data.round}` : '';
+    const select = document.getElementById('fixtures-round-select');
+    const rounds = data.rounds || [];
+    select.innerHTML = rounds.map(round => {
+        const label = round === data.current_round ? `Jornada ${round} (actual)` : `Jornada ${round}`;
+        return `<option value="${round}"${round === data.round ? ' selected' : ''}>${label}</option>`;
+    }).join('');
+    select.classList.toggle('d-none', rounds.length < 2);
+    select.onchange = () => loadFixtures(select.value);
+}
+
+// Filtros y partidos ya mostrados del historial (para "Cargar más")
+let historyFilters = {};
+let historyMatches = [];
+
 // Function to load match history
-function loadHistory() {
+function loadHistory(filters = historyFilters) {
     const container = document.getElementById('history-container');
     container.innerHTML = '<div class="text-center"><div class="loading-spinner"></div><p>Cargando resultados...</p></div>';
+    historyFilters = filters;
     
-    fetch('/api/history')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success && data.data.match) {
-                displayMatches(data.data.match, 'history-container', 'resultados');
-            } else {
-                container.innerHTML = '<div class="alert alert-info">No hay resultados disponibles.</div>';
-            }
-        })
+    fetchJSON(historyUrl(filters))
+        .then(renderHistory)
         .catch(error => {
             console.error('Error fetching history:', error);
             container.innerHTML = '<div class="alert alert-danger">Error al cargar los datos. Por favor, intente más tarde.</div>';
         });
 }
 
+// URL de /api/history con los filtros (y el cursor de la página siguiente, si se indica)
+function historyUrl(filters, cursor) {
+    const params = new URLSearchParams();
+    Object.entries(filters).forEach(([name, value]) => {
+        if (value) {
+            params.set(name, value);
+        }
+    });
+    if (cursor) {
+        params.set('cursor', cursor);
+    }
+    const query = params.toString();
+    return query ? `/api/history?${query}` : '/api/history';
+}
+
+// Function to render the match history response
+function renderHistory(data, append = false) {
+    const container = document.getElementById('history-container');
+    if (data.success && data.data && data.data.match) {
+        historyMatches = append ? historyMatches.concat(data.data.match) : data.data.match;
+        displayMatches(historyMatches, 'history-container', 'resultados');
+    } else if (!append) {
+        historyMatches = [];
+        container.innerHTML = '<div class="alert alert-info">No hay resultados disponibles.</div>';
+    }
+    updateHistoryMore(data.data && data.data.next_cursor);
+}
+
+// Muestra el botón "Cargar más" si el historial tiene otra página
+function updateHistoryMore(cursor) {
+    const button = document.getElementById('history-more');
+    if (!button) {
+        return;
+    }
+    button.classList.toggle('d-none', !cursor);
+    button.onclick = () => {
+        button.disabled = true;
+        fetchJSON(historyUrl(historyFilters, cursor))
+            .then(data => renderHistory(data, true))
+            .catch(error => console.error('Error fetching history:', error))
+            .finally(() => { button.disabled = false; });
+    };
+}
+
 // Nueva función para cargar resultados recientes
 function loadResults() {
     const container = document.getElementById('history-container');
     container.innerHTML = '<div class="text-center"><div class="loading-spinner"></div><p>Cargando resultados recientes...</p></div>';
     
-    fetch('/api/results')
-        .then(response => response.json())
+    fetchJSON('/api/results')
         .then(data => {
-            if (data.success && data.data.fixtures && data.data.fixtures.length > 0) {
+            if (hasRecentResults(data)) {
                 displayMatches(data.data.fixtures, 'history-container', 'resultados');
             } else {
                 loadHistory();
@@ -605,6 +737,43 @@ function loadResults() {
         });
 }
 
+// Indica si la respuesta de resultados recientes trae partidos para mostrar
+function hasRecentResults(data) {
+    return Boolean(data.success && data.data && data.data.fixtures && data.data.fixtures.length > 0);
+}
+
+// Estado del partido y marcador a mostrar
+function matchStatus(match) {
+    if (match.status === 'IN PLAY' || match.status === 'LIVE') {
+        return { statusText: 'En Vivo', scoreDisplay: match.score || '-' };
+    }
+    if (match.status === 'FINISHED' || match.ft_score) {
+        return { statusText: 'Finalizado', scoreDisplay: match.ft_score || match.score || '-' };
+    }
+    return { statusText: 'Programado', scoreDisplay: '-' };
+}
+
+// Marcadores en vivo: el servidor envía el estado completo al conectarse y después solo los cambios
+function subscribeLiveScores() {
+    if (!window.EventSource) {
+        return;
+    }
+    const source = new EventSource('/api/live/stream');
+    source.addEventListener('snapshot', event => applyLiveScores(JSON.parse(event.data).matches));
+    source.addEventListener('scores', event => applyLiveScores(JSON.parse(event.data).changes));
+}
+
+// Actualiza las tarjetas de los partidos que ya están en pantalla
+function applyLiveScores(matches) {
+    matches.forEach(match => {
+        document.querySelectorAll(`[data-match-id="${match.id}"]`).forEach(card => {
+            const { statusText, scoreDisplay } = matchStatus(match);
+            card.querySelector('.score').textContent = scoreDisplay;
+            card.querySelector('.match-status').textContent = statusText;
+        });
+    });
+}
+
 // Function to display matches (used for live, fixtures, and history)
 function displayMatches(matches, containerId, type) {
     const container = document.getElementById(containerId);
@@ -659,21 +828,10 @@ function displayMatches(matches, containerId, type) {
         matchesByDate[date].forEach(match => {
             const matchCard = document.createElement('div');
             matchCard.className = 'col-md-6 col-lg-4 mb-3';
+            // Para actualizar el marcador con los eventos en vivo
+            matchCard.dataset.matchId = match.id;
             
-            let statusClass = 'status-upcoming';
-            let statusText = 'Programado';
-            let scoreDisplay = '-';
-            
-            // Determinar el estado del partido y el marcador a mostrar
-            if (match.status === 'IN PLAY' || match.status === 'LIVE') {
-                statusClass = 'status-live';
-                statusText = 'En Vivo';
-                scoreDisplay = match.score || '-';
-            } else if (match.status === 'FINISHED' || match.ft_score) {
-                statusClass = 'status-finished';
-                statusText = 'Finalizado';
-                scoreDisplay = match.ft_score || match.score || '-';
-            }
+            const { statusText, scoreDisplay } = matchStatus(match);
             
             // Formatear la hora del partido
             const matchTime = match.time ? formatTime(match.time) : '';
@@ -682,7 +840,7 @@ function displayMatches(matches, containerId, type) {
                 <div class="match-card p-3 text-center">
                     <!-- Encabezado con estado -->
                     <div class="d-flex justify-content-between align-items-center mb-2">
-                        <span class="badge bg-success">${statusText}</span>
+                        <span class="badge bg-success match-status">${statusText}</span>
                     </div>
                     
                     <!-- Contenedor de equipos y marcador -->
@@ -743,21 +901,24 @@ function loadMetrics() {
     const container = document.getElementById('metrics-container');
     container.innerHTML = '<div class="text-center"><div class="loading-spinner"></div><p>Cargando métricas...</p></div>';
     
-    fetch('/api/metrics')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success && data.data) {
-                displayMetrics(data.data);
-            } else {
-                container.innerHTML = '<div class="alert alert-info">No hay métricas disponibles.</div>';
-            }
-        })
+    fetchJSON('/api/metrics')
+        .then(renderMetrics)
         .catch(error => {
             console.error('Error fetching metrics:', error);
             container.innerHTML = '<div class="alert alert-danger">Error al cargar los datos. Por favor, intente más tarde.</div>';
         });
 }
 
+// Función para mostrar la respuesta de métricas
+function renderMetrics(data) {
+    const container = document.getElementById('metrics-container');
+    if (data.success && data.data) {
+        displayMetrics(data.data);
+    } else {
+        container.innerHTML = '<div class="alert alert-info">No hay métricas disponibles.</div>';
+    }
+}
+
 // Función para mostrar métricas
 function displayMetrics(metricsData) {
     const container = document.getElementById('metrics-container');
@@ -1027,21 +1188,24 @@ function loadDashboard() {
     const container = document.getElementById('dashboard-container');
     container.innerHTML = '<div class="text-center"><div class="loading-spinner"></div><p>Cargando dashboard...</p></div>';
     
-    fetch('/api/dashboard')
-        .then(response => response.json())
-        .then(data => {
-            if (data.success && data.data) {
-                displayDashboard(data.data);
-            } else {
-                container.innerHTML = '<div class="alert alert-info">No hay datos disponibles para el dashboard.</div>';
-            }
-        })
+    fetchJSON('/api/dashboard')
+        .then(renderDashboard)
         .catch(error => {
             console.error('Error fetching dashboard:', error);
             container.innerHTML = '<div class="alert alert-danger">Error al cargar los datos. Por favor, intente más tarde.</div>';
         });
 }
 
+// Función para mostrar la respuesta del dashboard
+function renderDashboard(data) {
+    const container = document.getElementById('dashboard-container');
+    if (data.success && data.data) {
+        displayDashboard(data.data);
+    } else {
+        container.innerHTML = '<div class="alert alert-info">No hay datos disponibles para el dashboard.</div>';
+    }
+}
+
 // Función para mostrar el dashboard
 function displayDashboard(dashboardData) {
     const container = document.getElementById('dashboard-container');
@@ -1096,6 +1260,7 @@ function displayDashboard(dashboardData) {
                             <div class="stats-info">
                                 <h2>${dashboardData.api_stats.response_time.toFixed(4)}ms</h2>
                                 <p>Tiempo de Respuesta Promedio</p>
+                                ${dashboardData.api_stats.response_time_p95 !== undefined ? `<small>p50 ${(dashboardData.api_stats.response_time_p50 * 1000).toFixed(0)}ms · p95 ${(dashboardData.api_stats.response_time_p95 * 1000).toFixed(0)}ms · p99 ${(dashboardData.api_stats.response_time_p99 * 1000).toFixed(0)}ms</small>` : ''}
                             </div>
                         </div>
                     </div>
@@ -1145,6 +1310,39 @@ function displayDashboard(dashboardData) {
     
     dashboardMain.appendChild(statsCards);
     
+    // Rutas y feeds más lentos (p95) según el desglose de estadísticas
+    const slowest = (dashboardData.breakdown && dashboardData.breakdown.slowest) || [];
+    if (slowest.length > 0) {
+        const offendersCard = document.createElement('div');
+        offendersCard.className = 'card mb-4';
+        offendersCard.innerHTML = `
+            <div class="card-header bg-dark text-white">
+                <h5 class="mb-0">Rutas y Feeds Más Lentos</h5>
+            </div>
+            <div class="card-body table-responsive">
+                <table class="table table-sm mb-0">
+                    <thead>
+                        <tr><th>Tipo</th><th>Nombre</th><th>Llamadas</th><th>Errores</th><th>p50</th><th>p95</th><th>p99</th></tr>
+                    </thead>
+                    <tbody>
+                        ${slowest.map(item => `
+                            <tr>
+                                <td>${item.dimension === 'route' ? 'Ruta' : 'Feed'}</td>
+                                <td>${item.name}</td>
+                                <td>${item.calls}</td>
+                                <td>${item.errors}</td>
+                                <td>${(item.response_time_p50 * 1000).toFixed(0)}ms</td>
+                                <td>${(item.response_time_p95 * 1000).toFixed(0)}ms</td>
+                                <td>${(item.response_time_p99 * 1000).toFixed(0)}ms</td>
+                            </tr>
+                        `).join('')}
+                    </tbody>
+                </table>
+            </div>
+        `;
+        dashboardMain.appendChild(offendersCard);
+    }
+    
     // Sección de gráficos
     const chartsSection = document.createElement('div');
     chartsSection.className = 'row';
@@ -1428,13 +1626,34 @@ function createDashboardCharts(dashboardData) {
 
 // Función para cargar el contenido inicial
 function loadInitialContent() {
-    // Cargar datos para cada pestaña
-    loadStandings();
-    loadFixtures();
-    loadHistory();
-    loadResults();
-    loadMetrics();
-    loadDashboard();
+    // Cargar los datos de todas las pestañas en una sola petición
+    fetchJSON('/api/bootstrap')
+        .then(data => {
+            if (!data.success || !data.data) {
+                throw new Error(data.error || 'Respuesta de bootstrap no válida');
+            }
+            const sections = data.data;
+            renderStandings(sections.standings);
+            renderFixtures(sections.fixtures);
+            // Los resultados recientes tienen prioridad sobre el historial en la misma pestaña
+            if (hasRecentResults(sections.results)) {
+                displayMatches(sections.results.data.fixtures, 'history-container', 'resultados');
+            } else {
+                renderHistory(sections.history);
+            }
+            renderMetrics(sections.metrics);
+            renderDashboard(sections.dashboard);
+        })
+        .catch(error => {
+            // Si falla la carga conjunta, cargar cada pestaña por separado
+            console.error('Error fetching bootstrap:', error);
+            loadStandings();
+            loadFixtures();
+            loadHistory();
+            loadResults();
+            loadMetrics();
+            loadDashboard();
+        });
     displayTelegramBot();
 }
 
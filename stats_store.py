@@ -0,0 +1,220 @@
+import os
+import sqlite3
+from contextlib import closing
+
+# Contadores que se suman entre procesos
+COUNTER_FIELDS = (
+    'api_calls_count',
+    'api_errors_count',
+    'cache_hits',
+    'cache_stale_hits',
+    'cache_misses',
+    'coalesced_calls'
+)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS latency (
+    bucket INTEGER PRIMARY KEY,
+    count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history (
+    epoch INTEGER PRIMARY KEY,
+    calls INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    latency_sum REAL NOT NULL,
+    latency_max REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS history_latency (
+    epoch INTEGER NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (epoch, bucket)
+);
+CREATE TABLE IF NOT EXISTS dimensions (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    calls INTEGER NOT NULL,
+    errors INTEGER NOT NULL,
+    cache_hit INTEGER NOT NULL,
+    cache_stale INTEGER NOT NULL,
+    cache_miss INTEGER NOT NULL,
+    latency_total REAL NOT NULL,
+    latency_max REAL NOT NULL,
+    PRIMARY KEY (dimension, value)
+);
+CREATE TABLE IF NOT EXISTS dimension_latency (
+    dimension TEXT NOT NULL,
+    value TEXT NOT NULL,
+    bucket INTEGER NOT NULL,
+    count INTEGER NOT NULL,
+    PRIMARY KEY (dimension, value, bucket)
+);
+"""
+
+ADD_COUNTER = """
+INSERT INTO counters (name, value) VALUES (?, ?)
+ON CONFLICT(name) DO UPDATE SET value = value + excluded.value
+"""
+MAX_COUNTER = """
+INSERT INTO counters (name, value) VALUES (?, ?)
+ON CONFLICT(name) DO UPDATE SET value = max(value, excluded.value)
+"""
+MIN_COUNTER = """
+INSERT INTO counters (name, value) VALUES (?, ?)
+ON CONFLICT(name) DO UPDATE SET value = min(value, excluded.value)
+"""
+ADD_LATENCY = """
+INSERT INTO latency (bucket, count) VALUES (?, ?)
+ON CONFLICT(bucket) DO UPDATE SET count = count + excluded.count
+"""
+ADD_HISTORY = """
+INSERT INTO history (epoch, calls, errors, latency_sum, latency_max) VALUES (?, ?, ?, ?, ?)
+ON CONFLICT(epoch) DO UPDATE SET
+    calls = calls + excluded.calls,
+    errors = errors + excluded.errors,
+    latency_sum = latency_sum + excluded.latency_sum,
+    latency_max = max(latency_max, excluded.latency_max)
+"""
+ADD_HISTORY_LATENCY = """
+INSERT INTO history_latency (epoch, bucket, count) VALUES (?, ?, ?)
+ON CONFLICT(epoch, bucket) DO UPDATE SET count = count + excluded.count
+"""
+ADD_DIMENSION = """
+INSERT INTO dimensions (dimension, value, calls, errors, cache_hit, cache_stale, cache_miss, latency_total, latency_max)
+VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+ON CONFLICT(dimension, value) DO UPDATE SET
+    calls = calls + excluded.calls,
+    errors = errors + excluded.errors,
+    cache_hit = cache_hit + excluded.cache_hit,
+    cache_stale = cache_stale + excluded.cache_stale,
+    cache_miss = cache_miss + excluded.cache_miss,
+    latency_total = latency_total + excluded.latency_total,
+    latency_max = max(latency_max, excluded.latency_max)
+"""
+ADD_DIMENSION_LATENCY = """
+INSERT INTO dimension_latency (dimension, value, bucket, count) VALUES (?, ?, ?, ?)
+ON CONFLICT(dimension, value, bucket) DO UPDATE SET count = count + excluded.count
+"""
+
+class SqliteStatsStore:
+    """Estadísticas de la API compartidas entre procesos en SQLite (modo WAL)
+
+    Cada proceso acumula sus cambios en memoria y los suma aquí en una sola transacción
+    (escritura diferida), así que varios workers no se pisan ni compiten en cada llamada.
+    """
+
+    def __init__(self, path, timeout=5):
+        self.path = path
+        self.timeout = timeout
+        data_dir = os.path.dirname(path)
+        if data_dir and not os.path.exists(data_dir):
+            os.makedirs(data_dir)
+        with closing(self.connect()) as conn:
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.executescript(SCHEMA)
+
+    def connect(self):
+        # Una conexión por operación: es seguro tras un fork y entre hilos
+        conn = sqlite3.connect(self.path, timeout=self.timeout, isolation_level=None)
+        conn.execute('PRAGMA synchronous=NORMAL')
+        return conn
+
+    def apply(self, data, prune_before=None, only_if_empty=False):
+        """Suma al almacén los cambios de un proceso (mismo formato que api_stats.json)
+
+        Con only_if_empty solo se aplican si el almacén está vacío (para importar el JSON
+        anterior una sola vez aunque arranquen varios workers). Devuelve si se aplicaron.
+        """
+        with closing(self.connect()) as conn:
+            conn.execute('BEGIN IMMEDIATE')
+            try:
+                if only_if_empty and conn.execute('SELECT 1 FROM counters LIMIT 1').fetchone():
+                    conn.execute('ROLLBACK')
+                    return False
+
+                conn.executemany(ADD_COUNTER, [(name, data.get(name, 0)) for name in COUNTER_FIELDS if data.get(name)])
+                if data.get('api_start_time'):
+                    conn.execute(MIN_COUNTER, ('api_start_time', data['api_start_time']))
+
+                latency = data.get('api_latency') or {}
+                conn.executemany(ADD_LATENCY, [(int(bucket), count) for bucket, count in latency.get('counts', {}).items()])
+                if latency.get('total'):
+                    conn.execute(ADD_COUNTER, ('latency_total', latency['total']))
+                if latency.get('max'):
+                    conn.execute(MAX_COUNTER, ('latency_max', latency['max']))
+
+                for row in data.get('api_buckets', []):
+                    epoch, calls, errors, latency_sum, latency_max = row[:5]
+                    conn.execute(ADD_HISTORY, (epoch, calls, errors, latency_sum, latency_max))
+                    counts = row[5] if len(row) > 5 else {}
+                    conn.executemany(ADD_HISTORY_LATENCY, [(epoch, int(bucket), count) for bucket, count in counts.items()])
+
+                for dimension, values in data.get('dimensions', {}).items():
+                    for value, stats in values.items():
+                        cache = stats.get('cache', {})
+                        latency = stats.get('latency', {})
+                        conn.execute(ADD_DIMENSION, (
+                            dimension, value, stats.get('calls', 0), stats.get('errors', 0),
+                            cache.get('hit', 0), cache.get('stale', 0), cache.get('miss', 0),
+                            latency.get('total', 0), latency.get('max', 0)
+                        ))
+                        conn.executemany(ADD_DIMENSION_LATENCY, [
+                            (dimension, value, int(bucket), count) for bucket, count in latency.get('counts', {}).items()
+                        ])
+
+                if prune_before is not None:
+                    conn.execute('DELETE FROM history WHERE epoch < ?', (prune_before,))
+                    conn.execute('DELETE FROM history_latency WHERE epoch < ?', (prune_before,))
+                conn.execute('COMMIT')
+                return True
+            except Exception:
+                conn.execute('ROLLBACK')
+                raise
+
+    def load(self, since_epoch=None):
+        """Lee las estadísticas de todos los procesos, en el formato de api_stats.json"""
+        with closing(self.connect()) as conn:
+            counters = dict(conn.execute('SELECT name, value FROM counters'))
+            since = since_epoch if since_epoch is not None else -1
+            buckets = {
+                epoch: [epoch, calls, errors, latency_sum, latency_max, {}]
+                for epoch, calls, errors, latency_sum, latency_max in conn.execute(
+                    'SELECT epoch, calls, errors, latency_sum, latency_max FROM history WHERE epoch >= ? ORDER BY epoch',
+                    (since,))
+            }
+            for epoch, bucket, count in conn.execute(
+                    'SELECT epoch, bucket, count FROM history_latency WHERE epoch >= ?', (since,)):
+                if epoch in buckets:
+                    buckets[epoch][5][str(bucket)] = count
+            latency_counts = {str(bucket): count for bucket, count in conn.execute('SELECT bucket, count FROM latency')}
+
+            dimensions = {}
+            for dimension, value, calls, errors, hit, stale, miss, latency_total, latency_max in conn.execute(
+                    'SELECT dimension, value, calls, errors, cache_hit, cache_stale, cache_miss, latency_total, latency_max '
+                    'FROM dimensions'):
+                dimensions.setdefault(dimension, {})[value] = {
+                    'calls': calls,
+                    'errors': errors,
+                    'cache': {'hit': hit, 'stale': stale, 'miss': miss},
+                    'latency': {'counts': {}, 'total': latency_total, 'max': latency_max}
+                }
+            for dimension, value, bucket, count in conn.execute(
+                    'SELECT dimension, value, bucket, count FROM dimension_latency'):
+                if value in dimensions.get(dimension, {}):
+                    dimensions[dimension][value]['latency']['counts'][str(bucket)] = count
+
+        data = {name: int(counters.get(name, 0)) for name in COUNTER_FIELDS}
+        data['api_start_time'] = counters.get('api_start_time', 0)
+        data['api_latency'] = {
+            'counts': latency_counts,
+            'count': sum(latency_counts.values()),
+            'total': counters.get('latency_total', 0),
+            'max': counters.get('latency_max', 0)
+        }
+        data['api_buckets'] = list(buckets.values())
+        data['dimensions'] = dimensions
+        return data
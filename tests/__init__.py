@@ -1 +1,9 @@
+import os
+import tempfile
 
+# Configuración de pruebas antes de que cualquier módulo importe app: sin refresco en segundo
+# plano y con el archivo de partidos y el snapshot de feeds fuera de data/
+os.environ.setdefault('BACKGROUND_REFRESH', '0')
+TEST_DATA_DIR = tempfile.mkdtemp()
+os.environ.setdefault('MATCH_STORE_PATH', os.path.join(TEST_DATA_DIR, 'matches.db'))
+os.environ.setdefault('FEED_SNAPSHOT_PATH', os.path.join(TEST_DATA_DIR, 'feed_snapshot.json'))
@@ -0,0 +1,375 @@
+import unittest
+import json
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import patch, MagicMock
+
+# Variables de entorno mínimas para importar la aplicación sin credenciales reales
+for var in ('SECRET_KEY', 'RECAPTCHA_SITE_KEY', 'RECAPTCHA_SECRET_KEY', 'LIVESCORE_API_KEY', 'LIVESCORE_API_SECRET'):
+    os.environ.setdefault(var, 'test')
+os.environ['BACKGROUND_REFRESH'] = '0'
+os.environ['MATCH_STORE_PATH'] = os.path.join(tempfile.mkdtemp(), 'matches.db')
+
+# Agregar el directorio principal al path para poder importar app
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import app as app_module
+from match_store import MatchStore
+from standings_engine import StandingsEngine
+
+def upstream_response(url, **kwargs):
+    """Simula las respuestas de LiveScore según la URL consultada"""
+    mock_response = MagicMock()
+    mock_response.elapsed.total_seconds.return_value = 0.1
+    if 'topscorers' in url:
+        data = {'topscorers': [{'name': 'Jugador 1', 'goals': '10'}]}
+    elif 'table' in url:
+        data = {'table': [{'name': 'Equipo 1', 'goals_scored': '20', 'goals_conceded': '10'}]}
+    elif 'fixtures' in url:
+        data = {'fixtures': [{'id': '1', 'round': '14', 'date': '2099-01-03', 'time': '19:00:00'},
+                             {'id': '2', 'round': '15', 'date': '2099-01-10', 'time': '19:00:00'}]}
+    else:
+        data = {'match': [{'id': '1'}, {'id': '2'}], 'total_pages': 1}
+    mock_response.json.return_value = {'success': True, 'data': data}
+    return mock_response
+
+class ApiRoutesTests(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Si otro módulo de pruebas importó app antes, el refresco en segundo plano pudo quedar activo
+        if app_module.feed_refresher.is_running():
+            app_module.feed_refresher.stop()
+            app_module.feed_refresher.thread.join(timeout=5)
+
+    def setUp(self):
+        self.refresh_patch = patch.object(app_module, 'BACKGROUND_REFRESH', False)
+        self.refresh_patch.start()
+        app_module.app.config['TESTING'] = True
+        self.client = app_module.app.test_client()
+        with self.client.session_transaction() as session:
+            session['human_verified'] = True
+
+        # No escribir las estadísticas de prueba en data/api_stats.json
+        self.stats_dir = tempfile.TemporaryDirectory()
+        self.stats_patch = patch.object(app_module.api_stats, 'stats_file',
+                                        os.path.join(self.stats_dir.name, 'api_stats.json'))
+        self.stats_patch.start()
+        self.flush_patch = patch.object(app_module.api_stats, 'flush_interval', None)
+        self.flush_patch.start()
+        self.snapshot_patch = patch.object(app_module.response_cache, 'snapshot', None)
+        self.snapshot_patch.start()
+        self.match_patch = patch.object(app_module, 'match_store',
+                                        MatchStore(os.path.join(self.stats_dir.name, 'matches.db')))
+        self.match_patch.start()
+        self.engine_patch = patch.object(app_module, 'standings_engine', StandingsEngine(app_module.match_store))
+        self.engine_patch.start()
+        app_module.response_cache.invalidate()
+
+        self.get_patch = patch.object(app_module.upstream.session, 'get', side_effect=upstream_response)
+        self.mock_get = self.get_patch.start()
+
+    def tearDown(self):
+        self.get_patch.stop()
+        self.engine_patch.stop()
+        self.match_patch.stop()
+        self.snapshot_patch.stop()
+        self.flush_patch.stop()
+        self.stats_patch.stop()
+        self.stats_dir.cleanup()
+        self.refresh_patch.stop()
+
+    def test_bootstrap_contains_all_sections(self):
+        """Prueba que /api/bootstrap devuelva todas las secciones con una llamada por feed"""
+        response = self.client.get('/api/bootstrap')
+
+        self.assertEqual(response.status_code, 200)
+        data = json.loads(response.data)
+        self.assertTrue(data['success'])
+        self.assertEqual(set(data['data']), set(app_module.BOOTSTRAP_SECTIONS))
+        for section in data['data'].values():
+            self.assertTrue(section['success'])
+        self.assertEqual([f['id'] for f in data['data']['fixtures']['data']['fixtures']], ['1'])
+        self.assertEqual(data['data']['metrics']['data']['goals_by_team'][0]['team'], 'Equipo 1')
+        # Cinco feeds distintos: tabla, calendario, historial, resultados y goleadores
+        self.assertEqual(self.mock_get.call_count, 5)
+
+    def test_bootstrap_reports_section_errors(self):
+        """Prueba que un feed caído solo afecte a sus secciones"""
+        def failing_standings(url, **kwargs):
+            if 'table' in url:
+                raise ConnectionError('Error simulado')
+            return upstream_response(url)
+
+        self.mock_get.side_effect = failing_standings
+        data = json.loads(self.client.get('/api/bootstrap').data)
+
+        self.assertFalse(data['data']['standings']['success'])
+        self.assertFalse(data['data']['metrics']['success'])
+        self.assertTrue(data['data']['fixtures']['success'])
+    def test_failed_calls_record_elapsed_time(self):
+        """Prueba que una llamada fallida registre el tiempo que esperó y no 0"""
+        def slow_failure(url, **kwargs):
+            time.sleep(0.05)
+            raise ConnectionError('Error simulado')
+
+        self.mock_get.side_effect = slow_failure
+        with patch.object(app_module, 'track_api_call') as track:
+            self.client.get('/api/standings')
+        success, response_time = track.call_args[0]
+        self.assertFalse(success)
+        self.assertGreaterEqual(response_time, 0.05)
+
+    def test_errors_hide_credentials(self):
+        """Prueba que los errores enviados al navegador no incluyan key= ni secret="""
+        def failing_get(url, **kwargs):
+            raise ConnectionError(f'Max retries exceeded with url: {url}')
+
+        self.mock_get.side_effect = failing_get
+        for path in ('/api/bootstrap', '/api/results'):
+            body = self.client.get(path).get_data(as_text=True)
+            self.assertIn('key=***', body)
+            self.assertNotIn(f'key={app_module.LIVESCORE_API_KEY}&', body)
+            self.assertNotIn(f'secret={app_module.LIVESCORE_API_SECRET}', body)
+
+    def test_upstream_5xx_is_tracked_as_error(self):
+        """Prueba que un 5xx cuente como fallo con su clase de estado, tenga o no cuerpo JSON"""
+        def server_error(url, **kwargs):
+            response = upstream_response(url)
+            response.status_code = 503
+            return response
+
+        def bad_gateway(url, **kwargs):
+            response = server_error(url)
+            response.status_code = 502
+            response.json.side_effect = ValueError('Expecting value')
+            return response
+
+        for side_effect in (server_error, bad_gateway):
+            self.mock_get.side_effect = side_effect
+            with patch.object(app_module, 'track_api_call') as track:
+                try:
+                    app_module.request_upstream(app_module.RESULTS_URL, ingest=False)
+                except ValueError:
+                    pass
+            self.assertFalse(track.call_args[0][0])
+            self.assertEqual(track.call_args[1]['status'], '5xx')
+
+    def test_etag_and_not_modified(self):
+        """Prueba que una respuesta sin cambios se revalide con 304 y sin cuerpo"""
+        response = self.client.get('/api/standings')
+        etag = response.headers.get('ETag')
+        self.assertIsNotNone(etag)
+        self.assertEqual(response.headers['Cache-Control'], 'private, no-cache')
+        self.assertIsNotNone(response.last_modified)
+
+        cached = self.client.get('/api/standings', headers={'If-None-Match': etag})
+        self.assertEqual(cached.status_code, 304)
+        self.assertEqual(cached.data, b'')
+
+        changed = self.client.get('/api/standings', headers={'If-None-Match': '"otro"'})
+        self.assertEqual(changed.status_code, 200)
+
+    def test_local_and_dated_responses_have_no_last_modified(self):
+        """Prueba que la tabla calculada y el calendario (jornada según la fecha) solo usen ETag"""
+        app_module.match_store.write([
+            {'id': '1', 'date': '2025-03-01', 'round': '1', 'home_name': 'América', 'away_name': 'Chivas',
+             'ft_score': '2 - 1', 'status': 'FINISHED'}
+        ])
+        self.client.get('/api/standings')
+        for path in ('/api/standings?as_of_round=1', '/api/standings?season=2025%20Clausura', '/api/fixtures'):
+            response = self.client.get(path)
+            self.assertEqual(response.status_code, 200)
+            self.assertIsNotNone(response.headers.get('ETag'))
+            self.assertIsNone(response.last_modified)
+
+    def test_dashboard_has_no_last_modified(self):
+        """Prueba que el dashboard, con estadísticas en vivo, solo use ETag"""
+        response = self.client.get('/api/dashboard')
+        self.assertIsNotNone(response.headers.get('ETag'))
+        self.assertIsNone(response.last_modified)
+
+    def test_errors_have_no_etag(self):
+        """Prueba que las respuestas de error no se puedan revalidar"""
+        self.mock_get.side_effect = ConnectionError('Error simulado')
+        response = self.client.get('/api/history')
+        self.assertEqual(response.status_code, 500)
+        self.assertIsNone(response.headers.get('ETag'))
+    def test_compressed_response_keeps_weak_etag(self):
+        """Prueba que una respuesta comprimida se pueda revalidar con su ETag débil"""
+        with patch.object(app_module, 'COMPRESS_MIN_SIZE', 10):
+            response = self.client.get('/api/standings', headers={'Accept-Encoding': 'gzip'})
+            self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+            etag = response.headers['ETag']
+            self.assertTrue(etag.startswith('W/'))
+
+            cached = self.client.get('/api/standings', headers={'Accept-Encoding': 'gzip', 'If-None-Match': etag})
+            self.assertEqual(cached.status_code, 304)
+
+    def test_metrics_does_not_call_upstream(self):
+        """Prueba que /metrics responda en formato OpenMetrics sin verificación ni consultas a LiveScore"""
+        client = app_module.app.test_client()
+        response = client.get('/metrics')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.content_type.startswith('application/openmetrics-text'))
+        self.assertIn(b'ligamx_upstream_calls_total', response.data)
+        self.mock_get.assert_not_called()
+
+    def test_metrics_token(self):
+        """Prueba que con METRICS_TOKEN se exija el token"""
+        with patch.object(app_module, 'METRICS_TOKEN', 'secreto'):
+            self.assertEqual(self.client.get('/metrics').status_code, 401)
+            response = self.client.get('/metrics', headers={'Authorization': 'Bearer secreto'})
+            self.assertEqual(response.status_code, 200)
+
+    def test_routes_and_feeds_are_tracked(self):
+        """Prueba que las llamadas se registren por feed y las peticiones por ruta"""
+        self.client.get('/api/metrics')
+        breakdown = app_module.api_stats.get_breakdown()
+        self.assertIn('get_metrics', {item['name'] for item in breakdown['route']})
+        self.assertTrue({'topscorers', 'standings'} <= {item['name'] for item in breakdown['feed']})
+
+    def test_history_pages_are_served_from_store(self):
+        """Prueba que una página del historial de LiveScore ya descargada se sirva del archivo local"""
+        first = app_module.build_history(40)
+        self.assertEqual([match['id'] for match in first['data']['match']], ['1', '2'])
+        calls = self.mock_get.call_count
+        self.assertIn('page=40', self.mock_get.call_args[0][0])
+
+        app_module.response_cache.invalidate()
+        second = app_module.build_history(40)
+        self.assertEqual(second, first)
+        self.assertEqual(self.mock_get.call_count, calls)
+
+    def test_history_filters_and_cursor(self):
+        """Prueba los filtros de /api/history y que el cursor recorra todos los partidos sin repetir"""
+        app_module.match_store.write([
+            {'id': str(i), 'date': f'2025-03-{i:02d}', 'round': str(i % 3), 'time': '19:00',
+             'home_name': 'América' if i % 2 else 'Pumas', 'away_name': 'Chivas'}
+            for i in range(1, 11)
+        ])
+
+        data = self.client.get('/api/history?team=América&page_size=2').get_json()['data']
+        self.assertEqual([match['id'] for match in data['match']], ['9', '7'])
+        self.assertEqual((data['total'], data['total_pages']), (5, 3))
+
+        seen = []
+        url = '/api/history?page_size=3&from=2025-03-02&to=2025-03-09'
+        while url:
+            data = self.client.get(url).get_json()['data']
+            seen += [match['id'] for match in data['match']]
+            url = f"/api/history?page_size=3&from=2025-03-02&to=2025-03-09&cursor={data['next_cursor']}" if data['next_cursor'] else None
+        self.assertEqual(seen, [str(i) for i in range(9, 1, -1)])
+
+        data = self.client.get('/api/history?round=0&page=2&page_size=2').get_json()['data']
+        self.assertEqual([match['id'] for match in data['match']], ['3'])
+        self.mock_get.assert_not_called()
+
+    def test_history_rejects_invalid_parameters(self):
+        """Prueba que los parámetros inválidos de /api/history respondan 400 y los filtros sin archivo 503"""
+        self.assertEqual(self.client.get('/api/history?team=América').status_code, 503)
+        app_module.match_store.write([{'id': '1', 'date': '2025-03-01', 'home_name': 'América', 'away_name': 'Chivas'}])
+        self.assertEqual(self.client.get('/api/history?page_size=500').status_code, 400)
+        self.assertEqual(self.client.get('/api/history?from=01-03-2025').status_code, 400)
+        self.assertEqual(self.client.get('/api/history?cursor=basura').status_code, 400)
+
+    def test_history_rejects_invalid_page(self):
+        """Prueba que una página menor a 1 responda 400"""
+        self.assertEqual(self.client.get('/api/history?page=0').status_code, 400)
+
+    def test_dashboard_counts_from_store_without_upstream(self):
+        """Prueba que con el historial completo el dashboard dé totales exactos sin consultar LiveScore"""
+        store = app_module.match_store
+        store.write([
+            {'id': '1', 'date': '2025-08-10', 'home_name': 'América', 'away_name': 'Toluca'},
+            {'id': '2', 'date': '2025-02-01', 'home_name': 'América', 'away_name': 'Pumas'}
+        ])
+        store.set_state(app_module.HISTORY_SYNC_STATE, {'backfill_done': True})
+
+        data = self.client.get('/api/dashboard').get_json()['data']
+        self.assertEqual(data['total_matches'], 2)
+        self.assertTrue(data['total_matches_exact'])
+        self.assertEqual(data['matches_by_team']['América'], 2)
+        self.assertEqual(data['matches_by_season'], {'2025 Apertura': 1, '2025 Clausura': 1})
+        self.mock_get.assert_not_called()
+
+    def test_standings_as_of_round_from_store(self):
+        """Prueba que la tabla a una jornada se calcule con los resultados guardados sin consultar LiveScore"""
+        app_module.match_store.write([
+            {'id': '1', 'date': '2025-03-01', 'round': '1', 'home_name': 'América', 'away_name': 'Chivas',
+             'ft_score': '0 - 1', 'status': 'FINISHED'},
+            {'id': '2', 'date': '2025-03-08', 'round': '2', 'home_name': 'América', 'away_name': 'Pumas',
+             'ft_score': '3 - 0', 'status': 'FINISHED'}
+        ])
+        data = self.client.get('/api/standings?as_of_round=1').get_json()['data']
+        self.assertEqual([row['name'] for row in data['table']], ['Chivas', 'Pumas', 'América'])
+        self.assertEqual(data['source'], 'local')
+        self.mock_get.assert_not_called()
+
+        self.assertEqual(self.client.get('/api/standings?as_of_round=x').status_code, 400)
+        self.assertEqual(self.client.get('/api/standings?as_of_round=1&as_of_date=2025-03-01').status_code, 400)
+
+    def test_standings_fall_back_when_upstream_raises(self):
+        """Prueba que si LiveScore lanza un error la tabla actual se calcule con los resultados guardados"""
+        app_module.match_store.write([
+            {'id': '1', 'date': '2025-03-01', 'round': '1', 'home_name': 'América', 'away_name': 'Chivas',
+             'ft_score': '2 - 1', 'status': 'FINISHED'}
+        ])
+        self.mock_get.side_effect = ConnectionError('Error simulado')
+
+        response = self.client.get('/api/standings')
+        self.assertEqual(response.status_code, 200)
+        data = response.get_json()['data']
+        self.assertEqual(data['source'], 'local')
+        self.assertEqual([row['name'] for row in data['table']], ['América', 'Chivas'])
+
+    def test_fixtures_by_round(self):
+        """Prueba que /api/fixtures use la jornada actual y acepte ?round="""
+        data = self.client.get('/api/fixtures').get_json()['data']
+        self.assertEqual((data['round'], data['current_round'], data['rounds']), ('14', '14', ['14', '15']))
+        data = self.client.get('/api/fixtures?round=15').get_json()['data']
+        self.assertEqual([fixture['id'] for fixture in data['fixtures']], ['2'])
+        self.assertEqual(self.client.get('/api/fixtures?round=3').get_json()['data']['fixtures'], [])
+
+    def test_live_stream_uses_cached_results(self):
+        """Prueba que /api/live/stream envíe el estado de los resultados sin una consulta por conexión"""
+        with patch.object(app_module, 'live_broadcaster', app_module.LiveBroadcaster()):
+            for _ in range(2):
+                response = self.client.get('/api/live/stream', buffered=False)
+                self.assertEqual(response.mimetype, 'text/event-stream')
+                chunks = response.iter_encoded()
+                next(chunks)
+                self.assertIn(b'event: snapshot', next(chunks))
+                response.close()
+            self.assertEqual(self.mock_get.call_count, 1)
+
+    def test_live_stream_reports_upstream_errors(self):
+        """Prueba que si LiveScore falla al conectarse se envíe un evento de error para reintentar"""
+        self.mock_get.side_effect = ConnectionError('Error simulado')
+        with patch.object(app_module, 'live_broadcaster', app_module.LiveBroadcaster()):
+            response = self.client.get('/api/live/stream')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.mimetype, 'text/event-stream')
+        self.assertIn(b'retry: 30000', response.data)
+        self.assertIn(b'event: feed_error', response.data)
+
+    def test_standings_since_version(self):
+        """Prueba que /api/standings?since= responda solo los cambios o la tabla completa si la versión no se conoce"""
+        full = self.client.get('/api/standings').get_json()
+        self.assertTrue(full['version'])
+
+        delta = self.client.get(f"/api/standings?since={full['version']}").get_json()
+        self.assertTrue(delta['delta'])
+        self.assertEqual((delta['data']['changed'], delta['data']['removed']), ([], []))
+
+        unknown = self.client.get('/api/standings?since=vieja').get_json()
+        self.assertEqual(unknown['data']['table'], full['data']['table'])
+
+    def test_results_are_lean_and_projected(self):
+        """Prueba que /api/results use el esquema reducido y acepte ?fields="""
+        data = self.client.get('/api/results?fields=id').get_json()
+        self.assertEqual(data['data']['match'], [{'id': '1'}, {'id': '2'}])
+        self.assertEqual(set(data['data']), {'match', 'total_pages'})
+
+if __name__ == '__main__':
+    unittest.main()
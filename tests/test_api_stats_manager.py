@@ -0,0 +1,201 @@
+import unittest
+import json
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import patch
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api_stats_manager import ApiStatsManager, TimeBucketRing, LatencyHistogram
+
+class ApiStatsManagerTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.stats_file = os.path.join(self.tmp_dir.name, 'api_stats.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def read_stats(self):
+        with open(self.stats_file) as f:
+            return json.load(f)
+
+    def test_synchronous_mode_saves_every_call(self):
+        """Prueba que sin escritura diferida cada llamada se guarde de inmediato"""
+        manager = ApiStatsManager(stats_file=self.stats_file)
+        manager.track_api_call(True, 0.5)
+        self.assertEqual(self.read_stats()['api_calls_count'], 1)
+
+    def test_write_behind_does_not_write_on_call(self):
+        """Prueba que en modo diferido las llamadas no escriban el archivo en el momento"""
+        manager = ApiStatsManager(stats_file=self.stats_file, flush_interval=3600)
+        with patch.object(manager, 'save_stats') as mock_save:
+            manager.track_api_call(True, 0.5)
+            manager.track_api_call(False, 0)
+            mock_save.assert_not_called()
+
+        self.assertEqual(manager.get_api_stats()['calls'], 2)
+        manager.flush()
+        self.assertEqual(self.read_stats()['api_calls_count'], 2)
+
+    def test_flush_after_n_events(self):
+        """Prueba que el hilo de fondo guarde tras flush_every llamadas"""
+        manager = ApiStatsManager(stats_file=self.stats_file, flush_interval=3600, flush_every=3)
+        for _ in range(3):
+            manager.track_api_call(True, 0.1)
+
+        for _ in range(100):
+            if os.path.exists(self.stats_file):
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.read_stats()['api_calls_count'], 3)
+
+    def test_stats_are_reloaded(self):
+        """Prueba que un proceso nuevo cargue las estadísticas guardadas"""
+        manager = ApiStatsManager(stats_file=self.stats_file, flush_interval=3600)
+        manager.track_api_call(True, 0.1)
+        manager.track_cache_event('hit')
+        manager.flush()
+
+        reloaded = ApiStatsManager(stats_file=self.stats_file)
+        self.assertEqual(reloaded.get_api_stats()['calls'], 1)
+        self.assertEqual(reloaded.get_cache_stats()['hits'], 1)
+        self.assertEqual([name for name in os.listdir(self.tmp_dir.name)], ['api_stats.json'])
+
+    def test_trend_keeps_dashboard_shape(self):
+        """Prueba que la tendencia tenga una entrada por hora para cada serie"""
+        manager = ApiStatsManager(history_intervals=6, stats_file=self.stats_file)
+        manager.track_api_call(True, 0.2)
+        manager.track_api_call(False, 0.4)
+
+        trend = manager.get_api_trend()
+        for key in ('calls', 'success_rate', 'response_time', 'errors'):
+            self.assertEqual(len(trend[key]), 6)
+        self.assertEqual(len(manager.get_hours()), 6)
+        self.assertEqual(trend['calls'][-1], 2)
+        self.assertEqual(trend['errors'][-1], 1)
+        self.assertEqual(trend['success_rate'][-1], 50)
+        self.assertAlmostEqual(trend['response_time'][-1], 0.3)
+        self.assertEqual(trend['success_rate'][0], 100)
+
+    def test_history_survives_reload(self):
+        """Prueba que las cubetas guardadas se recuperen al reiniciar"""
+        manager = ApiStatsManager(stats_file=self.stats_file)
+        manager.track_api_call(True, 0.1)
+
+        reloaded = ApiStatsManager(stats_file=self.stats_file)
+        self.assertEqual(reloaded.get_api_trend()['calls'][-1], 1)
+
+    def test_legacy_history_is_converted(self):
+        """Prueba que el historial en listas del formato anterior se convierta a cubetas"""
+        from datetime import datetime
+        with open(self.stats_file, 'w') as f:
+            json.dump({
+                'api_calls_count': 3,
+                'api_history': {'calls': [0, 1, 2], 'success_rate': [100, 100, 50],
+                                'response_time': [0, 0.1, 0.2], 'errors': [0, 0, 1]},
+                'last_updated': datetime.now().isoformat()
+            }, f)
+
+        trend = ApiStatsManager(history_intervals=3, stats_file=self.stats_file).get_api_trend()
+        self.assertEqual(trend['calls'], [0, 1, 2])
+        self.assertEqual(trend['errors'], [0, 0, 1])
+
+    def test_breakdown_by_feed_route_and_status(self):
+        """Prueba que el desglose identifique el feed lento y la ruta con errores"""
+        manager = ApiStatsManager(stats_file=self.stats_file)
+        for _ in range(5):
+            manager.track_api_call(True, 0.8, feed='standings', status='2xx')
+            manager.track_api_call(True, 3.0, feed='topscorers', status='2xx')
+        manager.track_api_call(False, 0, feed='history', status='timeout')
+        manager.track_cache_event('hit', feed='standings')
+        manager.track_request('get_dashboard', 500, 0.1)
+
+        breakdown = manager.get_dashboard_data()['breakdown']
+        self.assertEqual(breakdown['slowest'][0]['name'], 'topscorers')
+        self.assertEqual(breakdown['slowest'][0]['dimension'], 'feed')
+        self.assertEqual(breakdown['most_errors'][0]['error_rate'], 100)
+        self.assertEqual({item['name'] for item in breakdown['status']}, {'2xx', 'timeout'})
+        standings = next(item for item in breakdown['feed'] if item['name'] == 'standings')
+        self.assertEqual(standings['cache_hit_rate'], 100)
+        self.assertEqual(manager.get_api_stats()['calls'], 11)
+
+        # El desglose se guarda y se recupera
+        manager.save_stats()
+        reloaded = ApiStatsManager(stats_file=self.stats_file).get_breakdown()
+        self.assertEqual(reloaded['route'][0]['name'], 'get_dashboard')
+
+    def test_dimension_values_are_bounded(self):
+        """Prueba que los valores de más en una dimensión se agrupen en 'other'"""
+        manager = ApiStatsManager(stats_file=self.stats_file)
+        manager.dimensions.max_values = 3
+        for i in range(10):
+            manager.track_request(f'ruta_{i}', 200, 0.01)
+        names = {item['name'] for item in manager.get_breakdown()['route']}
+        self.assertEqual(len(names), 3)
+        self.assertIn('other', names)
+
+class TimeBucketRingTests(unittest.TestCase):
+    def test_old_buckets_roll_out_of_window(self):
+        """Prueba que al avanzar el tiempo las cubetas viejas se reutilicen"""
+        ring = TimeBucketRing(3, bucket_seconds=60)
+        ring.add(True, 0.1, timestamp=600)
+        ring.add(False, 0.3, timestamp=630)
+        self.assertEqual([slot is not None for _, slot in ring.window(now=659)], [False, False, True])
+
+        # Tres cubetas después la misma posición se reinicia para la nueva época
+        ring.add(True, 0.2, timestamp=780)
+        self.assertEqual(ring.epochs[13 % 3], 13)
+        self.assertEqual(ring.calls[13 % 3], 1)
+        self.assertEqual(ring.errors[13 % 3], 0)
+        self.assertEqual([slot is not None for _, slot in ring.window(now=780)], [False, False, True])
+
+    def test_stale_saved_bucket_is_ignored(self):
+        """Prueba que una cubeta guardada más vieja que la actual no la sobrescriba"""
+        ring = TimeBucketRing(3, bucket_seconds=60)
+        ring.add(True, 0.1, timestamp=780)
+        ring.merge(10, 5, 0, 0.5, 0.1)
+        self.assertEqual(ring.epochs[1], 13)
+        self.assertEqual(ring.calls[1], 1)
+
+class LatencyHistogramTests(unittest.TestCase):
+    def test_percentiles_show_bimodal_latency(self):
+        """Prueba que los percentiles distingan las respuestas rápidas de las lentas"""
+        histogram = LatencyHistogram()
+        for _ in range(90):
+            histogram.add(0.8)
+        for _ in range(10):
+            histogram.add(3.0)
+
+        summary = histogram.summary()
+        self.assertAlmostEqual(summary['p50'], 0.8, delta=0.08)
+        self.assertAlmostEqual(summary['p95'], 3.0, delta=0.3)
+        self.assertEqual(summary['max'], 3.0)
+        self.assertAlmostEqual(histogram.mean(), 1.02)
+
+    def test_memory_is_bounded(self):
+        """Prueba que el número de cubetas no crezca con el número de llamadas"""
+        histogram = LatencyHistogram()
+        for i in range(20000):
+            histogram.add((i % 5000) / 1000)
+        histogram.add(10000)
+        self.assertLessEqual(len(histogram.counts), histogram.max_index + 1)
+        self.assertEqual(histogram.count, 20001)
+
+    def test_dashboard_exposes_percentiles(self):
+        """Prueba que las estadísticas y la tendencia incluyan p50/p95/p99 y se recuperen al recargar"""
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            stats_file = os.path.join(tmp_dir, 'api_stats.json')
+            manager = ApiStatsManager(stats_file=stats_file)
+            for response_time in (0.1, 0.2, 2.0):
+                manager.track_api_call(True, response_time)
+
+            stats = ApiStatsManager(stats_file=stats_file).get_dashboard_data()
+            self.assertEqual(stats['api_stats']['response_time_max'], 2.0)
+            self.assertAlmostEqual(stats['api_stats']['response_time_p99'], 2.0, delta=0.2)
+            self.assertAlmostEqual(stats['api_trend']['response_time_p50'][-1], 0.2, delta=0.02)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,74 @@
+import unittest
+import gzip
+import sys
+import os
+import tempfile
+from flask import Flask, jsonify, request
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from compression import compress_response, send_static
+from precompress_static import precompress
+
+class CompressionTests(unittest.TestCase):
+    def setUp(self):
+        self.static_dir = tempfile.TemporaryDirectory()
+        with open(os.path.join(self.static_dir.name, 'main.js'), 'w') as f:
+            f.write('console.log("Liga MX");\n' * 100)
+
+        self.app = Flask(__name__)
+        static_dir = self.static_dir.name
+
+        @self.app.route('/api/data')
+        def data():
+            return jsonify({'table': [{'name': 'Equipo %d' % i} for i in range(50)]})
+
+        @self.app.route('/api/small')
+        def small():
+            return jsonify({'ok': True})
+
+        @self.app.route('/files/<path:filename>')
+        def static_file(filename):
+            return send_static(static_dir, filename, request)
+
+        @self.app.after_request
+        def compress(response):
+            return compress_response(response, request, min_size=500)
+
+        self.client = self.app.test_client()
+
+    def tearDown(self):
+        self.static_dir.cleanup()
+
+    def test_gzip_dynamic_response(self):
+        """Prueba que una respuesta grande se comprima si el cliente acepta gzip"""
+        response = self.client.get('/api/data', headers={'Accept-Encoding': 'gzip'})
+
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('Accept-Encoding', response.headers['Vary'])
+        self.assertIn(b'Equipo 49', gzip.decompress(response.data))
+
+    def test_no_compression_when_not_accepted(self):
+        """Prueba que no se comprima si el cliente no lo acepta o la respuesta es pequeña"""
+        self.assertNotIn('Content-Encoding', self.client.get('/api/data').headers)
+        small = self.client.get('/api/small', headers={'Accept-Encoding': 'gzip'})
+        self.assertNotIn('Content-Encoding', small.headers)
+
+    def test_precompressed_static_file(self):
+        """Prueba que se sirva la versión .gz generada por el paso de build"""
+        self.assertGreaterEqual(precompress(self.static_dir.name), 1)
+        self.assertTrue(os.path.exists(os.path.join(self.static_dir.name, 'main.js.gz')))
+
+        response = self.client.get('/files/main.js', headers={'Accept-Encoding': 'gzip'})
+        self.assertEqual(response.headers['Content-Encoding'], 'gzip')
+        self.assertIn('javascript', response.mimetype)
+        response.direct_passthrough = False
+        self.assertIn(b'Liga MX', gzip.decompress(response.get_data()))
+        response.close()
+
+        plain = self.client.get('/files/main.js')
+        self.assertNotIn('Content-Encoding', plain.headers)
+        plain.close()
+
+if __name__ == '__main__':
+    unittest.main()
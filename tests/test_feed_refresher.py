@@ -0,0 +1,100 @@
+import unittest
+import sys
+import os
+import time
+from unittest.mock import MagicMock
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from feed_refresher import FeedRefresher
+from response_cache import ResponseCache
+
+class FeedRefresherTests(unittest.TestCase):
+    def setUp(self):
+        self.cache = ResponseCache(cacheable=lambda data: data.get('success'))
+        self.loader = MagicMock(return_value={'success': True, 'data': {}})
+        self.refresher = FeedRefresher(self.cache, self.loader, poll_seconds=0.01)
+        self.refresher.add_feed('standings', 'https://livescore-api.com/table', 300)
+
+    def tearDown(self):
+        self.refresher.stop()
+
+    def test_refresh_stores_feed_in_cache(self):
+        """Prueba que un refresco exitoso guarde el feed en la caché"""
+        self.assertTrue(self.refresher.refresh('standings'))
+
+        self.assertEqual(self.cache.peek('https://livescore-api.com/table'), {'success': True, 'data': {}})
+        status = self.refresher.get_status()['standings']
+        self.assertIsNotNone(status['last_refresh'])
+        self.assertEqual(status['failures'], 0)
+
+    def test_job_runs_without_cache(self):
+        """Prueba que una tarea periódica registre su estado sin usar la caché"""
+        task = MagicMock(side_effect=[None, RuntimeError('Sin conexión')])
+        self.refresher.add_job('history_sync', task, 3600)
+
+        self.assertTrue(self.refresher.refresh('history_sync'))
+        self.assertFalse(self.refresher.refresh('history_sync'))
+        self.assertEqual(self.refresher.get_status()['history_sync']['last_error'], 'Sin conexión')
+        self.assertFalse(self.refresher.manages(None))
+
+    def test_listeners_receive_successful_refreshes(self):
+        """Prueba que los avisos de refresco solo lleguen con datos válidos, aunque un aviso falle"""
+        received = []
+        self.refresher.add_listener(MagicMock(side_effect=RuntimeError('Aviso roto')))
+        self.refresher.add_listener(lambda name, data: received.append((name, data)))
+
+        self.assertTrue(self.refresher.refresh('standings'))
+        self.loader.return_value = {'success': False}
+        self.refresher.refresh('standings')
+        self.assertEqual(received, [('standings', {'success': True, 'data': {}})])
+
+    def test_failed_refresh_keeps_previous_data(self):
+        """Prueba que un fallo se registre sin borrar el último dato bueno"""
+        self.refresher.refresh('standings')
+        self.loader.return_value = {'success': False, 'error': 'Límite excedido'}
+
+        self.assertFalse(self.refresher.refresh('standings'))
+
+        self.assertEqual(self.cache.peek('https://livescore-api.com/table'), {'success': True, 'data': {}})
+        status = self.refresher.get_status()['standings']
+        self.assertEqual(status['failures'], 1)
+        self.assertEqual(status['last_error'], 'Límite excedido')
+
+    def test_errors_hide_credentials(self):
+        """Prueba que el error mostrado en el dashboard no incluya key= ni secret="""
+        self.loader.side_effect = ConnectionError(
+            "HTTPSConnectionPool: Max retries exceeded with url: /table?key=abc123&secret=xyz789&competition_id=45")
+        self.assertFalse(self.refresher.refresh('standings'))
+
+        last_error = self.refresher.get_status()['standings']['last_error']
+        self.assertNotIn('abc123', last_error)
+        self.assertNotIn('xyz789', last_error)
+        self.assertIn('key=***&secret=***&competition_id=45', last_error)
+
+    def test_start_refreshes_all_feeds(self):
+        """Prueba que al iniciar se carguen todos los feeds y se reconozcan sus URLs"""
+        self.assertFalse(self.refresher.manages('https://livescore-api.com/table'))
+        self.refresher.start()
+
+        for _ in range(100):
+            if self.loader.called:
+                break
+            time.sleep(0.01)
+        self.assertTrue(self.loader.called)
+        self.assertTrue(self.refresher.manages('https://livescore-api.com/table'))
+        self.assertFalse(self.refresher.manages('https://livescore-api.com/otra'))
+    def test_dynamic_interval_is_rescheduled(self):
+        """Prueba que un feed con intervalo variable se reprograme después de cada refresco"""
+        intervals = iter([600, 45])
+        self.refresher.add_feed('results', 'https://livescore-api.com/results', lambda: next(intervals))
+        self.assertEqual(self.refresher.get_status()['results']['interval'], 600)
+
+        self.refresher.run_job('results')
+
+        self.assertEqual(self.refresher.get_status()['results']['interval'], 45)
+        results_jobs = [job for job in self.refresher.scheduler.jobs if job.job_func.args == ('results',)]
+        self.assertEqual(len(results_jobs), 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,78 @@
+import unittest
+import json
+import sys
+import os
+import tempfile
+import time
+from unittest.mock import MagicMock
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from feed_snapshot import FeedSnapshot, snapshot_key, SNAPSHOT_VERSION
+from response_cache import ResponseCache
+
+STANDINGS_URL = 'https://livescore-api.com/api-client/leagues/table.json?competition_id=45&key=abc&secret=xyz'
+
+class FeedSnapshotTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp_dir.name, 'feed_snapshot.json')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_credentials_are_not_stored(self):
+        """Prueba que la clave y el secreto de la API no se escriban en disco"""
+        self.assertEqual(snapshot_key(STANDINGS_URL),
+                         'https://livescore-api.com/api-client/leagues/table.json?competition_id=45')
+
+        snapshot = FeedSnapshot(self.path, min_interval=0)
+        snapshot.put(STANDINGS_URL, {'success': True}, time.time())
+
+        with open(self.path) as f:
+            content = f.read()
+        self.assertNotIn('xyz', content)
+        self.assertEqual(json.loads(content)['version'], SNAPSHOT_VERSION)
+
+    def test_snapshot_survives_restart(self):
+        """Prueba que un proceso nuevo lea el último dato guardado"""
+        FeedSnapshot(self.path, min_interval=0).put(STANDINGS_URL, {'success': True, 'data': 1}, 100.0)
+
+        restored = FeedSnapshot(self.path, max_age=float('inf')).get(STANDINGS_URL)
+        self.assertEqual(restored, {'data': {'success': True, 'data': 1}, 'fetched_at': 100.0})
+
+    def test_throttled_writes_are_flushed(self):
+        """Prueba que los cambios retenidos por el intervalo mínimo se escriban con flush"""
+        snapshot = FeedSnapshot(self.path, min_interval=3600)
+        snapshot.put(STANDINGS_URL, {'version': 1}, time.time())
+        snapshot.put(STANDINGS_URL, {'version': 2}, time.time())
+        snapshot.flush()
+
+        self.assertEqual(FeedSnapshot(self.path).get(STANDINGS_URL)['data'], {'version': 2})
+
+    def test_other_versions_and_old_entries_are_ignored(self):
+        """Prueba que se ignoren archivos de otra versión y datos demasiado viejos"""
+        with open(self.path, 'w') as f:
+            json.dump({'version': SNAPSHOT_VERSION + 1, 'feeds': {snapshot_key(STANDINGS_URL): {'data': 1, 'fetched_at': time.time()}}}, f)
+        self.assertIsNone(FeedSnapshot(self.path).get(STANDINGS_URL))
+
+        snapshot = FeedSnapshot(self.path, min_interval=0, max_age=60)
+        snapshot.put(STANDINGS_URL, {'success': True}, time.time() - 120)
+        self.assertIsNone(snapshot.get(STANDINGS_URL))
+
+    def test_cold_cache_serves_snapshot_and_refreshes(self):
+        """Prueba que una caché vacía responda con el snapshot y lo refresque en segundo plano"""
+        FeedSnapshot(self.path, min_interval=0).put(STANDINGS_URL, {'version': 1}, time.time() - 10)
+
+        cache = ResponseCache(snapshot=FeedSnapshot(self.path, min_interval=0))
+        loader = MagicMock(return_value={'version': 2})
+
+        self.assertEqual(cache.get(STANDINGS_URL, loader, 600), {'version': 1})
+        for _ in range(50):
+            if loader.called and not cache.refreshing:
+                break
+            time.sleep(0.01)
+        self.assertEqual(cache.peek(STANDINGS_URL), {'version': 2})
+
+if __name__ == '__main__':
+    unittest.main()
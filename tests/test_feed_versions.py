@@ -0,0 +1,41 @@
+import unittest
+import sys
+import os
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from feed_versions import FeedVersions, content_version
+
+def standings(*rows):
+    return {'success': True, 'data': {'table': [{'name': name, 'points': points} for name, points in rows]}}
+
+class FeedVersionsTests(unittest.TestCase):
+    def setUp(self):
+        self.versions = FeedVersions(lambda data: data['data']['table'], 'name', keep=2)
+
+    def test_delta_has_only_changed_rows(self):
+        """Prueba que el delta traiga solo las filas modificadas, nuevas y eliminadas"""
+        first = self.versions.observe(standings(('América', 10), ('Chivas', 8), ('Pumas', 5)))
+        second = self.versions.observe(standings(('América', 10), ('Chivas', 11), ('Toluca', 1)))
+        delta = self.versions.delta(first)
+        self.assertEqual(delta['version'], second)
+        self.assertEqual(delta['changed'], [{'name': 'Chivas', 'points': 11}, {'name': 'Toluca', 'points': 1}])
+        self.assertEqual(delta['removed'], ['Pumas'])
+        self.assertEqual(self.versions.delta(second)['changed'], [])
+
+    def test_version_depends_only_on_content(self):
+        """Prueba que la misma tabla tenga la misma versión y que se calcule una vez por respuesta"""
+        data = standings(('América', 10))
+        self.assertEqual(self.versions.observe(data), content_version(data['data']['table']))
+        self.assertEqual(self.versions.observe(standings(('América', 10))), self.versions.observe(data))
+
+    def test_unknown_version_needs_full_response(self):
+        """Prueba que una versión desconocida o demasiado vieja no tenga delta"""
+        first = self.versions.observe(standings(('América', 1)))
+        self.versions.observe(standings(('América', 2)))
+        self.versions.observe(standings(('América', 3)))
+        self.assertIsNone(self.versions.delta(first))
+        self.assertIsNone(self.versions.delta('desconocida'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timezone
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from fixture_index import FixtureIndex, IndexCache
+
+NOW = datetime(2025, 3, 5, 12, 0, tzinfo=timezone.utc)
+
+def fixture(fixture_id, match_round, date, time='19:00:00'):
+    return {'id': fixture_id, 'round': match_round, 'date': date, 'time': time}
+
+class FixtureIndexTests(unittest.TestCase):
+    def setUp(self):
+        self.fixtures = [
+            fixture(4, '11', '2025-03-15'),
+            fixture(1, '10', '2025-03-08', '21:00:00'),
+            fixture(2, '10', '2025-03-08', '17:00:00'),
+            fixture(3, '11', '2025-03-14'),
+            # Partido aplazado de la jornada 6 que se juega entre semana
+            fixture(5, '6', '2025-03-05', '20:00:00'),
+        ]
+        self.index = FixtureIndex(self.fixtures)
+
+    def test_rounds_sorted_by_kickoff(self):
+        """Prueba que cada jornada quede ordenada por hora de inicio y las jornadas por número"""
+        self.assertEqual([f['id'] for f in self.index.get('10')], [2, 1])
+        self.assertEqual([f['id'] for f in self.index.get(11)], [3, 4])
+        self.assertEqual(self.index.round_names(), ['6', '10', '11'])
+
+    def test_current_round_ignores_postponed_matches(self):
+        """Prueba que la jornada actual sea la próxima completa, sin contar partidos aplazados"""
+        self.assertEqual(self.index.current_round(NOW), '10')
+        # Durante el último partido de la jornada 10 sigue siendo la actual
+        self.assertEqual(self.index.current_round(datetime(2025, 3, 8, 22, 0, tzinfo=timezone.utc)), '10')
+        self.assertEqual(self.index.current_round(datetime(2025, 3, 9, 12, 0, tzinfo=timezone.utc)), '11')
+        self.assertEqual(self.index.current_round(datetime(2025, 4, 1, tzinfo=timezone.utc)), '11')
+
+    def test_index_is_built_once_per_response(self):
+        """Prueba que el índice solo se reconstruya cuando cambia la respuesta del feed"""
+        builds = []
+        cache = IndexCache(lambda data: builds.append(data) or FixtureIndex(data['fixtures']))
+        first = {'fixtures': self.fixtures}
+        self.assertIs(cache.get(first), cache.get(first))
+        cache.get({'fixtures': self.fixtures[:1]})
+        self.assertEqual(len(builds), 2)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,124 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from match_store import MatchStore
+from history_sync import HistorySync
+
+class FakeHistory:
+    """Simula el historial paginado de LiveScore (página 1 = partidos más recientes)"""
+
+    def __init__(self, total, per_page=3):
+        self.per_page = per_page
+        self.matches = [{'id': i, 'date': f'2025-01-{i:02d}', 'home_name': 'A', 'away_name': 'B'} for i in range(1, total + 1)]
+        self.requested = []
+        self.fail_on = None
+
+    def add(self, count):
+        start = len(self.matches) + 1
+        self.matches += [{'id': i, 'date': f'2025-02-{i:02d}', 'home_name': 'A', 'away_name': 'B'} for i in range(start, start + count)]
+
+    def load_page(self, page):
+        if page == self.fail_on:
+            raise RuntimeError('Sin conexión')
+        self.requested.append(page)
+        newest_first = list(reversed(self.matches))
+        total_pages = max(1, -(-len(newest_first) // self.per_page))
+        chunk = newest_first[(page - 1) * self.per_page:page * self.per_page]
+        return {'success': True, 'data': {'match': chunk, 'total_pages': total_pages}}
+
+class HistorySyncTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = MatchStore(os.path.join(self.tmp_dir.name, 'matches.db'))
+        self.history = FakeHistory(total=20)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def new_sync(self, max_pages=25):
+        return HistorySync(self.store, self.history.load_page, max_pages=max_pages)
+
+    def test_first_sync_downloads_whole_history(self):
+        """Prueba que la primera sincronización descargue todas las páginas una sola vez"""
+        result = self.new_sync().run()
+        self.assertTrue(result['backfill_done'])
+        self.assertEqual(self.store.count(), 20)
+        self.assertEqual(sorted(self.history.requested), list(range(1, 8)))
+
+    def test_next_sync_only_fetches_new_pages(self):
+        """Prueba que después solo se pidan las páginas con partidos nuevos"""
+        self.new_sync().run()
+        self.history.requested.clear()
+        self.history.add(4)
+
+        result = self.new_sync().run()
+        self.assertEqual(result['new_matches'], 4)
+        self.assertEqual(self.history.requested, [1, 2, 3])
+        self.assertEqual(self.store.count(), 24)
+
+        self.history.requested.clear()
+        self.new_sync().run()
+        self.assertEqual(self.history.requested, [1])
+
+    def test_resumes_after_failure(self):
+        """Prueba que tras un fallo la descarga continúe desde el cursor guardado"""
+        self.history.fail_on = 4
+        with self.assertRaises(RuntimeError):
+            self.new_sync().run()
+        self.assertEqual(self.history.requested, [1, 7, 6, 5])
+
+        self.history.fail_on = None
+        self.history.requested.clear()
+        self.new_sync().run()
+        self.assertEqual(self.history.requested, [1, 4, 3, 2])
+        self.assertEqual(self.store.count(), 20)
+
+    def test_page_budget_spreads_backfill(self):
+        """Prueba que el máximo de páginas por ejecución reparta la descarga inicial"""
+        first = self.new_sync(max_pages=3).run()
+        self.assertFalse(first['backfill_done'])
+        self.assertEqual(first['pages'], 3)
+        for _ in range(3):
+            if self.new_sync(max_pages=3).run()['backfill_done']:
+                break
+        self.assertTrue(self.new_sync().get_state()['backfill_done'])
+        self.assertEqual(self.store.count(), 20)
+
+    def test_matches_arriving_during_backfill(self):
+        """Prueba que partidos nuevos a mitad de la descarga inicial no la dejen atorada"""
+        self.history = FakeHistory(total=60)
+        self.new_sync(max_pages=3).run()
+        self.history.add(2)
+
+        for _ in range(30):
+            result = self.new_sync(max_pages=3).run()
+            # Solo cuentan como nuevos los partidos que no estaban guardados
+            self.assertLessEqual(result['new_matches'], 62)
+            if result['backfill_done']:
+                break
+        self.assertTrue(result['backfill_done'])
+        self.assertEqual(self.store.count(), 62)
+
+        self.history.requested.clear()
+        self.assertEqual(self.new_sync(max_pages=3).run()['new_matches'], 0)
+        self.assertEqual(self.history.requested, [1])
+
+    def test_new_pages_resume_after_page_budget(self):
+        """Prueba que si se acaba el presupuesto con partidos nuevos se continúe donde se quedó"""
+        self.new_sync().run()
+        self.history.add(12)
+        self.history.requested.clear()
+
+        self.new_sync(max_pages=2).run()
+        self.new_sync(max_pages=2).run()
+        self.new_sync(max_pages=2).run()
+        self.assertEqual(self.history.requested, [1, 2, 3, 4, 5])
+        self.assertEqual(self.store.count(), 32)
+        self.assertNotIn('head_page', self.new_sync().get_state())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,38 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timezone
+from unittest.mock import patch
+from flask import Flask, jsonify
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+import json_provider
+from json_provider import FastJSONProvider
+
+class FastJSONProviderTests(unittest.TestCase):
+    def setUp(self):
+        self.app = Flask(__name__)
+        self.app.json = FastJSONProvider(self.app)
+        self.data = {'b': 'Querétaro', 'a': [1, 2.5, None], 'when': datetime(2025, 3, 1, tzinfo=timezone.utc)}
+
+    def render(self):
+        with self.app.test_request_context():
+            return jsonify(self.data).get_data(as_text=True)
+
+    def test_same_output_with_and_without_orjson(self):
+        """Prueba que la respuesta sea compacta, sin ordenar claves y con el mismo contenido sin orjson"""
+        body = self.render()
+        self.assertTrue(body.startswith('{"b":'))
+        self.assertIn('"when":"Sat, 01 Mar 2025 00:00:00 GMT"', body)
+        with patch.object(json_provider, 'orjson', None):
+            fallback = self.render()
+        self.assertEqual(self.app.json.loads(body), self.app.json.loads(fallback))
+
+    def test_large_integers_fall_back(self):
+        """Prueba que los enteros que orjson no acepta se serialicen con el módulo json"""
+        self.data = {'n': 2 ** 70}
+        self.assertEqual(self.app.json.loads(self.render()), {'n': 2 ** 70})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import json
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from live_stream import LiveBroadcaster
+
+def results(*matches):
+    return {'success': True, 'data': {'match': [
+        {'id': match_id, 'home_name': 'América', 'away_name': 'Chivas', 'score': score, 'status': status}
+        for match_id, score, status in matches
+    ]}}
+
+def parse_event(chunk):
+    fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n'))
+    return fields['event'], json.loads(fields['data'])
+
+class LiveBroadcasterTests(unittest.TestCase):
+    def setUp(self):
+        self.broadcaster = LiveBroadcaster(max_clients=2, queue_size=2, heartbeat=0.01)
+        self.broadcaster.update(results(('1', '0 - 0', 'IN PLAY'), ('2', '1 - 1', 'FINISHED')))
+
+    def test_only_changes_are_sent(self):
+        """Prueba que cada conexión reciba el estado completo y después solo los partidos que cambiaron"""
+        stream = self.broadcaster.stream(self.broadcaster.subscribe())
+        next(stream)
+        event, snapshot = parse_event(next(stream))
+        self.assertEqual((event, len(snapshot['matches'])), ('snapshot', 2))
+
+        self.assertEqual(self.broadcaster.update(results(('1', '0 - 0', 'IN PLAY'), ('2', '1 - 1', 'FINISHED'))), [])
+        self.broadcaster.update(results(('1', '1 - 0', 'IN PLAY'), ('2', '1 - 1', 'FINISHED')))
+        event, message = parse_event(next(stream))
+        self.assertEqual(event, 'scores')
+        self.assertEqual([(change['id'], change['score']) for change in message['changes']], [('1', '1 - 0')])
+        self.assertEqual(message['version'], snapshot['version'] + 1)
+
+        # Sin cambios solo se envía el keep-alive
+        self.assertEqual(next(stream), ': ping\n\n')
+        stream.close()
+        self.assertEqual(self.broadcaster.client_count(), 0)
+
+    def test_poll_without_background_refresh(self):
+        """Prueba que sin refresco en segundo plano la conexión consulte el feed y avise de sus errores"""
+        responses = [results(('1', '1 - 0', 'IN PLAY')), ConnectionError('Error simulado')]
+
+        def poll():
+            response = responses.pop(0)
+            if isinstance(response, Exception):
+                raise response
+            self.broadcaster.update(response)
+
+        stream = self.broadcaster.stream(self.broadcaster.subscribe(), poll)
+        next(stream)
+        next(stream)
+        self.assertEqual(next(stream), ': ping\n\n')
+        event, message = parse_event(next(stream))
+        self.assertEqual((event, message['changes'][0]['score']), ('scores', '1 - 0'))
+        event, message = parse_event(next(stream))
+        self.assertEqual(event, 'feed_error')
+        self.assertEqual(next(stream), ': ping\n\n')
+        stream.close()
+
+    def test_client_limit_and_slow_clients(self):
+        """Prueba el límite de conexiones y que un cliente que no lee se desconecte"""
+        slow = self.broadcaster.subscribe()
+        self.broadcaster.subscribe()
+        self.assertIsNone(self.broadcaster.subscribe())
+
+        for score in ('1 - 0', '2 - 0', '3 - 0'):
+            self.broadcaster.update(results(('1', score, 'IN PLAY')))
+        self.assertEqual(self.broadcaster.client_count(), 0)
+        self.assertIsNone(slow[0].get_nowait())
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,96 @@
+import unittest
+import sys
+import os
+import tempfile
+from unittest.mock import patch
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from match_store import MatchStore
+
+def make_match(match_id, date, home, away, match_round='1', score='1 - 0'):
+    return {'id': match_id, 'date': date, 'scheduled': '19:00', 'round': match_round,
+            'home_name': home, 'away_name': away, 'score': score, 'status': 'FINISHED'}
+
+class MatchStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = MatchStore(os.path.join(self.tmp_dir.name, 'matches.db'))
+        self.store.upsert_matches([
+            make_match(1, '2025-01-10', 'América', 'Chivas', '1'),
+            make_match(2, '2025-01-17', 'Pumas', 'América', '2'),
+            make_match(3, '2025-01-18', 'Chivas', 'Pumas', '2'),
+        ])
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def test_query_by_team_date_and_round(self):
+        """Prueba los filtros por equipo, fechas y jornada, del más reciente al más antiguo"""
+        self.assertEqual([m['id'] for m in self.store.query(team='América')], [2, 1])
+        self.assertEqual([m['id'] for m in self.store.query(date_from='2025-01-15')], [3, 2])
+        self.assertEqual([m['id'] for m in self.store.query(match_round='2', team='Chivas')], [3])
+        self.assertEqual([m['id'] for m in self.store.query(limit=1, offset=1)], [2])
+        self.assertEqual(self.store.count(team='Pumas'), 2)
+
+    def test_upsert_is_idempotent(self):
+        """Prueba que volver a guardar un partido lo actualice sin duplicarlo"""
+        self.store.upsert_matches([make_match(1, '2025-01-10', 'América', 'Chivas', '1', score='2 - 2')])
+        self.assertEqual(self.store.count(), 3)
+        self.assertEqual(self.store.get_matches(['1'])['1']['score'], '2 - 2')
+
+    def test_page_keeps_order_and_metadata(self):
+        """Prueba que una página guardada se arme igual que la respuesta de LiveScore"""
+        data = {'success': True, 'data': {
+            'match': [make_match(5, '2025-02-01', 'Toluca', 'León'), make_match(4, '2025-01-31', 'León', 'Toluca')],
+            'total_pages': 10, 'next_page': 'url'
+        }}
+        self.store.ingest_page(3, data)
+        self.assertEqual(self.store.get_page(3), data)
+        self.assertIsNone(self.store.get_page(4))
+
+        with patch('match_store.time.time', return_value=self.store_time() + 100):
+            self.assertIsNone(self.store.get_page(3, max_age=50))
+
+    def test_counts_are_incremental_and_exact(self):
+        """Prueba que los contadores solo sumen partidos nuevos y coincidan con un recálculo"""
+        self.store.upsert_matches([
+            make_match(1, '2025-01-10', 'América', 'Chivas', '1', score='3 - 0'),
+            make_match(4, '2025-08-02', 'América', 'Toluca', '1')
+        ])
+        counts = self.store.get_counts()
+        self.assertEqual(counts['total'], 4)
+        self.assertEqual(counts['seasons'], {'2025 Clausura': 3, '2025 Apertura': 1})
+        self.assertEqual(counts['teams']['América'], 3)
+        self.assertEqual(counts['teams']['Toluca'], 1)
+
+        self.store.rebuild_counts()
+        self.assertEqual(self.store.get_counts(), counts)
+
+    def test_counts_follow_changed_teams_and_dates(self):
+        """Prueba que si un partido guardado cambia de equipos o fecha se muevan sus contadores"""
+        self.store.upsert_matches([
+            make_match(1, '2025-08-10', 'América', 'Toluca', '1'),
+            make_match(1, '2025-08-10', 'América', 'León', '1')
+        ])
+        counts = self.store.get_counts()
+        self.assertEqual(counts['total'], 3)
+        self.assertEqual(counts['seasons'], {'2025 Clausura': 2, '2025 Apertura': 1})
+        self.assertNotIn('Toluca', counts['teams'])
+        self.assertEqual(counts['teams']['Chivas'], 1)
+        self.assertEqual(counts['teams']['León'], 1)
+
+        self.store.rebuild_counts()
+        self.assertEqual(self.store.get_counts(), counts)
+
+    def test_counts_are_built_for_existing_archives(self):
+        """Prueba que un archivo sin contadores los calcule al abrirse"""
+        self.store.connection().execute('DELETE FROM match_counts')
+        store = MatchStore(self.store.path)
+        self.assertEqual(store.get_counts()['total'], 3)
+
+    def store_time(self):
+        return self.store.connection().execute('SELECT fetched_at FROM pages').fetchone()[0]
+
+if __name__ == '__main__':
+    unittest.main()
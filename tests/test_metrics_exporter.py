@@ -0,0 +1,50 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api_stats_manager import ApiStatsManager
+from metrics_exporter import render_openmetrics
+
+class MetricsExporterTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.manager = ApiStatsManager(stats_file=os.path.join(self.tmp_dir.name, 'api_stats.json'))
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def samples(self, text):
+        return dict(line.rsplit(' ', 1) for line in text.splitlines() if line and not line.startswith('#'))
+
+    def test_counters_and_histogram(self):
+        """Prueba que se exporten contadores e histograma acumulado de latencia"""
+        for response_time in (0.08, 0.8, 0.9, 3.0):
+            self.manager.track_api_call(True, response_time)
+        self.manager.track_api_call(False, 0)
+        self.manager.track_cache_event('stale')
+
+        text = render_openmetrics(self.manager)
+        samples = self.samples(text)
+        self.assertTrue(text.endswith('# EOF\n'))
+        self.assertEqual(samples['ligamx_upstream_calls_total'], '5')
+        self.assertEqual(samples['ligamx_upstream_errors_total'], '1')
+        self.assertEqual(samples['ligamx_cache_requests_total{result="stale"}'], '1')
+        self.assertEqual(samples['ligamx_upstream_latency_seconds_bucket{le="0.1"}'], '2')
+        self.assertEqual(samples['ligamx_upstream_latency_seconds_bucket{le="1.0"}'], '4')
+        self.assertEqual(samples['ligamx_upstream_latency_seconds_bucket{le="+Inf"}'], '5')
+        self.assertEqual(samples['ligamx_upstream_latency_seconds_count'], '5')
+        self.assertIn('ligamx_upstream_latency_quantile_seconds{quantile="0.95"}', samples)
+        self.assertNotIn('ligamx_upstream_latency_quantile_seconds{quantile="p95"}', samples)
+
+    def test_feed_status(self):
+        """Prueba que se exporten los fallos y el último refresco de cada feed"""
+        feeds = {'standings': {'failures': 2, 'consecutive_failures': 1, 'last_refresh': '2024-01-01T00:00:00'}}
+        samples = self.samples(render_openmetrics(self.manager, feeds=feeds))
+        self.assertEqual(samples['ligamx_feed_refresh_failures_total{feed="standings"}'], '2')
+        self.assertIn('ligamx_feed_last_refresh_timestamp_seconds{feed="standings"}', samples)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,41 @@
+import unittest
+import sys
+import os
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from payloads import lean_standings, lean_matches, parse_fields, project
+
+class PayloadsTests(unittest.TestCase):
+    def test_lean_standings(self):
+        """Prueba que la tabla se reduzca a los campos del esquema y convierta los números"""
+        data = {'success': True, 'data': {'table': [
+            {'rank': '1', 'name': 'América', 'points': '30', 'goal_diff': '-2', 'league_id': '45', 'color': 'Promotion'}
+        ]}}
+        self.assertEqual(lean_standings(data), {'success': True, 'data': {'table': [
+            {'rank': 1, 'name': 'América', 'goal_diff': -2, 'points': 30}
+        ]}})
+        self.assertEqual(lean_standings({'success': False, 'error': 'x'}), {'success': False, 'error': 'x'})
+
+    def test_lean_matches_drop_api_links(self):
+        """Prueba que los enlaces de LiveScore (con la llave de la API) no lleguen al navegador"""
+        data = {'success': True, 'data': {
+            'match': [{'id': '1', 'home_name': 'América', 'outcomes': {}, 'urls': {}}],
+            'total_pages': 3, 'next_page': 'https://livescore-api.com/...&key=secreto'
+        }}
+        self.assertEqual(lean_matches(data), {'success': True, 'data': {
+            'total_pages': 3, 'match': [{'id': '1', 'home_name': 'América'}]
+        }})
+
+    def test_projection(self):
+        """Prueba ?fields= en respuestas completas y en respuestas delta"""
+        self.assertEqual(parse_fields(' name, points ,'), ('name', 'points'))
+        self.assertIsNone(parse_fields(''))
+        full = {'success': True, 'version': 'v', 'data': {'table': [{'name': 'América', 'points': 30, 'won': 9}]}}
+        self.assertEqual(project(full, 'table', ('name', 'points'))['data']['table'], [{'name': 'América', 'points': 30}])
+        self.assertIs(project(full, 'table', None), full)
+        delta = {'success': True, 'delta': True, 'data': {'changed': [{'name': 'Chivas', 'won': 3}], 'removed': []}}
+        self.assertEqual(project(delta, 'table', ('name',))['data']['changed'], [{'name': 'Chivas'}])
+
+if __name__ == '__main__':
+    unittest.main()
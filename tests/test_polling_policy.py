@@ -0,0 +1,62 @@
+import unittest
+import sys
+import os
+from datetime import datetime, timezone
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from polling_policy import MatchWindowPolicy, parse_kickoff
+
+NOW = datetime(2025, 3, 29, 12, 0, tzinfo=timezone.utc)
+
+def fixtures(*kickoffs):
+    """Construye una respuesta de fixtures de LiveScore con las horas indicadas (UTC)"""
+    return {'success': True, 'data': {'fixtures': [
+        {'date': '2025-03-29', 'time': kickoff} for kickoff in kickoffs
+    ]}}
+
+class MatchWindowPolicyTests(unittest.TestCase):
+    def make_policy(self, fixtures_data=None, results_data=None):
+        return MatchWindowPolicy(
+            get_fixtures=lambda: fixtures_data,
+            get_results=lambda: results_data,
+            live_interval=45,
+            idle_interval=10800
+        )
+
+    def test_parse_kickoff(self):
+        """Prueba la lectura de la fecha y hora de un partido"""
+        self.assertEqual(parse_kickoff({'date': '2025-03-29', 'time': '02:00:00'}),
+                         datetime(2025, 3, 29, 2, 0, tzinfo=timezone.utc))
+        self.assertEqual(parse_kickoff({'date': '2025-03-29', 'scheduled': '19:05'}),
+                         datetime(2025, 3, 29, 19, 5, tzinfo=timezone.utc))
+        self.assertIsNone(parse_kickoff({'time': '02:00:00'}))
+
+    def test_live_interval_during_match(self):
+        """Prueba que se consulte seguido durante un partido"""
+        policy = self.make_policy(fixtures('11:00:00'))
+        self.assertEqual(policy.interval(NOW), 45)
+
+    def test_live_interval_before_kickoff(self):
+        """Prueba que se consulte seguido poco antes de que empiece un partido"""
+        policy = self.make_policy(fixtures('12:20:00'))
+        self.assertEqual(policy.interval(NOW), 45)
+
+    def test_live_interval_with_live_results(self):
+        """Prueba que un partido en juego en los resultados active la consulta frecuente"""
+        policy = self.make_policy(results_data={'data': {'match': [{'status': 'IN PLAY'}]}})
+        self.assertEqual(policy.interval(NOW), 45)
+
+    def test_backs_off_until_next_window(self):
+        """Prueba que fuera de partido se espere hasta el inicio de la siguiente ventana"""
+        policy = self.make_policy(fixtures('14:00:00'))
+        # La ventana empieza 30 minutos antes del partido: 13:30
+        self.assertEqual(policy.interval(NOW), 5400)
+
+    def test_idle_interval_without_fixtures(self):
+        """Prueba que sin partidos programados se use el intervalo máximo"""
+        self.assertEqual(self.make_policy().interval(NOW), 10800)
+        self.assertEqual(self.make_policy(fixtures('23:00:00')).interval(NOW), 10800)
+
+if __name__ == '__main__':
+    unittest.main()
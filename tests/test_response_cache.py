@@ -0,0 +1,79 @@
+import unittest
+import sys
+import os
+import io
+import time
+from contextlib import redirect_stdout
+from unittest.mock import MagicMock
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from response_cache import ResponseCache
+
+class ResponseCacheTests(unittest.TestCase):
+    def setUp(self):
+        self.events = []
+        self.cache = ResponseCache(stale_ttl=60, on_event=lambda event, key: self.events.append(event))
+
+    def test_miss_then_hit(self):
+        """Prueba que la segunda consulta se sirva desde la caché"""
+        loader = MagicMock(return_value={'success': True})
+
+        self.assertEqual(self.cache.get('standings', loader, 10), {'success': True})
+        self.assertEqual(self.cache.get('standings', loader, 10), {'success': True})
+
+        self.assertEqual(loader.call_count, 1)
+        self.assertEqual(self.events, ['miss', 'hit'])
+
+    def test_stale_entry_is_served_and_refreshed(self):
+        """Prueba que una entrada vencida se sirva mientras se refresca en segundo plano"""
+        self.cache.set('results', {'version': 1})
+        self.cache.entries['results']['fetched_at'] -= 20
+        loader = MagicMock(return_value={'version': 2})
+
+        self.assertEqual(self.cache.get('results', loader, 10), {'version': 1})
+
+        # Esperar a que termine el refresco en segundo plano
+        for _ in range(50):
+            if not self.cache.refreshing:
+                break
+            time.sleep(0.01)
+        self.assertEqual(self.cache.get('results', loader, 10), {'version': 2})
+        self.assertEqual(self.events, ['stale', 'hit'])
+
+    def test_refresh_error_log_hides_credentials(self):
+        """Prueba que el error de un refresco en segundo plano no registre key= ni secret="""
+        url = 'https://livescore-api.com/api-client/scores/live.json?key=abc123&secret=xyz789'
+        output = io.StringIO()
+        with redirect_stdout(output):
+            self.cache.refresh_async(url, MagicMock(side_effect=ConnectionError(f'Max retries exceeded with url: {url}')))
+            for _ in range(50):
+                if not self.cache.refreshing:
+                    break
+                time.sleep(0.01)
+
+        self.assertIn('key=***&secret=***', output.getvalue())
+        self.assertNotIn('abc123', output.getvalue())
+        self.assertNotIn('xyz789', output.getvalue())
+
+    def test_expired_entry_is_reloaded(self):
+        """Prueba que una entrada fuera de la ventana obsoleta se vuelva a cargar"""
+        self.cache.set('history', {'version': 1})
+        self.cache.entries['history']['fetched_at'] -= 100
+        loader = MagicMock(return_value={'version': 2})
+
+        self.assertEqual(self.cache.get('history', loader, 10), {'version': 2})
+        self.assertEqual(self.events, ['miss'])
+
+    def test_uncacheable_response_is_not_stored(self):
+        """Prueba que las respuestas no válidas no se guarden en caché"""
+        cache = ResponseCache(cacheable=lambda data: data.get('success'))
+        loader = MagicMock(return_value={'success': False})
+
+        cache.get('fixtures', loader, 10)
+        cache.get('fixtures', loader, 10)
+
+        self.assertEqual(loader.call_count, 2)
+
+if __name__ == '__main__':
+    unittest.main()
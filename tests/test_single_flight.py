@@ -0,0 +1,70 @@
+import unittest
+import sys
+import os
+import threading
+import time
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from single_flight import SingleFlight
+
+class SingleFlightTests(unittest.TestCase):
+    def run_concurrently(self, flight, fn, count=5):
+        """Ejecuta la misma clave desde varios hilos y devuelve los resultados"""
+        results = []
+        errors = []
+
+        def worker():
+            try:
+                results.append(flight.do('standings', fn))
+            except Exception as e:
+                errors.append(e)
+
+        threads = [threading.Thread(target=worker) for _ in range(count)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return results, errors
+
+    def test_concurrent_calls_are_collapsed(self):
+        """Prueba que las llamadas simultáneas compartan una sola ejecución"""
+        collapsed = []
+        flight = SingleFlight(on_collapse=lambda: collapsed.append(1))
+        calls = []
+
+        def fetch():
+            calls.append(1)
+            time.sleep(0.1)
+            return {'success': True}
+
+        results, errors = self.run_concurrently(flight, fetch)
+
+        self.assertEqual(len(calls), 1)
+        self.assertEqual(results, [{'success': True}] * 5)
+        self.assertEqual(errors, [])
+        self.assertEqual(flight.collapsed, 4)
+        self.assertEqual(len(collapsed), 4)
+
+    def test_error_is_shared(self):
+        """Prueba que todos los que esperan reciban el error de la llamada"""
+        flight = SingleFlight()
+
+        def fetch():
+            time.sleep(0.1)
+            raise ValueError('Error simulado')
+
+        results, errors = self.run_concurrently(flight, fetch, count=3)
+
+        self.assertEqual(results, [])
+        self.assertEqual(len(errors), 3)
+
+    def test_sequential_calls_are_not_collapsed(self):
+        """Prueba que una llamada posterior vuelva a ejecutarse"""
+        flight = SingleFlight()
+        flight.do('standings', lambda: 1)
+        self.assertEqual(flight.do('standings', lambda: 2), 2)
+        self.assertEqual(flight.collapsed, 0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+import sys
+import os
+import tempfile
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from match_store import MatchStore
+from standings_engine import StandingsEngine, parse_score
+
+def result(match_id, date, match_round, home, away, score, status='FINISHED'):
+    return {'id': match_id, 'date': date, 'round': str(match_round), 'home_name': home, 'away_name': away,
+            'score': score, 'ft_score': score if status == 'FINISHED' else '', 'status': status}
+
+class StandingsEngineTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.store = MatchStore(os.path.join(self.tmp_dir.name, 'matches.db'))
+        self.store.upsert_matches([
+            result(1, '2025-01-10', 1, 'América', 'Chivas', '2 - 0'),
+            result(2, '2025-01-11', 1, 'Pumas', 'Toluca', '1 - 1'),
+            result(3, '2025-01-17', 2, 'Chivas', 'Pumas', '0 - 1'),
+            result(4, '2025-01-18', 2, 'Toluca', 'América', '3 - 3'),
+        ])
+        self.engine = StandingsEngine(self.store)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def names(self, standings):
+        return [row['name'] for row in standings['table']]
+
+    def test_table_points_and_goal_difference(self):
+        """Prueba puntos, diferencia de goles y orden de la tabla completa"""
+        standings = self.engine.standings()
+        self.assertEqual(standings['season'], '2025 Clausura')
+        self.assertEqual(self.names(standings), ['América', 'Pumas', 'Toluca', 'Chivas'])
+        america = standings['table'][0]
+        self.assertEqual((america['matches'], america['won'], america['drawn'], america['points'], america['goal_diff']),
+                         (2, 1, 1, 4, 2))
+
+    def test_as_of_round_and_date(self):
+        """Prueba la tabla hasta una jornada y hasta una fecha"""
+        by_round = self.engine.standings(as_of_round=1)
+        # Pumas y Toluca empatan en todo salvo los goles de visitante
+        self.assertEqual(self.names(by_round), ['América', 'Toluca', 'Pumas', 'Chivas'])
+        self.assertEqual(by_round['table'][1]['points'], 1)
+        by_date = self.engine.standings(as_of_date='2025-01-10')
+        self.assertEqual([row['matches'] for row in by_date['table']], [1, 0, 0, 1])
+
+    def test_new_and_corrected_results_are_incremental(self):
+        """Prueba que los resultados nuevos o corregidos se sumen sin recalcular lo anterior"""
+        self.engine.standings(as_of_round=1)
+        self.store.upsert_matches([
+            result(5, '2025-01-24', 3, 'Chivas', 'Toluca', '4 - 0'),
+            result(6, '2025-01-25', 3, 'América', 'Pumas', '', status='NOT STARTED'),
+            result(2, '2025-01-11', 1, 'Pumas', 'Toluca', '2 - 1'),
+        ])
+        standings = self.engine.standings()
+        table = {row['name']: row for row in standings['table']}
+        self.assertEqual(table['Pumas']['points'], 6)
+        self.assertEqual(table['Chivas']['points'], 3)
+        self.assertEqual(table['América']['matches'], 2)
+        self.assertEqual(standings['last_round'], 3)
+
+    def test_head_to_head_breaks_ties(self):
+        """Prueba que el enfrentamiento directo desempate a equipos con mismos puntos y goles"""
+        self.store.upsert_matches([
+            result(10, '2024-08-01', 1, 'León', 'Atlas', '2 - 1'),
+            result(11, '2024-08-08', 2, 'Atlas', 'Necaxa', '1 - 0'),
+            result(12, '2024-08-08', 2, 'Puebla', 'León', '1 - 0'),
+        ])
+        # León y Atlas: 3 puntos, diferencia 0 y 2 goles; Atlas tiene más goles de visitante pero perdió con León
+        standings = self.engine.standings(season='2024 Apertura')
+        self.assertEqual(self.names(standings), ['Puebla', 'León', 'Atlas', 'Necaxa'])
+
+    def test_parse_score(self):
+        """Prueba que solo los partidos terminados tengan marcador"""
+        self.assertEqual(parse_score(result(1, '2025-01-10', 1, 'A', 'B', '2 - 1')), (2, 1))
+        self.assertIsNone(parse_score(result(1, '2025-01-10', 1, 'A', 'B', '0 - 0', status='IN PLAY')))
+        self.assertIsNone(self.engine.standings(season='2023 Apertura'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import unittest
+import json
+import sys
+import os
+import tempfile
+import sqlite3
+from multiprocessing import Process
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from api_stats_manager import ApiStatsManager
+from stats_store import SqliteStatsStore
+
+def record_calls(stats_file, db_path, calls):
+    """Registra llamadas desde otro proceso, como lo haría un worker"""
+    manager = ApiStatsManager(stats_file=stats_file, flush_interval=3600, store=SqliteStatsStore(db_path))
+    for _ in range(calls):
+        manager.track_api_call(True, 0.5)
+    manager.flush()
+
+class LockedAtStartStore(SqliteStatsStore):
+    """Almacén cuya primera escritura falla, como con database is locked al arrancar varios workers"""
+
+    def __init__(self, path):
+        super().__init__(path)
+        self.failures = 1
+
+    def apply(self, data, prune_before=None, only_if_empty=False):
+        if self.failures:
+            self.failures -= 1
+            raise sqlite3.OperationalError('database is locked')
+        return super().apply(data, prune_before=prune_before, only_if_empty=only_if_empty)
+
+class SqliteStatsStoreTests(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.stats_file = os.path.join(self.tmp_dir.name, 'api_stats.json')
+        self.db_path = os.path.join(self.tmp_dir.name, 'api_stats.db')
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def new_manager(self, **kwargs):
+        return ApiStatsManager(stats_file=self.stats_file, store=SqliteStatsStore(self.db_path), **kwargs)
+
+    def test_workers_do_not_lose_updates(self):
+        """Prueba que las llamadas de varios procesos se sumen sin perder ninguna"""
+        workers = [Process(target=record_calls, args=(self.stats_file, self.db_path, 25)) for _ in range(4)]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join(30)
+
+        stats = self.new_manager().get_dashboard_data()
+        self.assertEqual(stats['api_stats']['calls'], 100)
+        self.assertEqual(stats['api_trend']['calls'][-1], 100)
+        self.assertAlmostEqual(stats['api_stats']['response_time_p50'], 0.5, delta=0.05)
+
+    def test_dashboard_shows_other_workers(self):
+        """Prueba que el dashboard de un worker incluya las llamadas de otro"""
+        first = self.new_manager(flush_interval=3600)
+        second = self.new_manager(flush_interval=3600)
+        first.track_api_call(True, 0.2)
+        first.track_cache_event('hit')
+        first.flush()
+        second.track_api_call(False, 1.0)
+
+        stats = second.get_dashboard_data()
+        self.assertEqual(stats['api_stats']['calls'], 2)
+        self.assertEqual(stats['api_stats']['errors'], 1)
+        self.assertEqual(stats['cache_stats']['hits'], 1)
+        self.assertFalse(os.path.exists(self.stats_file))
+
+    def test_breakdown_is_shared(self):
+        """Prueba que el desglose por feed sume las llamadas de todos los procesos"""
+        first = self.new_manager(flush_interval=3600)
+        second = self.new_manager(flush_interval=3600)
+        first.track_api_call(True, 0.5, feed='standings', status='2xx')
+        first.flush()
+        second.track_api_call(True, 1.5, feed='standings', status='2xx')
+
+        feeds = second.get_dashboard_data()['breakdown']['feed']
+        self.assertEqual(feeds[0]['calls'], 2)
+        self.assertEqual(feeds[0]['response_time_max'], 1.5)
+
+    def test_json_stats_are_imported_once(self):
+        """Prueba que el archivo JSON anterior se importe una sola vez al almacén"""
+        with open(self.stats_file, 'w') as f:
+            json.dump({'api_calls_count': 7, 'api_errors_count': 1}, f)
+
+        self.new_manager()
+        manager = self.new_manager()
+        self.assertEqual(manager.get_api_stats()['calls'], 7)
+        self.assertEqual(SqliteStatsStore(self.db_path).load()['api_errors_count'], 1)
+
+    def test_failed_import_at_start_is_retried(self):
+        """Prueba que si el almacén falla al arrancar las llamadas y el JSON anterior se guarden después"""
+        with open(self.stats_file, 'w') as f:
+            json.dump({'api_calls_count': 7, 'api_errors_count': 1}, f)
+
+        manager = ApiStatsManager(stats_file=self.stats_file, flush_interval=3600,
+                                  store=LockedAtStartStore(self.db_path))
+        manager.track_api_call(True, 0.5)
+        manager.flush()
+
+        self.assertEqual(manager.get_dashboard_data()['api_stats']['calls'], 8)
+        self.assertEqual(SqliteStatsStore(self.db_path).load()['api_calls_count'], 8)
+        self.assertEqual(self.new_manager().get_api_stats()['errors'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
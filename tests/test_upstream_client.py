@@ -0,0 +1,73 @@
+import unittest
+import sys
+import os
+import time
+from unittest.mock import patch
+
+# Agregar el directorio principal al path para poder importar los módulos
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+from upstream_client import UpstreamClient
+
+class UpstreamClientTests(unittest.TestCase):
+    def test_session_is_reused(self):
+        """Prueba que todas las llamadas compartan la misma sesión"""
+        client = UpstreamClient()
+        self.assertIs(client.session, client.session)
+
+    def test_new_session_after_fork(self):
+        """Prueba que un proceso hijo cree su propia sesión"""
+        client = UpstreamClient()
+        parent_session = client.session
+
+        with patch('upstream_client.os.getpid', return_value=os.getpid() + 1):
+            self.assertIsNot(client.session, parent_session)
+
+    def test_adapter_configuration(self):
+        """Prueba el tamaño del pool y la política de reintentos"""
+        client = UpstreamClient(pool_size=4, max_retries=3, backoff_factor=0.5)
+        adapter = client.session.get_adapter('https://livescore-api.com')
+
+        self.assertEqual(adapter._pool_maxsize, 4)
+        self.assertEqual(adapter.max_retries.total, 3)
+        self.assertEqual(adapter.max_retries.backoff_factor, 0.5)
+        self.assertIn(503, adapter.max_retries.status_forcelist)
+
+    def test_default_timeout(self):
+        """Prueba que se aplique el timeout por defecto"""
+        client = UpstreamClient(timeout=7)
+        with patch.object(client.session, 'get') as mock_get:
+            client.get('https://livescore-api.com/test')
+            mock_get.assert_called_once_with('https://livescore-api.com/test', timeout=7)
+
+    def test_run_parallel(self):
+        """Prueba que las consultas en paralelo tarden lo que la más lenta y no la suma"""
+        client = UpstreamClient(pool_size=4)
+
+        def slow(value):
+            time.sleep(0.2)
+            return value
+
+        start = time.time()
+        results = client.run_parallel({'a': lambda: slow(1), 'b': lambda: slow(2)}, deadline=5)
+
+        self.assertEqual(results, {'a': 1, 'b': 2})
+        self.assertLess(time.time() - start, 0.35)
+
+    def test_run_parallel_deadline(self):
+        """Prueba que se lance TimeoutError al agotar el plazo compartido"""
+        client = UpstreamClient(pool_size=2)
+        with self.assertRaises(TimeoutError):
+            client.run_parallel({'slow': lambda: time.sleep(0.5)}, deadline=0.05)
+
+    def test_run_parallel_propagates_errors(self):
+        """Prueba que se propague la excepción de una consulta fallida"""
+        client = UpstreamClient()
+
+        def fail():
+            raise ValueError('Error simulado')
+
+        with self.assertRaises(ValueError):
+            client.run_parallel({'ok': lambda: 1, 'fail': fail}, deadline=5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor, wait
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+class UpstreamClient:
+    """Cliente HTTP compartido con conexiones persistentes y reintentos para las APIs externas"""
+
+    def __init__(self, pool_size=10, max_retries=2, backoff_factor=0.3, timeout=10):
+        self.pool_size = pool_size
+        self.max_retries = max_retries
+        self.backoff_factor = backoff_factor
+        self.timeout = timeout
+
+        self._session = None
+        self._pid = None
+        self._executor = None
+        self._executor_pid = None
+        self.lock = threading.Lock()
+
+    def create_session(self):
+        """Crea una sesión con pool de conexiones y política de reintentos"""
+        retry = Retry(
+            total=self.max_retries,
+            connect=self.max_retries,
+            read=self.max_retries,
+            status=self.max_retries,
+            backoff_factor=self.backoff_factor,
+            status_forcelist=(500, 502, 503, 504),
+            # Solo se reintentan lecturas y errores 5xx en GET; los errores de conexión siempre
+            allowed_methods=frozenset(['GET']),
+            raise_on_status=False
+        )
+        adapter = HTTPAdapter(pool_connections=self.pool_size, pool_maxsize=self.pool_size, max_retries=retry)
+
+        session = requests.Session()
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        return session
+
+    @property
+    def session(self):
+        """Devuelve la sesión del proceso actual, creándola si es necesario"""
+        # Cada worker tiene su propia sesión: tras un fork no se comparten sockets con el padre
+        pid = os.getpid()
+        if self._session is None or self._pid != pid:
+            with self.lock:
+                if self._session is None or self._pid != pid:
+                    self._session = self.create_session()
+                    self._pid = pid
+        return self._session
+
+    def get(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.get(url, **kwargs)
+
+    def post(self, url, **kwargs):
+        kwargs.setdefault('timeout', self.timeout)
+        return self.session.post(url, **kwargs)
+
+    @property
+    def executor(self):
+        """Devuelve el pool de hilos del proceso actual para consultas en paralelo"""
+        # Los hilos no sobreviven a un fork, así que cada worker crea su propio pool
+        pid = os.getpid()
+        if self._executor is None or self._executor_pid != pid:
+            with self.lock:
+                if self._executor is None or self._executor_pid != pid:
+                    self._executor = ThreadPoolExecutor(max_workers=self.pool_size, thread_name_prefix='upstream')
+                    self._executor_pid = pid
+        return self._executor
+
+    def run_parallel(self, tasks, deadline=None):
+        """Ejecuta en paralelo funciones independientes con un plazo compartido (segundos)
+
+        Recibe un diccionario nombre -> función y devuelve nombre -> resultado. Si alguna
+        función falla se propaga su excepción; si se agota el plazo se lanza TimeoutError.
+        """
+        futures = {name: self.executor.submit(task) for name, task in tasks.items()}
+        done, pending = wait(futures.values(), timeout=deadline)
+
+        if pending:
+            for future in pending:
+                future.cancel()
+            raise TimeoutError(f'Las consultas a la API no terminaron en {deadline} segundos')
+
+        return {name: future.result() for name, future in futures.items()}
+
+    def close(self):
+        """Cierra las conexiones abiertas de la sesión"""
+        with self.lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+            if self._executor is not None:
+                self._executor.shutdown(wait=False)
+                self._executor = None